@@ -3,11 +3,25 @@ Analyzer orchestrator.
 
 Combines classifier + priority detector into a single AnalysisResult.
 No I/O – all inputs/outputs are plain Python values.
+
+The ticket text is normalised and scanned once into an AnalysisContext that
+every stage reads from.  Results are memoised per (rule-set version, text) in
+an LRU cache, so duplicate tickets skip the pipeline entirely.
 """
-from dataclasses import dataclass, field
+import time
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from app.analyzers.cache import AnalysisCache, cache_key
+from app.analyzers.classifier import classify_context
+from app.analyzers.context import AnalysisContext, normalise_text
+from app.analyzers.matcher import URGENCY_GROUP
+from app.analyzers.rules import RuleSnapshot, current_snapshot, on_snapshot_change
+from app.config import ANALYSIS_CACHE_SIZE
+from app.metrics import observe_stage
 
-from app.analyzers.classifier import classify
-from app.analyzers.priority import detect_priority
+if TYPE_CHECKING:
+    from app.analyzers.vectorized import AnalysisBatch
 
 
 @dataclass
@@ -18,47 +32,95 @@ class AnalysisResult:
     confidence: float
     keywords: list[str]
     custom_flags: list[str]
+    rules_version: str = ""   # version of the rule set that produced this result
+
+
+def _copy_result(result: AnalysisResult) -> AnalysisResult:
+    return replace(result, keywords=list(result.keywords), custom_flags=list(result.custom_flags))
+
+
+RESULT_CACHE = AnalysisCache(ANALYSIS_CACHE_SIZE, copy=_copy_result)
+# Entries of an old rule set can never be hit again – free them on reload
+on_snapshot_change(lambda _snapshot: RESULT_CACHE.clear())
 
 
 def analyze(subject: str, description: str) -> AnalysisResult:
     """
     Full analysis pipeline:
+      0. build the AnalysisContext (normalise + scan once)
       1. classify text → category, confidence, matched keywords
       2. detect priority, urgency, custom flags
       3. apply custom-rule category overrides (security/refund may change category)
       4. return AnalysisResult
+
+    Served from RESULT_CACHE when the same text was analysed under the same
+    rule-set version.
+    """
+    snapshot = current_snapshot()
+    if RESULT_CACHE.maxsize <= 0:
+        return _analyze_uncached(subject, description, snapshot)
+
+    key = cache_key(snapshot.version, normalise_text(subject, description))
+    result = RESULT_CACHE.get(key)
+    if result is None:
+        result = _analyze_uncached(subject, description, snapshot)
+        RESULT_CACHE.put(key, result)
+    return result
+
+
+def analyze_many(
+    subjects: Iterable[str], descriptions: Iterable[str], snapshot: Optional[RuleSnapshot] = None
+) -> "AnalysisBatch":
     """
-    category, confidence, keywords = classify(subject, description)
-    priority, urgency, custom_flags = detect_priority(subject, description, category)
-
-    # Custom rules may override the classifier's category
-    _FLAG_CATEGORY: dict[str, str] = {
-        "security_escalation": "Technical",
-        "data_loss": "Technical",
-        "account_takeover": "Account",
-        "refund_detected": "Billing",
-        "pricing_dispute": "Billing",
-    }
-    _FLAG_MIN_CONFIDENCE: dict[str, float] = {
-        "security_escalation": 0.95,
-        "compliance_risk": 0.90,
-        "data_loss": 0.90,
-        "account_takeover": 0.90,
-        "refund_detected": 0.80,
-        "pricing_dispute": 0.75,
-    }
-
-    for flag in custom_flags:
-        if flag in _FLAG_CATEGORY:
-            category = _FLAG_CATEGORY[flag]
-        if flag in _FLAG_MIN_CONFIDENCE:
-            confidence = max(confidence, _FLAG_MIN_CONFIDENCE[flag])
+    Analyse many tickets at once into columnar arrays (NumPy); same results
+    as analyze() per ticket.  See app.analyzers.vectorized.
+    """
+    from app.analyzers.vectorized import analyze_many as _analyze_many
+
+    return _analyze_many(subjects, descriptions, snapshot)
+
+
+def lookup_cached(subject: str, description: str, snapshot: RuleSnapshot) -> Optional[AnalysisResult]:
+    """The cached result for this text under ``snapshot``, if any (for callers that analyse elsewhere)."""
+    if RESULT_CACHE.maxsize <= 0:
+        return None
+    return RESULT_CACHE.get(cache_key(snapshot.version, normalise_text(subject, description)))
+
+
+def store_cached(subject: str, description: str, snapshot: RuleSnapshot, result: AnalysisResult) -> None:
+    if RESULT_CACHE.maxsize > 0:
+        RESULT_CACHE.put(cache_key(snapshot.version, normalise_text(subject, description)), result)
+
+
+def _analyze_uncached(subject: str, description: str, snapshot: RuleSnapshot) -> AnalysisResult:
+    started = time.perf_counter()
+    ctx = AnalysisContext(subject, description, snapshot)
+    observe_stage("scan", started)
+    return analyze_context(ctx)
+
+
+def analyze_context(ctx: AnalysisContext) -> AnalysisResult:
+    """Same as analyze(), for a prebuilt context."""
+    started = time.perf_counter()
+    category, confidence, keywords = classify_context(ctx)
+    started = observe_stage("classify", started)
+    urgency = ctx.has(URGENCY_GROUP)
+    decision = ctx.snapshot.decisions.resolve(ctx.matches, urgency, category)
+    started = observe_stage("detect_priority", started)
+
+    # Custom rules may override the classifier's category and floor its confidence
+    if decision.category is not None:
+        category = decision.category
+    if decision.min_confidence is not None:
+        confidence = max(confidence, decision.min_confidence)
+    observe_stage("overrides", started)
 
     return AnalysisResult(
         category=category,
-        priority=priority,
+        priority=decision.priority,
         urgency=urgency,
         confidence=round(confidence, 4),
         keywords=list(dict.fromkeys(keywords)),  # deduplicate, preserve order
-        custom_flags=custom_flags,
+        custom_flags=list(decision.flags),
+        rules_version=ctx.snapshot.version,
     )
@@ -0,0 +1,201 @@
+"""
+Bulk offline analyzer – re-score ticket archives from the command line.
+
+    python -m app.analyzers.bulk tickets.jsonl -o scored.jsonl --workers 8
+
+Strategy:
+  1. Stream records from a JSONL or CSV file (each needs subject + description;
+     any other fields are passed through untouched).
+  2. Group them into chunks of ``chunksize`` records and fan the chunks out
+     to a process pool (Pool.imap), keeping input order.  Each chunk is
+     scored with one columnar analyze_many() call (app.analyzers.vectorized)
+     instead of one analyze() call per record.
+  3. Stream results to JSONL or CSV as they complete.
+  4. Report progress and final throughput on stderr.
+
+Nothing is buffered beyond the pool's in-flight chunks, so archives of
+millions of tickets run in constant memory.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+from multiprocessing import Pool
+from typing import IO, Any, Iterable, Iterator, Optional, Sequence
+
+from app.analyzers.analyzer import analyze
+from app.analyzers.rules import compile_rules, install_snapshot, load_rules_file
+from app.analyzers.vectorized import analyze_many
+
+DEFAULT_CHUNKSIZE = 1000
+PROGRESS_EVERY = 100_000
+RESULT_FIELDS = [
+    "category", "priority", "urgency", "confidence", "keywords", "custom_flags", "rules_version",
+]
+
+
+_RECORD_ERROR = "record needs string 'subject' and 'description' fields"
+
+
+def _has_text(record: dict[str, Any]) -> bool:
+    return isinstance(record.get("subject"), str) and isinstance(record.get("description"), str)
+
+
+def analyze_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Analyze one input record; records without usable text get an ``error`` field."""
+    if not _has_text(record):
+        return {**record, "error": _RECORD_ERROR}
+    result = analyze(record["subject"].strip(), record["description"].strip())
+    return {**record, **asdict(result)}
+
+
+def analyze_records(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Same as analyze_record() for every record, with one analyze_many() call for the chunk."""
+    valid = [record for record in records if _has_text(record)]
+    batch = analyze_many(
+        [record["subject"].strip() for record in valid],
+        [record["description"].strip() for record in valid],
+    )
+    results = iter(batch.to_results())
+    return [
+        {**record, **asdict(next(results))} if _has_text(record) else {**record, "error": _RECORD_ERROR}
+        for record in records
+    ]
+
+
+def _chunks(records: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    records = iter(records)
+    while chunk := list(itertools.islice(records, size)):
+        yield chunk
+
+
+def use_rules_file(path: Optional[str]) -> None:
+    """Install a rules file as the active rule set (also used as the pool initializer)."""
+    if path is not None:
+        install_snapshot(compile_rules(load_rules_file(path), source=path))
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[dict[str, Any]]:
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class _JsonlWriter:
+    def __init__(self, stream: IO[str]) -> None:
+        self._stream = stream
+
+    def write(self, row: dict[str, Any]) -> None:
+        self._stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class _CsvWriter:
+    """Header comes from the first row: its input fields followed by the result fields."""
+
+    def __init__(self, stream: IO[str]) -> None:
+        self._stream = stream
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, row: dict[str, Any]) -> None:
+        if self._writer is None:
+            input_fields = [k for k in row if k not in RESULT_FIELDS and k != "error"]
+            self._writer = csv.DictWriter(
+                self._stream,
+                fieldnames=input_fields + RESULT_FIELDS + ["error"],
+                extrasaction="ignore",
+            )
+            self._writer.writeheader()
+        self._writer.writerow({
+            k: json.dumps(v, ensure_ascii=False) if isinstance(v, list) else v
+            for k, v in row.items()
+        })
+
+
+def run(
+    records: Iterable[dict[str, Any]],
+    writer: Any,
+    workers: int,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: Optional[IO[str]] = None,
+    rules_file: Optional[str] = None,
+) -> int:
+    """Analyze ``records`` on ``workers`` processes, writing results in input order."""
+    use_rules_file(rules_file)
+    start = time.perf_counter()
+    count = 0
+
+    def emit(chunks: Iterable[list[dict[str, Any]]]) -> None:
+        nonlocal count
+        for rows in chunks:
+            for row in rows:
+                writer.write(row)
+                count += 1
+                if progress is not None and count % PROGRESS_EVERY == 0:
+                    _report(progress, count, time.perf_counter() - start)
+
+    if workers <= 1:
+        emit(map(analyze_records, _chunks(records, chunksize)))
+    else:
+        with Pool(processes=workers, initializer=use_rules_file, initargs=(rules_file,)) as pool:
+            emit(pool.imap(analyze_records, _chunks(records, chunksize)))
+
+    if progress is not None:
+        _report(progress, count, time.perf_counter() - start, final=True)
+    return count
+
+
+def _report(stream: IO[str], count: int, elapsed: float, final: bool = False) -> None:
+    rate = count / elapsed if elapsed > 0 else 0.0
+    label = "done" if final else "progress"
+    stream.write(f"[bulk] {label}: {count} tickets in {elapsed:.2f}s ({rate:,.0f} tickets/s)\n")
+    stream.flush()
+
+
+def _detect_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.analyzers.bulk",
+        description="Analyze a JSONL/CSV file of tickets on all cores.",
+    )
+    parser.add_argument("input", help="input file (.jsonl or .csv), '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file (.jsonl or .csv), default stdout")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"])
+    parser.add_argument("--output-format", choices=["jsonl", "csv"])
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--rules", help="JSON/YAML rules file to score with (default: built-in rules)")
+    args = parser.parse_args(argv)
+
+    in_fmt = _detect_format(args.input, args.input_format)
+    out_fmt = _detect_format(args.output, args.output_format)
+
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        writer = _CsvWriter(dst) if out_fmt == "csv" else _JsonlWriter(dst)
+        run(
+            read_records(src, in_fmt), writer, args.workers, args.chunksize,
+            progress=sys.stderr, rules_file=args.rules,
+        )
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+In-process LRU cache of analysis results – pure, no I/O.
+
+Strategy:
+  1. Key = (rule-set version, blake2b digest of the normalised text).  The
+     normalised text is exactly what the pipeline reads ("subject description",
+     lowercased), so equal keys always give equal results; whitespace is NOT
+     collapsed because multi-word keywords match on the raw spacing.
+  2. The version in the key makes a rule reload invalidate every entry; the
+     cache is also cleared on each snapshot swap so stale entries free memory.
+  3. Entries are evicted least-recently-used once ``maxsize`` is reached.
+
+Results are stored and returned as copies, so callers may mutate what they get.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+CacheKey = Tuple[str, bytes]
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    maxsize: int
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def cache_key(version: str, text: str) -> CacheKey:
+    """Key for an already-normalised text under rule-set ``version``."""
+    return version, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class AnalysisCache:
+    """Bounded, thread-safe LRU mapping CacheKey -> result."""
+
+    def __init__(self, maxsize: int, copy: Callable = lambda value: value) -> None:
+        self.maxsize = maxsize
+        self._copy = copy
+        self._data: "OrderedDict[CacheKey, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey) -> Optional[object]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return self._copy(value)
+
+    def put(self, key: CacheKey, value: object) -> None:
+        if self.maxsize <= 0:
+            return
+        value = self._copy(value)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                maxsize=self.maxsize,
+                size=len(self._data),
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+            )
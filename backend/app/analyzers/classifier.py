@@ -2,18 +2,19 @@
 Category classifier – pure function, no I/O.
 
 Strategy:
-  1. Lowercase combined text (subject + description).
-  2. Count keyword hits per category (using config.CATEGORY_KEYWORDS).
+  1. Read the shared AnalysisContext (text lowercased + scanned once).
+  2. Count keyword hits per category (the rule set's category groups,
+     config.CATEGORY_KEYWORDS by default).
   3. Winning category = highest hit count.
   4. Confidence = winner_hits / total_hits  (floored at 0.3 when nothing matches).
   5. Return (category, confidence, matched_keywords).
 """
 from typing import Tuple
 
-from app.config import CATEGORY_KEYWORDS
+from app.analyzers.context import AnalysisContext
+from app.analyzers.rules import OTHER_CATEGORY
 
 MIN_CONFIDENCE = 0.3
-OTHER_CATEGORY = "Other"
 
 
 def classify(subject: str, description: str) -> Tuple[str, float, list[str]]:
@@ -23,14 +24,12 @@ def classify(subject: str, description: str) -> Tuple[str, float, list[str]]:
     Returns:
         (category, confidence, matched_keywords)
     """
-    text = f"{subject} {description}".lower()
+    return classify_context(AnalysisContext(subject, description))
 
-    hits: dict[str, list[str]] = {cat: [] for cat in CATEGORY_KEYWORDS}
 
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for kw in keywords:
-            if kw in text:
-                hits[category].append(kw)
+def classify_context(ctx: AnalysisContext) -> Tuple[str, float, list[str]]:
+    """Same as classify(), reading keyword hits from a prebuilt context."""
+    hits: dict[str, list[str]] = {cat: ctx.keywords(cat) for cat in ctx.rules.categories}
 
     # Tally
     counts = {cat: len(kws) for cat, kws in hits.items()}
@@ -46,3 +45,4 @@ def classify(subject: str, description: str) -> Tuple[str, float, list[str]]:
     matched = [kw for kws in hits.values() for kw in kws]
 
     return winner, confidence, matched
+
@@ -0,0 +1,56 @@
+"""
+Per-ticket analysis context – pure, no I/O.
+
+Built once per ticket and shared by every analysis stage, so the combined text
+is normalised and scanned exactly once:
+  - snapshot: the rule snapshot captured for this analysis (rules + matcher)
+  - text    : lowercased "subject description"
+  - hits    : every keyword occurrence, tagged with its rule groups
+  - matches : group -> matched keywords (config order, unique)
+  - tokens  : (start, end) offsets of word tokens in ``text`` (computed lazily)
+"""
+import re
+from functools import cached_property
+from typing import Optional
+
+from app.analyzers.matcher import KeywordHit
+from app.analyzers.rules import RuleSet, RuleSnapshot, current_snapshot
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalise_text(subject: str, description: str) -> str:
+    """The text every stage reads; analysis results depend on nothing else."""
+    return f"{subject} {description}".lower()
+
+
+class AnalysisContext:
+    def __init__(
+        self,
+        subject: str,
+        description: str,
+        snapshot: Optional[RuleSnapshot] = None,
+    ) -> None:
+        self.snapshot = snapshot or current_snapshot()
+        self.subject = subject
+        self.description = description
+        self.text = normalise_text(subject, description)
+        self.hits: list[KeywordHit] = self.snapshot.matcher.scan(self.text)
+        self.matches: dict[str, list[str]] = self.snapshot.matcher.group_hits(self.hits)
+
+    @property
+    def rules(self) -> RuleSet:
+        return self.snapshot.rules
+
+    @cached_property
+    def tokens(self) -> list[tuple[int, int]]:
+        """Word-token offsets into ``text``; only computed when a stage asks for them."""
+        return [m.span() for m in _TOKEN_RE.finditer(self.text)]
+
+    def has(self, group: str) -> bool:
+        """True if any keyword of ``group`` occurs in the text."""
+        return group in self.matches
+
+    def keywords(self, group: str) -> list[str]:
+        """Matched keywords of ``group`` (empty list when none matched)."""
+        return self.matches.get(group, [])
@@ -0,0 +1,148 @@
+"""
+Compiled keyword matcher – pure, no I/O.
+
+Strategy:
+  1. Merge every keyword group of a rule set into one prefix trie.
+  2. Render the trie as a single regex wrapped in a zero-width lookahead, so one
+     pass reports the longest keyword starting at every offset (overlaps included).
+  3. Expand each hit to the shorter keywords that are prefixes of it – they
+     necessarily match at the same offset.
+  4. Tag every hit with each rule group that owns the keyword.
+
+Matching semantics are identical to ``kw in text`` per keyword: plain substring
+search over already-lowercased text, no word boundaries.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+# Group name under which urgency keywords are registered; categories and
+# custom rules use their category name / flag as group name.
+URGENCY_GROUP = "urgency"
+
+# Joins the texts of a scan_joined() batch.  A NUL inside a text is replaced
+# by NUL_STANDIN first, so only separators end a text; keywords contain
+# neither character, so the replacement never changes what matches.
+BATCH_SEPARATOR = "\x00"
+NUL_STANDIN = "\x01"
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    keyword: str
+    start: int
+    groups: Tuple[str, ...]
+
+
+class KeywordMatcher:
+    """One-pass multi-keyword matcher built from named keyword groups."""
+
+    def __init__(self, groups: Mapping[str, Sequence[str]]) -> None:
+        self._groups: Dict[str, Tuple[str, ...]] = {
+            name: tuple(kw.lower() for kw in keywords) for name, keywords in groups.items()
+        }
+
+        owners: Dict[str, List[str]] = {}
+        for name, keywords in self._groups.items():
+            for kw in keywords:
+                if not kw:
+                    raise ValueError(f"empty keyword in group {name!r}")
+                group_list = owners.setdefault(kw, [])
+                if name not in group_list:
+                    group_list.append(name)
+        self._owners: Dict[str, Tuple[str, ...]] = {kw: tuple(g) for kw, g in owners.items()}
+
+        # Every keyword that matches at an offset is a prefix of the longest one
+        # matching there, so the expansion can be precomputed per keyword.
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            kw: tuple(p for p in owners if kw.startswith(p)) for kw in owners
+        }
+        trie = _trie_regex(owners)
+        self._pattern = re.compile(f"(?=({trie}))") if owners else None
+        # Same lookahead, or the text separator – a match whose group is empty
+        self._joined_pattern = re.compile(f"(?=({trie}))|{re.escape(BATCH_SEPARATOR)}") if owners else None
+
+    @property
+    def groups(self) -> Dict[str, Tuple[str, ...]]:
+        return dict(self._groups)
+
+    @property
+    def keywords(self) -> Tuple[str, ...]:
+        """Every distinct keyword, in the order the groups first list them."""
+        return tuple(self._owners)
+
+    @property
+    def prefixes(self) -> Dict[str, Tuple[str, ...]]:
+        """keyword -> every keyword that matches wherever it does (itself included)."""
+        return dict(self._prefixes)
+
+    def scan_joined(self, texts: Sequence[str]) -> list[str]:
+        """
+        Scan many texts (expected lowercase) in one regex pass; only valid
+        when no keyword contains NUL or NUL_STANDIN.  Returns the longest
+        keyword at every offset with a hit, in text order, with an empty string after each text's hits – so the
+        i-th "" closes text i.  Batch callers expand prefixes and tag groups
+        themselves, with lookup tables (see ``keywords`` / ``prefixes``).
+        """
+        if self._joined_pattern is None:
+            return [""] * len(texts)
+        if not texts:
+            return []
+        joined = BATCH_SEPARATOR.join(texts) + BATCH_SEPARATOR
+        if joined.count(BATCH_SEPARATOR) != len(texts):
+            joined = BATCH_SEPARATOR.join(t.replace(BATCH_SEPARATOR, NUL_STANDIN) for t in texts) + BATCH_SEPARATOR
+        return self._joined_pattern.findall(joined)
+
+    def scan(self, text: str) -> list[KeywordHit]:
+        """Return every keyword occurrence in ``text`` (expected lowercase), in text order."""
+        if self._pattern is None:
+            return []
+        hits: list[KeywordHit] = []
+        prefixes = self._prefixes
+        owners = self._owners
+        for m in self._pattern.finditer(text):
+            start = m.start()
+            for kw in prefixes[m.group(1)]:
+                hits.append(KeywordHit(kw, start, owners[kw]))
+        return hits
+
+    def group_hits(self, hits: Iterable[KeywordHit]) -> dict[str, list[str]]:
+        """
+        Collapse hits into ``group -> matched keywords``.
+
+        Only groups with at least one hit are present; keywords are unique and
+        listed in the group's configured order.
+        """
+        found = {hit.keyword for hit in hits}
+        matched: dict[str, list[str]] = {}
+        for name, keywords in self._groups.items():
+            kws = [kw for kw in keywords if kw in found]
+            if kws:
+                matched[name] = kws
+        return matched
+
+    def match(self, text: str) -> dict[str, list[str]]:
+        """Scan ``text`` and return ``group -> matched keywords``."""
+        return self.group_hits(self.scan(text))
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """Render keywords as a prefix-factored alternation that prefers the longest match."""
+    trie: dict = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # Greedy optional: try the longer continuation first, fall back to this prefix
+        return f"(?:{body})?" if terminal else body
+
+    return render(trie)
+
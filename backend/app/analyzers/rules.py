@@ -0,0 +1,428 @@
+"""
+Rule sets and compiled rule snapshots.
+
+A RuleSet is the validated, immutable form of every analysis rule (category
+keywords, urgency keywords, custom rules, priority ladder).  It is built from
+app.config by default, or from a JSON/YAML rules file.
+
+compile_rules() turns a RuleSet into a RuleSnapshot: the rule set plus its
+compiled KeywordMatcher, its DecisionTable and a content version.  The active snapshot is a single
+module-level reference, so swapping it is atomic – an analysis that captured
+the previous snapshot finishes with it and never sees a half-built rule set.
+"""
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, List, Mapping, Optional, Tuple
+
+from app.analyzers.matcher import URGENCY_GROUP, KeywordMatcher
+from app.config import CATEGORY_KEYWORDS, CUSTOM_RULES, PRIORITY_LADDER, URGENCY_KEYWORDS
+
+PRIORITY_ORDER: Tuple[str, ...] = ("P0", "P1", "P2", "P3")
+OTHER_CATEGORY = "Other"
+
+
+class RuleValidationError(ValueError):
+    """Raised when a rules document is malformed; the active snapshot is left untouched."""
+
+
+@dataclass(frozen=True)
+class CustomRule:
+    flag: str
+    keywords: Tuple[str, ...]
+    priority: Optional[str] = None        # escalate to at least this priority
+    category: Optional[str] = None        # category override
+    min_confidence: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class LadderStep:
+    priority: str
+    requires_urgency: bool
+    categories: Optional[Tuple[str, ...]] = None   # None = any category
+
+    def applies(self, urgency: bool, category: str) -> bool:
+        return (urgency or not self.requires_urgency) and (self.categories is None or category in self.categories)
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    categories: Dict[str, Tuple[str, ...]]
+    urgency: Tuple[str, ...]
+    custom_rules: Tuple[CustomRule, ...]           # precedence order; first match wins
+    ladder: Tuple[LadderStep, ...]                 # top-down; first match wins
+    rules_by_flag: Dict[str, CustomRule] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "rules_by_flag", {r.flag: r for r in self.custom_rules})
+
+    def keyword_groups(self) -> Dict[str, Tuple[str, ...]]:
+        """Matcher groups: one per category, one for urgency, one per custom rule flag."""
+        return {
+            **self.categories,
+            URGENCY_GROUP: self.urgency,
+            **{rule.flag: rule.keywords for rule in self.custom_rules},
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise to the rules-file document shape."""
+        return {
+            "categories": {name: list(kws) for name, kws in self.categories.items()},
+            "urgency": list(self.urgency),
+            "rules": [
+                {
+                    "flag": r.flag,
+                    "keywords": list(r.keywords),
+                    "priority": r.priority,
+                    "category": r.category,
+                    "min_confidence": r.min_confidence,
+                }
+                for r in self.custom_rules
+            ],
+            "ladder": [
+                {
+                    "priority": step.priority,
+                    "requires_urgency": step.requires_urgency,
+                    "categories": list(step.categories) if step.categories is not None else None,
+                }
+                for step in self.ladder
+            ],
+        }
+
+    @classmethod
+    def from_config(cls) -> "RuleSet":
+        return cls.from_dict({})
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "RuleSet":
+        """
+        Validate a rules document.  Omitted sections fall back to app.config,
+        so a file may override only e.g. ``rules``.
+        """
+        if not isinstance(data, Mapping):
+            raise RuleValidationError("rules document must be a mapping")
+        unknown = set(data) - {"categories", "urgency", "rules", "ladder"}
+        if unknown:
+            raise RuleValidationError(f"unknown sections: {sorted(unknown)}")
+
+        raw_categories = data.get("categories", CATEGORY_KEYWORDS)
+        if not isinstance(raw_categories, Mapping) or not raw_categories:
+            raise RuleValidationError("categories must be a non-empty mapping")
+        categories = {
+            _text(name, "category name"): _keywords(kws, f"categories.{name}")
+            for name, kws in raw_categories.items()
+        }
+        if OTHER_CATEGORY in categories:
+            raise RuleValidationError(f"{OTHER_CATEGORY!r} is reserved for unmatched tickets")
+        known_categories = set(categories) | {OTHER_CATEGORY}
+
+        urgency = _keywords(data.get("urgency", URGENCY_KEYWORDS), "urgency")
+
+        raw_rules = data.get("rules")
+        if raw_rules is None:
+            raw_rules = [
+                {"flag": f, "keywords": k, "priority": p, "category": c, "min_confidence": m}
+                for f, k, p, c, m in CUSTOM_RULES
+            ]
+        if not isinstance(raw_rules, list):
+            raise RuleValidationError("rules must be a list")
+        custom_rules = tuple(
+            _custom_rule(raw, i, known_categories) for i, raw in enumerate(raw_rules)
+        )
+
+        raw_ladder = data.get("ladder")
+        if raw_ladder is None:
+            raw_ladder = [
+                {"priority": p, "requires_urgency": u, "categories": c}
+                for p, u, c in PRIORITY_LADDER
+            ]
+        if not isinstance(raw_ladder, list) or not raw_ladder:
+            raise RuleValidationError("ladder must be a non-empty list")
+        ladder = tuple(_ladder_step(raw, i, known_categories) for i, raw in enumerate(raw_ladder))
+        last = ladder[-1]
+        if last.requires_urgency or last.categories is not None:
+            raise RuleValidationError("the last ladder step must be a catch-all")
+
+        names = list(categories) + [URGENCY_GROUP] + [r.flag for r in custom_rules]
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            raise RuleValidationError(f"duplicate category/flag names: {duplicates}")
+
+        return cls(categories=categories, urgency=urgency, custom_rules=custom_rules, ladder=ladder)
+
+
+# ---------------------------------------------------------------------------
+# Decision table
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Decision:
+    """Everything the custom rules and the ladder decide for one ticket."""
+    priority: str
+    category: Optional[str]            # category override; None = keep the classifier's
+    flags: Tuple[str, ...]
+    min_confidence: Optional[float]    # confidence floor; None = no floor
+
+
+class DecisionTable:
+    """
+    The ladder and the custom rules of a rule set, resolved ahead of time for
+    every (rule-hit bitmask, urgency, category).
+
+    Bit ``i`` of the mask is set when custom rule ``i`` (precedence order) has
+    a keyword hit.  The first rule with a hit wins and the others are ignored,
+    so a mask decides exactly what its lowest set bit decides: the table holds
+    one row per winning rule (or none) × urgency × category, and decide()
+    reduces the mask to its lowest bit.  That keeps the table linear in the
+    number of rules instead of 2 ** rules, and every lookup O(1).
+
+    Priority is the ladder's, escalated (never lowered) to the winning rule's
+    priority; the rule's category override and confidence floor are carried
+    along for the analyzer to apply.
+
+    A (winning rule, urgency) pair is *decisive* when the classifier's
+    category can no longer change the outcome: the rule overrides the
+    category and the escalated priority is the same for every category.
+    settled() returns that decision; the export marks such rows so rule
+    authors can see which rules ignore the classifier entirely.
+    """
+
+    def __init__(self, rules: RuleSet) -> None:
+        self.flags: Tuple[str, ...] = tuple(rule.flag for rule in rules.custom_rules)
+        self.categories: Tuple[str, ...] = (*rules.categories, OTHER_CATEGORY)
+        self._bits = {flag: 1 << i for i, flag in enumerate(self.flags)}
+        self._category_index = {name: i for i, name in enumerate(self.categories)}
+        # Flat table: [(winner * 2 + urgency) * len(categories) + category], winner 0 = no rule
+        self._decisions: Tuple[Decision, ...] = tuple(
+            _decide(rules, rule, urgency, category)
+            for rule in (None, *rules.custom_rules)
+            for urgency in (False, True)
+            for category in self.categories
+        )
+        # [winner * 2 + urgency] -> the decision when it holds for every category, else None
+        n = len(self.categories)
+        self._settled: Tuple[Optional[Decision], ...] = tuple(
+            row[0] if row[0].category is not None and len(set(row)) == 1 else None
+            for row in (self._decisions[i:i + n] for i in range(0, len(self._decisions), n))
+        )
+
+    def __len__(self) -> int:
+        return len(self._decisions)
+
+    def mask(self, groups: Collection[str]) -> int:
+        """Rule-hit bitmask of the matched keyword groups (other groups are ignored)."""
+        bits = self._bits
+        mask = 0
+        for group in groups:
+            mask |= bits.get(group, 0)
+        return mask
+
+    def index(self, mask: int, urgency: bool, category: str) -> int:
+        winner = (mask & -mask).bit_length()       # 0 = no rule hit, else 1 + first rule with a hit
+        return (winner * 2 + urgency) * len(self.categories) + self._category_index[category]
+
+    def decide(self, mask: int, urgency: bool, category: str) -> Decision:
+        return self._decisions[self.index(mask, urgency, category)]
+
+    def settled(self, mask: int, urgency: bool) -> Optional[Decision]:
+        """The decision if it no longer depends on the category (decisive rule), else None."""
+        return self._settled[(mask & -mask).bit_length() * 2 + urgency]
+
+    def resolve(self, matches: Collection[str], urgency: bool, category: str) -> Decision:
+        """decide() for the matcher's group -> keywords output."""
+        return self._decisions[self.index(self.mask(matches), urgency, category)]
+
+    @property
+    def decisions(self) -> Tuple[Decision, ...]:
+        """Every row, in index() order."""
+        return self._decisions
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """
+        The table for auditing, one row per (winning rule, urgency, category).
+
+        ``mask`` is the rule-hit pattern the row covers, one character per
+        custom rule in precedence order: ``1`` the rule hit, ``0`` it must not
+        have, ``-`` either (a rule after the winner never matters).
+        ``decisive`` rows give the same decision whatever the category.
+        """
+        rows = []
+        n = len(self.flags)
+        for position, decision in enumerate(self._decisions):
+            rest, category = divmod(position, len(self.categories))
+            winner, urgency = divmod(rest, 2)
+            mask = "0" * n if winner == 0 else "0" * (winner - 1) + "1" + "-" * (n - winner)
+            rows.append({
+                "rule": self.flags[winner - 1] if winner else None,
+                "mask": mask,
+                "urgency": bool(urgency),
+                "category": self.categories[category],
+                "priority": decision.priority,
+                "category_override": decision.category,
+                "flags": list(decision.flags),
+                "min_confidence": decision.min_confidence,
+                "decisive": self._settled[rest] is not None,
+            })
+        return rows
+
+
+def _decide(rules: RuleSet, rule: Optional[CustomRule], urgency: bool, category: str) -> Decision:
+    priority = next((step.priority for step in rules.ladder if step.applies(urgency, category)), "P3")
+    if rule is None:
+        return Decision(priority=priority, category=None, flags=(), min_confidence=None)
+    if rule.priority is not None and PRIORITY_ORDER.index(rule.priority) < PRIORITY_ORDER.index(priority):
+        priority = rule.priority
+    return Decision(priority=priority, category=rule.category, flags=(rule.flag,), min_confidence=rule.min_confidence)
+
+
+# ---------------------------------------------------------------------------
+# Snapshots and rules files
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    rules: RuleSet
+    matcher: KeywordMatcher
+    decisions: DecisionTable
+    version: str
+    source: str
+    loaded_at: datetime
+
+
+def compile_rules(rules: RuleSet, source: str = "config") -> RuleSnapshot:
+    """Compile a rule set into an immutable, ready-to-use snapshot."""
+    digest = hashlib.sha256(json.dumps(rules.to_dict()).encode()).hexdigest()[:12]
+    return RuleSnapshot(
+        rules=rules,
+        matcher=KeywordMatcher(rules.keyword_groups()),
+        decisions=DecisionTable(rules),
+        version=digest,
+        source=source,
+        loaded_at=datetime.now(timezone.utc),
+    )
+
+
+def load_rules_file(path: str) -> RuleSet:
+    """Parse and validate a JSON (.json) or YAML (.yaml/.yml) rules file."""
+    file = Path(path)
+    try:
+        content = file.read_text(encoding="utf-8")
+    except OSError as exc:
+        raise RuleValidationError(f"cannot read rules file {path}: {exc}") from exc
+
+    if file.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise RuleValidationError("PyYAML is required for YAML rules files") from exc
+        try:
+            data = yaml.safe_load(content)
+        except yaml.YAMLError as exc:
+            raise RuleValidationError(f"invalid YAML in {path}: {exc}") from exc
+    else:
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as exc:
+            raise RuleValidationError(f"invalid JSON in {path}: {exc}") from exc
+
+    return RuleSet.from_dict(data or {})
+
+
+def _text(value: Any, what: str) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise RuleValidationError(f"{what} must be a non-empty string")
+    return value.strip()
+
+
+def _keywords(value: Any, where: str) -> Tuple[str, ...]:
+    if not isinstance(value, (list, tuple)) or not value:
+        raise RuleValidationError(f"{where} must be a non-empty list of keywords")
+    # Text is lowercased before matching, so keywords must be too
+    return tuple(dict.fromkeys(_text(kw, f"keyword in {where}").lower() for kw in value))
+
+
+def _custom_rule(raw: Any, index: int, known_categories: set) -> CustomRule:
+    where = f"rules[{index}]"
+    if not isinstance(raw, Mapping):
+        raise RuleValidationError(f"{where} must be a mapping")
+    unknown = set(raw) - {"flag", "keywords", "priority", "category", "min_confidence"}
+    if unknown:
+        raise RuleValidationError(f"{where}: unknown fields {sorted(unknown)}")
+
+    priority = raw.get("priority")
+    if priority is not None and priority not in PRIORITY_ORDER:
+        raise RuleValidationError(f"{where}.priority must be one of {PRIORITY_ORDER} or null")
+    category = raw.get("category")
+    if category is not None and category not in known_categories:
+        raise RuleValidationError(f"{where}.category {category!r} is not a known category")
+    min_confidence = raw.get("min_confidence")
+    if min_confidence is not None:
+        if isinstance(min_confidence, bool) or not isinstance(min_confidence, (int, float)) \
+                or not 0.0 <= min_confidence <= 1.0:
+            raise RuleValidationError(f"{where}.min_confidence must be between 0 and 1")
+        min_confidence = float(min_confidence)
+
+    return CustomRule(
+        flag=_text(raw.get("flag"), f"{where}.flag"),
+        keywords=_keywords(raw.get("keywords"), f"{where}.keywords"),
+        priority=priority,
+        category=category,
+        min_confidence=min_confidence,
+    )
+
+
+def _ladder_step(raw: Any, index: int, known_categories: set) -> LadderStep:
+    where = f"ladder[{index}]"
+    if not isinstance(raw, Mapping):
+        raise RuleValidationError(f"{where} must be a mapping")
+    priority = raw.get("priority")
+    if priority not in PRIORITY_ORDER:
+        raise RuleValidationError(f"{where}.priority must be one of {PRIORITY_ORDER}")
+    requires_urgency = raw.get("requires_urgency", False)
+    if not isinstance(requires_urgency, bool):
+        raise RuleValidationError(f"{where}.requires_urgency must be a boolean")
+    categories = raw.get("categories")
+    if categories is not None:
+        if not isinstance(categories, (list, tuple)) or not categories:
+            raise RuleValidationError(f"{where}.categories must be a non-empty list or null")
+        unknown = [c for c in categories if c not in known_categories]
+        if unknown:
+            raise RuleValidationError(f"{where}.categories: unknown categories {unknown}")
+        categories = tuple(categories)
+    return LadderStep(priority=priority, requires_urgency=requires_urgency, categories=categories)
+
+
+# ---------------------------------------------------------------------------
+# Active snapshot
+# ---------------------------------------------------------------------------
+
+DEFAULT_RULES = RuleSet.from_config()
+
+_active: RuleSnapshot = compile_rules(DEFAULT_RULES)
+_swap_lock = threading.Lock()
+_listeners: List[Callable[[RuleSnapshot], None]] = []
+
+
+def current_snapshot() -> RuleSnapshot:
+    """The active snapshot.  Capture it once per analysis and use it throughout."""
+    return _active
+
+
+def install_snapshot(snapshot: RuleSnapshot) -> RuleSnapshot:
+    """Atomically make ``snapshot`` the active one and notify listeners."""
+    global _active
+    with _swap_lock:
+        _active = snapshot
+    for listener in list(_listeners):
+        listener(snapshot)
+    return snapshot
+
+
+def on_snapshot_change(listener: Callable[[RuleSnapshot], None]) -> None:
+    """Register a callback run after every snapshot swap (e.g. cache invalidation)."""
+    _listeners.append(listener)
@@ -0,0 +1,331 @@
+"""
+Columnar batch analysis – analyze_many() over sequences / arrays of texts.
+
+    batch = analyze_many(df["subject"], df["description"])
+    df = df.assign(**batch.to_columns())
+
+Gives the same result as analyze() for every ticket, but the per-ticket
+Python work is only building the text and collecting its keyword hits;
+everything after the scan is array arithmetic over the whole batch.
+
+Strategy:
+  1. Tickets are taken CHUNK_SIZE at a time.  A chunk's normalised texts are
+     scanned by the snapshot's compiled matcher in one regex pass over the
+     NUL-joined chunk (KeywordMatcher.scan_joined).  The hits come back as
+     one flat list with an end marker per text, so a cumulative sum maps
+     every hit to its ticket.  No keyword contains NUL, so no hit can span
+     two tickets.
+  2. Hits, expanded to the keywords they imply, fill a ticket × keyword
+     presence matrix.  One matrix product with the keyword × group
+     membership matrix gives the ticket × group hit-count matrix – a
+     category's count is its number of distinct matched keywords, exactly as
+     in classify().
+  3. Category (first maximum), confidence, urgency and the custom flag
+     (first rule with a hit, in precedence order) are array operations.
+     Priority, category override and confidence floor are one gather from
+     the snapshot's DecisionTable, indexed by winning rule × urgency ×
+     category.  Confidence values are rounded with Python's round()
+     once per distinct (winner hits, total hits) pair, so they match
+     analyze() bit for bit.
+  4. The result stays columnar: an AnalysisBatch holds code / bool / float
+     arrays and the matched keywords in CSR form (offsets + keyword ids).
+     Python lists and AnalysisResult objects are only built on request.
+
+The result cache and stage metrics are bypassed; this is for offline and
+batch scoring, not for the request path.  Requires NumPy.
+"""
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.analyzers.analyzer import AnalysisResult
+from app.analyzers.classifier import MIN_CONFIDENCE
+from app.analyzers.matcher import BATCH_SEPARATOR, NUL_STANDIN, URGENCY_GROUP
+from app.analyzers.rules import OTHER_CATEGORY, PRIORITY_ORDER, RuleSnapshot, current_snapshot
+
+CHUNK_SIZE = 10_000
+
+
+# ---------------------------------------------------------------------------
+# Columnar result
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class AnalysisBatch:
+    """
+    Analysis results for ``len(batch)`` tickets, one array per field.
+
+    Codes index the label tuples: ``category_labels[category_codes[i]]``,
+    ``PRIORITY_ORDER[priority_codes[i]]``, ``flag_labels[flag_codes[i]]``
+    (-1 = no flag).  Ticket i's keywords are
+    ``keyword_labels[keyword_ids[keyword_offsets[i]:keyword_offsets[i + 1]]]``.
+    With pandas, ``pd.Categorical.from_codes(batch.category_codes,
+    batch.category_labels)`` keeps a column categorical without any copying.
+    """
+    rules_version: str
+    category_labels: Tuple[str, ...]
+    flag_labels: Tuple[str, ...]
+    keyword_labels: Tuple[str, ...]
+    category_codes: np.ndarray      # int16
+    priority_codes: np.ndarray      # int8
+    urgency: np.ndarray             # bool
+    confidence: np.ndarray          # float64
+    flag_codes: np.ndarray          # int16
+    keyword_offsets: np.ndarray     # int64, len(batch) + 1
+    keyword_ids: np.ndarray         # int32
+
+    def __len__(self) -> int:
+        return len(self.category_codes)
+
+    @property
+    def category(self) -> np.ndarray:
+        return np.array(self.category_labels, dtype=object)[self.category_codes]
+
+    @property
+    def priority(self) -> np.ndarray:
+        return np.array(PRIORITY_ORDER, dtype=object)[self.priority_codes]
+
+    @property
+    def custom_flags(self) -> List[List[str]]:
+        labels = self.flag_labels
+        return [[labels[code]] if code >= 0 else [] for code in self.flag_codes.tolist()]
+
+    @property
+    def keywords(self) -> List[List[str]]:
+        labels = self.keyword_labels
+        ids = self.keyword_ids.tolist()
+        offsets = self.keyword_offsets.tolist()
+        return [[labels[k] for k in ids[start:end]] for start, end in zip(offsets, offsets[1:])]
+
+    def result(self, index: int) -> AnalysisResult:
+        start, end = self.keyword_offsets[index], self.keyword_offsets[index + 1]
+        flag = int(self.flag_codes[index])
+        return AnalysisResult(
+            category=self.category_labels[self.category_codes[index]],
+            priority=PRIORITY_ORDER[self.priority_codes[index]],
+            urgency=bool(self.urgency[index]),
+            confidence=float(self.confidence[index]),
+            keywords=[self.keyword_labels[k] for k in self.keyword_ids[start:end].tolist()],
+            custom_flags=[self.flag_labels[flag]] if flag >= 0 else [],
+            rules_version=self.rules_version,
+        )
+
+    def to_results(self) -> List[AnalysisResult]:
+        """One AnalysisResult per ticket, for callers that want the row-wise shape."""
+        return [
+            AnalysisResult(category, priority, urgency, confidence, keywords, flags, self.rules_version)
+            for category, priority, urgency, confidence, keywords, flags in zip(
+                self.category.tolist(), self.priority.tolist(), self.urgency.tolist(),
+                self.confidence.tolist(), self.keywords, self.custom_flags,
+            )
+        ]
+
+    def to_columns(self) -> Dict[str, Any]:
+        """AnalysisResult fields as columns (arrays, or lists of lists for keywords / flags)."""
+        return {
+            "category": self.category,
+            "priority": self.priority,
+            "urgency": self.urgency,
+            "confidence": self.confidence,
+            "keywords": self.keywords,
+            "custom_flags": self.custom_flags,
+            "rules_version": np.full(len(self), self.rules_version, dtype=object),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Compiled lookup tables
+# ---------------------------------------------------------------------------
+
+
+class _BatchPlan:
+    """Everything analyze_many() needs from one rule snapshot, as arrays."""
+
+    def __init__(self, snapshot: RuleSnapshot) -> None:
+        rules, matcher = snapshot.rules, snapshot.matcher
+        self.snapshot = snapshot
+        keywords = matcher.keywords
+        if any(BATCH_SEPARATOR in kw or NUL_STANDIN in kw for kw in keywords):
+            raise ValueError("keywords containing NUL or \\x01 cannot be batch-scanned")
+        self.keyword_index = {kw: i for i, kw in enumerate(keywords)}
+        self.token_index = {**self.keyword_index, "": -1}
+
+        # Longest keyword at an offset -> every keyword it implies, flattened
+        prefixes = matcher.prefixes
+        implied = [[self.keyword_index[p] for p in prefixes[kw]] for kw in keywords]
+        self.implied_count = np.array([len(ids) for ids in implied], dtype=np.int64)
+        self.implied_start = np.concatenate(([0], np.cumsum(self.implied_count)[:-1]))
+        self.implied_ids = np.array([i for ids in implied for i in ids], dtype=np.int32)
+
+        # Keyword × group membership; columns: categories, urgency, custom rules
+        groups = matcher.groups
+        names = [*rules.categories, URGENCY_GROUP, *(rule.flag for rule in rules.custom_rules)]
+        self.membership = np.zeros((len(keywords), len(names)), dtype=np.float32)
+        for column, name in enumerate(names):
+            self.membership[[self.keyword_index[kw] for kw in groups[name]], column] = 1.0
+        self.n_categories = len(rules.categories)
+
+        self.category_labels = (*rules.categories, OTHER_CATEGORY)
+        category_code = {name: code for code, name in enumerate(self.category_labels)}
+        # classify() lists matched keywords category by category, deduplicated
+        self.keyword_labels = tuple(dict.fromkeys(kw for kws in rules.categories.values() for kw in kws))
+        self.keyword_columns = np.array([self.keyword_index[kw] for kw in self.keyword_labels], dtype=np.int32)
+
+        # The snapshot's DecisionTable as parallel arrays, same index() layout
+        decisions = snapshot.decisions.decisions
+        self.flag_labels = snapshot.decisions.flags
+        self.decision_priority = np.array([PRIORITY_ORDER.index(d.priority) for d in decisions], dtype=np.int8)
+        self.decision_category = np.array(
+            [category_code[d.category] if d.category is not None else -1 for d in decisions], dtype=np.int16,
+        )
+        self.decision_floor = np.array(
+            [round(d.min_confidence, 4) if d.min_confidence is not None else -1.0 for d in decisions],
+            dtype=np.float64,
+        )
+
+    def presence(self, texts: List[str]) -> np.ndarray:
+        """Ticket × keyword matrix: True where the keyword occurs in the ticket's text."""
+        tokens = self.snapshot.matcher.scan_joined(texts)
+        present = np.zeros((len(texts), len(self.keyword_index)), dtype=bool)
+        if len(tokens) == len(texts):
+            return present                   # only end-of-text markers: no hits
+
+        # "" (-1) closes a text, so a hit's row is the number of "" before it
+        ids = np.fromiter(map(self.token_index.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        ends = ids < 0
+        if np.count_nonzero(ends) != len(texts):
+            raise RuntimeError(f"batch scan found {np.count_nonzero(ends)} text boundaries for {len(texts)} texts")
+        rows = np.cumsum(ends)[~ends]
+        longest = ids[~ends]
+        # Expand every hit to the keywords it implies (itself plus its prefixes)
+        counts = self.implied_count[longest]
+        first = np.repeat(self.implied_start[longest], counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        present[np.repeat(rows, counts), self.implied_ids[first + within]] = True
+        return present
+
+    def run(self, texts: List[str]) -> AnalysisBatch:
+        n = len(texts)
+        rows = np.arange(n)
+        present = self.presence(texts)
+        counts = (present.astype(np.float32) @ self.membership).astype(np.int64)
+        nc = self.n_categories
+
+        # --- classify ---
+        category_counts = counts[:, :nc]
+        total = category_counts.sum(axis=1)
+        winner = np.argmax(category_counts, axis=1)
+        winner_hits = category_counts[rows, winner]
+        category = np.where(total > 0, winner, nc).astype(np.int16)
+        confidence = _confidence(winner_hits, total)
+
+        # --- urgency, first matching custom rule, decision table lookup ---
+        urgency = counts[:, nc] > 0
+        rule_hits = counts[:, nc + 1:] > 0
+        if rule_hits.shape[1]:
+            flag = np.where(rule_hits.any(axis=1), np.argmax(rule_hits, axis=1), -1).astype(np.int16)
+        else:
+            flag = np.full(n, -1, dtype=np.int16)
+        decision = ((flag.astype(np.int64) + 1) * 2 + urgency) * len(self.category_labels) + category
+        priority = self.decision_priority[decision]
+        override = self.decision_category[decision]
+        category = np.where(override >= 0, override, category).astype(np.int16)
+        confidence = np.maximum(confidence, self.decision_floor[decision])
+
+        # --- matched category keywords, in output order (CSR) ---
+        kw_rows, kw_cols = np.nonzero(present[:, self.keyword_columns])
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(kw_rows, minlength=n), out=offsets[1:])
+
+        return AnalysisBatch(
+            rules_version=self.snapshot.version,
+            category_labels=self.category_labels,
+            flag_labels=self.flag_labels,
+            keyword_labels=self.keyword_labels,
+            category_codes=category,
+            priority_codes=priority.astype(np.int8),
+            urgency=urgency,
+            confidence=confidence,
+            flag_codes=flag,
+            keyword_offsets=offsets,
+            keyword_ids=kw_cols.astype(np.int32),
+        )
+
+
+def _confidence(winner_hits: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """round(winner / total, 4) via Python's round() once per distinct pair; MIN_CONFIDENCE without hits."""
+    width = int(total.max(initial=0)) + 1
+    distinct, inverse = np.unique(winner_hits * width + total, return_inverse=True)
+    values = np.array(
+        [round(key // width / (key % width), 4) if key % width else MIN_CONFIDENCE for key in distinct.tolist()],
+        dtype=np.float64,
+    )
+    return values[inverse.reshape(-1)]
+
+
+_plan: Optional[_BatchPlan] = None
+
+
+def _plan_for(snapshot: RuleSnapshot) -> _BatchPlan:
+    global _plan
+    plan = _plan
+    if plan is None or plan.snapshot is not snapshot:
+        plan = _plan = _BatchPlan(snapshot)
+    return plan
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def analyze_many(
+    subjects: Iterable[str],
+    descriptions: Iterable[str],
+    snapshot: Optional[RuleSnapshot] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> AnalysisBatch:
+    """
+    Analyse ``subjects[i]`` / ``descriptions[i]`` pairs (lists, NumPy arrays,
+    pandas Series, any iterables of equal length) under ``snapshot`` (default:
+    the active rule set).  Memory is bounded by ``chunk_size`` tickets plus
+    the columnar result.
+    """
+    if hasattr(subjects, "__len__") and hasattr(descriptions, "__len__") and len(subjects) != len(descriptions):
+        raise ValueError(f"got {len(subjects)} subjects but {len(descriptions)} descriptions")
+    plan = _plan_for(snapshot or current_snapshot())
+    pairs = zip(subjects, descriptions)
+    parts = []
+    while True:
+        texts = [f"{subject} {description}".lower() for subject, description in itertools.islice(pairs, chunk_size)]
+        if not texts and parts:
+            break
+        parts.append(plan.run(texts))
+        if len(texts) < chunk_size:
+            break
+    return parts[0] if len(parts) == 1 else _concat(parts)
+
+
+def _concat(parts: List[AnalysisBatch]) -> AnalysisBatch:
+    first = parts[0]
+    offsets = [first.keyword_offsets]
+    base = first.keyword_offsets[-1]
+    for part in parts[1:]:
+        offsets.append(part.keyword_offsets[1:] + base)
+        base += part.keyword_offsets[-1]
+    return AnalysisBatch(
+        rules_version=first.rules_version,
+        category_labels=first.category_labels,
+        flag_labels=first.flag_labels,
+        keyword_labels=first.keyword_labels,
+        category_codes=np.concatenate([p.category_codes for p in parts]),
+        priority_codes=np.concatenate([p.priority_codes for p in parts]),
+        urgency=np.concatenate([p.urgency for p in parts]),
+        confidence=np.concatenate([p.confidence for p in parts]),
+        flag_codes=np.concatenate([p.flag_codes for p in parts]),
+        keyword_offsets=np.concatenate(offsets),
+        keyword_ids=np.concatenate([p.keyword_ids for p in parts]),
+    )
@@ -1,7 +1,11 @@
 """
 Config-driven keyword rules for the ticket analyzer.
 All classification logic is data — not hardcoded in functions.
+
+These constants are the built-in rule set.  A JSON/YAML rules file (RULES_FILE)
+can replace any section at runtime without a restart – see app/analyzers/rules.py.
 """
+import os
 from typing import Dict, List
 
 # ---------------------------------------------------------------------------
@@ -123,6 +127,127 @@ PRIORITY_LADDER = [
 ]
 
 # ---------------------------------------------------------------------------
-# Misc
+# Custom rule table  (evaluated top-down; first match wins)
+# Each entry: (flag, keywords, escalate_to, category_override, min_confidence)
+#   escalate_to=None       → informational flag, priority unchanged
+#   category_override=None → keep the classifier's category
+#   min_confidence=None    → no confidence floor
+# ---------------------------------------------------------------------------
+CUSTOM_RULES = [
+    ("security_escalation", SECURITY_KEYWORDS,         "P0", "Technical", 0.95),
+    ("compliance_risk",     COMPLIANCE_KEYWORDS,       "P0", None,        0.90),
+    ("data_loss",           DATA_LOSS_KEYWORDS,        "P0", "Technical", 0.90),
+    ("account_takeover",    ACCOUNT_TAKEOVER_KEYWORDS, "P0", "Account",   0.90),
+    ("refund_detected",     REFUND_KEYWORDS,           "P1", "Billing",   0.80),
+    ("pricing_dispute",     PRICING_DISPUTE_KEYWORDS,  "P2", "Billing",   0.75),
+    ("spam_likely",         SPAM_KEYWORDS,             None, None,        None),
+]
+
+# ---------------------------------------------------------------------------
+# Runtime rule reloading (environment overrides)
+# RULES_FILE            : JSON/YAML rules file loaded at startup (unset = built-ins)
+# RULES_WATCH_INTERVAL  : seconds between mtime checks of RULES_FILE (0 = off)
+# ---------------------------------------------------------------------------
+RULES_FILE = os.getenv("RULES_FILE") or None
+RULES_WATCH_INTERVAL = float(os.getenv("RULES_WATCH_INTERVAL", "0"))
+
+# ---------------------------------------------------------------------------
+# Analysis result cache
+# ANALYSIS_CACHE_SIZE : max cached results (LRU); 0 disables the cache
+# ---------------------------------------------------------------------------
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "10000"))
+
+# ---------------------------------------------------------------------------
+# Analysis executor (where analyze() runs for API requests)
+# ANALYSIS_EXECUTOR         : "inline"  – on the event loop
+#                             "thread"  – always in a thread pool
+#                             "process" – always in a process pool
+#                             "auto"    – inline for small texts, process pool above the threshold
+# ANALYSIS_WORKERS          : pool size per server worker; 0 = min(4, CPUs /
+#                             server workers), so the pools of app.server's
+#                             workers together stay within the CPUs
+# ANALYSIS_INLINE_MAX_CHARS : auto threshold on subject + description length
+#                             (~120ns per char, so 4000 chars ≈ 0.5ms on the loop)
+# ---------------------------------------------------------------------------
+ANALYSIS_EXECUTOR = os.getenv("ANALYSIS_EXECUTOR", "auto")
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0"))
+ANALYSIS_INLINE_MAX_CHARS = int(os.getenv("ANALYSIS_INLINE_MAX_CHARS", "4000"))
+
+# ---------------------------------------------------------------------------
+# Re-analysis of stored tickets after a rule change
+# REANALYSIS_AUTO       : run the job at startup and after every rules reload
+#                         (with app.server, only in the first worker)
+# REANALYSIS_CHUNK_SIZE : tickets read, analysed and written per transaction
+# REANALYSIS_RATE       : max tickets re-analysed per second; 0 = unthrottled
+# ---------------------------------------------------------------------------
+REANALYSIS_AUTO = os.getenv("REANALYSIS_AUTO", "true").lower() in ("1", "true", "yes")
+REANALYSIS_CHUNK_SIZE = int(os.getenv("REANALYSIS_CHUNK_SIZE", "500"))
+REANALYSIS_RATE = float(os.getenv("REANALYSIS_RATE", "2000"))
+
+# ---------------------------------------------------------------------------
+# Live ticket feed (GET /tickets/stream, Server-Sent Events)
+# FEED_POLL_INTERVAL      : seconds between checks for tickets committed by other
+#                           workers / processes (this process's commits are pushed at once)
+# FEED_HEARTBEAT_INTERVAL : seconds between keep-alive comments on an idle stream
+# FEED_QUEUE_MAX          : tickets buffered per subscriber; a subscriber that falls
+#                           further behind catches up from the database instead
+# ---------------------------------------------------------------------------
+FEED_POLL_INTERVAL = float(os.getenv("FEED_POLL_INTERVAL", "1"))
+FEED_HEARTBEAT_INTERVAL = float(os.getenv("FEED_HEARTBEAT_INTERVAL", "15"))
+FEED_QUEUE_MAX = int(os.getenv("FEED_QUEUE_MAX", "1000"))
+
+# ---------------------------------------------------------------------------
+# Write-behind persistence (POST /tickets/analyze)
+# WRITE_BEHIND            : queue tickets for a background group-commit writer
+# WRITE_DURABILITY        : "commit"  – respond after the ticket's group commit (201)
+#                           "enqueue" – respond once queued, before commit (202)
+# WRITE_BATCH_SIZE        : max tickets per group commit
+# WRITE_FLUSH_INTERVAL_MS : max time the writer waits to fill a batch
+# WRITE_QUEUE_MAX         : queue capacity; producers wait when it is full
+# WRITE_ENQUEUE_TIMEOUT   : seconds a producer waits for space before a 503
+# ---------------------------------------------------------------------------
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+WRITE_DURABILITY = os.getenv("WRITE_DURABILITY", "commit")
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "256"))
+WRITE_FLUSH_INTERVAL_MS = float(os.getenv("WRITE_FLUSH_INTERVAL_MS", "5"))
+WRITE_QUEUE_MAX = int(os.getenv("WRITE_QUEUE_MAX", "10000"))
+WRITE_ENQUEUE_TIMEOUT = float(os.getenv("WRITE_ENQUEUE_TIMEOUT", "5"))
+
+# ---------------------------------------------------------------------------
+# Storage
+# DB_URL           : SQLAlchemy async URL, e.g. postgresql+asyncpg://user:pw@host/db
+# DB_POOL_SIZE     : pooled connections per process (server databases)
+# DB_MAX_OVERFLOW  : extra connections allowed beyond the pool under bursts
+# DB_POOL_TIMEOUT  : seconds to wait for a free connection
+# PG_COPY_MIN_ROWS : PostgreSQL batches at least this large are written with COPY
+# ---------------------------------------------------------------------------
+DB_URL = os.getenv("DB_URL", "sqlite+aiosqlite:///./data/tickets.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+PG_COPY_MIN_ROWS = int(os.getenv("PG_COPY_MIN_ROWS", "100"))
+
+# ---------------------------------------------------------------------------
+# SQLite connection profile (ignored for other databases)
+# SQLITE_PROFILE         : "tuned"   – WAL + pragmas below, separate read/write pools
+#                          "default" – driver defaults, one engine
+# SQLITE_READ_POOL_SIZE  : read-only connections for GET endpoints (tuned only)
+# SQLITE_CACHE_SIZE_KIB  : page cache per connection
+# SQLITE_MMAP_SIZE       : bytes of the DB file memory-mapped per connection
+# SQLITE_BUSY_TIMEOUT_MS : how long a connection waits for a lock before failing
+# ---------------------------------------------------------------------------
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "tuned")
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "4"))
+SQLITE_CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# ---------------------------------------------------------------------------
+# Pre-fork server (python -m app.server)
+# WEB_CONCURRENCY          : worker processes; 0 = one per CPU
+# SERVER_GRACEFUL_TIMEOUT  : seconds workers get to finish in-flight requests
+#                            (and drain the write-behind queue) on shutdown
+#                            before they are killed
 # ---------------------------------------------------------------------------
-DB_URL = "sqlite+aiosqlite:///./data/tickets.db"
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY") or 0)
+SERVER_GRACEFUL_TIMEOUT = float(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
@@ -0,0 +1,131 @@
+"""
+Analyzer controller – inspect and hot-reload the active rule set, drive the
+re-analysis job, and report analysis cache and executor statistics.
+
+Thin handlers only; loading and compilation live in the rules service.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analyzers.analyzer import RESULT_CACHE
+from app.analyzers.rules import RuleSnapshot, RuleValidationError, current_snapshot
+from app.database import get_read_db
+from app.schemas import (
+    AnalysisCacheResponse,
+    AnalysisExecutorResponse,
+    DecisionTableResponse,
+    ReanalysisStatusResponse,
+    RulesInfoResponse,
+)
+from app.services.reanalysis_service import ReanalysisJob, count_stale, current_job
+from app.services.rules_service import RulesNotConfiguredError, reload_rules
+from app.services.ticket_service import executor_stats
+
+router = APIRouter(prefix="/analyzer", tags=["analyzer"])
+
+
+def _rules_info(snapshot: RuleSnapshot) -> RulesInfoResponse:
+    return RulesInfoResponse(
+        version=snapshot.version,
+        source=snapshot.source,
+        loaded_at=snapshot.loaded_at,
+        rules=snapshot.rules.to_dict(),
+    )
+
+
+@router.get("/rules", response_model=RulesInfoResponse)
+async def get_rules() -> RulesInfoResponse:
+    """Return the active rule set and its version."""
+    return _rules_info(current_snapshot())
+
+
+@router.get("/rules/decisions", response_model=DecisionTableResponse)
+async def get_rule_decisions() -> DecisionTableResponse:
+    """Return the active rule set compiled to its decision table, for auditing rule precedence."""
+    snapshot = current_snapshot()
+    table = snapshot.decisions
+    return DecisionTableResponse(
+        version=snapshot.version,
+        rules=list(table.flags),
+        categories=list(table.categories),
+        rows=table.rows(),
+    )
+
+
+@router.post("/rules/reload", response_model=RulesInfoResponse)
+async def post_rules_reload() -> RulesInfoResponse:
+    """Reload RULES_FILE and atomically swap in the new rule set."""
+    try:
+        snapshot = await reload_rules()
+    except RulesNotConfiguredError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    except RuleValidationError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    return _rules_info(snapshot)
+
+
+async def _reanalysis_status(job: ReanalysisJob, db: AsyncSession) -> ReanalysisStatusResponse:
+    active = current_snapshot().version
+    job_status = job.status
+    return ReanalysisStatusResponse(
+        state=job_status.state,
+        rules_version=job_status.rules_version,
+        active_rules_version=active,
+        stale=await count_stale(db, active),
+        scanned=job_status.scanned,
+        changed=job_status.changed,
+        last_id=job_status.last_id,
+        runs=job_status.runs,
+        started_at=job_status.started_at,
+        finished_at=job_status.finished_at,
+        error=job_status.error,
+    )
+
+
+def _require_job() -> ReanalysisJob:
+    job = current_job()
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="re-analysis job is not running")
+    return job
+
+
+@router.get("/reanalysis", response_model=ReanalysisStatusResponse)
+async def get_reanalysis(db: AsyncSession = Depends(get_read_db)) -> ReanalysisStatusResponse:
+    """Progress of the re-analysis job and how many tickets are still stale."""
+    return await _reanalysis_status(_require_job(), db)
+
+
+@router.post("/reanalysis", response_model=ReanalysisStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def post_reanalysis(db: AsyncSession = Depends(get_read_db)) -> ReanalysisStatusResponse:
+    """Start re-scoring stale tickets in the background (no-op if a run is in progress)."""
+    job = _require_job()
+    job.kick()
+    return await _reanalysis_status(job, db)
+
+
+@router.get("/cache", response_model=AnalysisCacheResponse)
+async def get_cache_stats() -> AnalysisCacheResponse:
+    """Return size, hit/miss and eviction counters of the analysis result cache."""
+    stats = RESULT_CACHE.stats()
+    return AnalysisCacheResponse(
+        maxsize=stats.maxsize,
+        size=stats.size,
+        hits=stats.hits,
+        misses=stats.misses,
+        evictions=stats.evictions,
+        hit_rate=round(stats.hit_rate, 4),
+    )
+
+
+@router.get("/executor", response_model=AnalysisExecutorResponse)
+async def get_executor_stats() -> AnalysisExecutorResponse:
+    """Return where analyses run and how many are queued on the pool right now."""
+    stats = executor_stats()
+    return AnalysisExecutorResponse(
+        mode=stats.mode,
+        workers=stats.workers,
+        inline_max_chars=stats.inline_max_chars,
+        pending=stats.pending,
+        inline=stats.inline,
+        offloaded=stats.offloaded,
+    )
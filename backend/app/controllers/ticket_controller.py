@@ -6,28 +6,144 @@ No business logic lives here.  Each handler:
   2. Delegates to the service layer.
   3. Returns the response.
 """
-from fastapi import APIRouter, Depends, status
+from typing import Annotated, Optional, Union
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.schemas import TicketListResponse, TicketRequest, TicketResponse
-from app.services.ticket_service import analyze_and_save, list_tickets
+from app.database import get_db, get_read_db
+from app.serialization import ORJSONResponse
+from app.schemas import (
+    TicketAcceptedResponse,
+    TicketBatchRequest,
+    TicketBatchResponse,
+    TicketExportQuery,
+    TicketFeedQuery,
+    TicketListQuery,
+    TicketListResponse,
+    TicketRequest,
+    TicketResponse,
+    TicketSearchQuery,
+    TicketSearchResponse,
+    TicketStatsQuery,
+    TicketStatsResponse,
+)
+from app.services.feed_service import current_feed
+from app.services.search_service import InvalidSearchQueryError, search_tickets_json
+from app.services.stats_service import InvalidStatsWindowError, get_ticket_stats
+from app.services.ticket_service import (
+    InvalidCursorError,
+    analyze_and_save,
+    analyze_and_save_batch,
+    export_tickets,
+    list_tickets_json,
+)
+from app.services.write_queue import WriteQueueClosedError, WriteQueueFullError
 
 router = APIRouter(prefix="/tickets", tags=["tickets"])
 
+_EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
 
-@router.post("/analyze", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/analyze",
+    response_model=Union[TicketResponse, TicketAcceptedResponse],
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": TicketAcceptedResponse, "description": "Queued (write-behind, enqueue durability)"}},
+)
 async def create_ticket(
     payload: TicketRequest,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-) -> TicketResponse:
+) -> Union[TicketResponse, TicketAcceptedResponse]:
     """Analyze a support ticket and persist it."""
-    return await analyze_and_save(payload, db)
+    try:
+        ticket = await analyze_and_save(payload, db)
+    except (WriteQueueFullError, WriteQueueClosedError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": "1"},
+        ) from exc
+    if isinstance(ticket, TicketAcceptedResponse):
+        response.status_code = status.HTTP_202_ACCEPTED
+    return ticket
+
+
+@router.post("/analyze/batch", response_model=TicketBatchResponse, status_code=status.HTTP_200_OK)
+async def create_tickets_batch(
+    payload: TicketBatchRequest,
+    db: AsyncSession = Depends(get_db),
+) -> TicketBatchResponse:
+    """Analyze many tickets and persist the valid ones in one transaction."""
+    return await analyze_and_save_batch(payload.tickets, db)
 
 
 @router.get("", response_model=TicketListResponse, status_code=status.HTTP_200_OK)
 async def get_tickets(
-    db: AsyncSession = Depends(get_db),
-) -> TicketListResponse:
-    """List all analyzed tickets, newest first."""
-    return await list_tickets(db)
+    query: Annotated[TicketListQuery, Query()],
+    db: AsyncSession = Depends(get_read_db),
+) -> ORJSONResponse:
+    """List analyzed tickets, newest first, one keyset-paginated page at a time."""
+    try:
+        return ORJSONResponse(await list_tickets_json(db, query))
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.get("/search", response_model=TicketSearchResponse, status_code=status.HTTP_200_OK)
+async def search(
+    query: Annotated[TicketSearchQuery, Query()],
+    db: AsyncSession = Depends(get_read_db),
+) -> ORJSONResponse:
+    """Full-text search over subject and description, best match first, with filters and keyset pagination."""
+    try:
+        return ORJSONResponse(await search_tickets_json(db, query))
+    except InvalidSearchQueryError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.get("/stats", response_model=TicketStatsResponse, status_code=status.HTTP_200_OK)
+async def get_stats(
+    query: Annotated[TicketStatsQuery, Query()],
+    db: AsyncSession = Depends(get_read_db),
+) -> TicketStatsResponse:
+    """Ticket counts per priority, category and flag: a time series, window totals and all-time totals."""
+    try:
+        return await get_ticket_stats(db, query)
+    except InvalidStatsWindowError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export(query: Annotated[TicketExportQuery, Query()]) -> StreamingResponse:
+    """Stream every matching ticket as NDJSON (default) or CSV."""
+    return StreamingResponse(
+        export_tickets(query),
+        media_type=_EXPORT_MEDIA_TYPES[query.format],
+        headers={"Content-Disposition": f'attachment; filename="tickets.{query.format}"'},
+    )
+
+
+@router.get("/stream", status_code=status.HTTP_200_OK, response_class=StreamingResponse)
+async def stream(
+    query: Annotated[TicketFeedQuery, Query()],
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """Server-Sent Events: one `ticket` event per newly stored ticket, resumable by id."""
+    feed = current_feed()
+    if feed is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="live feed is not running")
+    if query.after_id is None and last_event_id:
+        # EventSource reconnects with the id of the last event it received
+        if not last_event_id.isdigit():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid Last-Event-ID")
+        query = query.model_copy(update={"after_id": int(last_event_id)})
+    return StreamingResponse(
+        feed.subscribe(query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,11 +1,103 @@
-"""Async SQLAlchemy engine, session factory, and Base."""
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+"""
+Async SQLAlchemy engines, session factories, and Base.
+
+SQLite profiles (SQLITE_PROFILE, file databases only):
+  - tuned  : WAL journal, so readers never block behind the writer;
+             synchronous=NORMAL (fsync at checkpoints, not on every commit);
+             a larger page cache plus mmap; busy_timeout instead of failing
+             fast on a lock.  Writes use a one-connection pool – SQLite has a
+             single writer anyway, so concurrent writers queue in the pool
+             rather than racing for the file lock – and reads get their own
+             pool of query_only connections.
+  - default: driver defaults; reads and writes share one engine.
+
+Server databases (PostgreSQL via asyncpg) get one pooled engine sized by
+DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT, shared by reads and writes.
+"""
+from sqlalchemy import Connection, event, inspect, make_url, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_URL,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KIB,
+    SQLITE_MMAP_SIZE,
+    SQLITE_PROFILE,
+    SQLITE_READ_POOL_SIZE,
+)
+
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    """Per-connection pragmas of the tuned profile."""
+    pragmas = [
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        # Persistent in the file; set by the writer so readers never need write access
+        pragmas.insert(1, "PRAGMA journal_mode=WAL")
+    return pragmas
+
+
+def _apply_pragmas(target: AsyncEngine, pragmas: list[str]) -> None:
+    @event.listens_for(target.sync_engine, "connect")
+    def _on_connect(dbapi_connection, _record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
 
-from app.config import DB_URL
 
-engine = create_async_engine(DB_URL, echo=False)
+def create_engines(url: str) -> tuple[AsyncEngine, AsyncEngine]:
+    """Return (write engine, read engine) for ``url``; the same engine when not split."""
+    if make_url(url).get_backend_name() != "sqlite":
+        pooled = create_async_engine(
+            url, echo=False, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT, pool_pre_ping=True,
+        )
+        return pooled, pooled
+    if SQLITE_PROFILE == "default" or not _is_sqlite_file(url):
+        single = create_async_engine(url, echo=False)
+        return single, single
+    if SQLITE_PROFILE != "tuned":
+        raise ValueError(f"SQLITE_PROFILE must be 'tuned' or 'default', not {SQLITE_PROFILE!r}")
+
+    writer = create_async_engine(
+        url, echo=False, poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0,
+    )
+    reader = create_async_engine(
+        url, echo=False, poolclass=AsyncAdaptedQueuePool,
+        pool_size=SQLITE_READ_POOL_SIZE, max_overflow=0,
+    )
+    _apply_pragmas(writer, sqlite_pragmas())
+    _apply_pragmas(reader, sqlite_pragmas(read_only=True))
+    return writer, reader
+
+
+engine, read_engine = create_engines(DB_URL)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False)
+
+_BACKFILL_CHUNK = 1000
+
+# Set once init_db() has run in this process.  Workers forked by app.server
+# inherit it from the master, so only the master touches the schema.
+_schema_ready = False
 
 
 class Base(DeclarativeBase):
@@ -13,12 +105,121 @@ class Base(DeclarativeBase):
 
 
 async def init_db() -> None:
-    """Create all tables on startup."""
+    """Create all tables on startup and bring existing databases up to date (once per process)."""
+    global _schema_ready
+    if _schema_ready:
+        return
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_schema)
+    _schema_ready = True
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections (shutdown, and in app.server before forking)."""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+# Arbitrary constant: serialises schema setup when several workers start at once
+_SCHEMA_LOCK_ID = 7_311_001
+
+
+def _create_schema(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _SCHEMA_LOCK_ID})
+    existing = set(inspect(conn).get_table_names())
+    Base.metadata.create_all(conn)
+
+    # create_all() skips new columns and indexes on tables that already existed
+    for table in Base.metadata.sorted_tables:
+        if table.name in existing:
+            _add_missing_columns(conn, table)
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    if "tickets" in existing and "ticket_flags" not in existing:
+        _backfill_ticket_children(conn)
+    if "tickets" in existing and "ticket_rollups" not in existing:
+        _backfill_rollups(conn)
+
+    # The full-text index is raw DDL (FTS5 table + triggers / GIN index), not ORM metadata
+    from app.models import create_search_index
+
+    create_search_index(conn, existing)
+
+
+def _add_missing_columns(conn: Connection, table) -> None:
+    """ALTER TABLE … ADD COLUMN for nullable columns added to the model since the table was created."""
+    present = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    for column in table.columns:
+        if column.name in present:
+            continue
+        if not column.nullable:
+            raise RuntimeError(f"cannot add NOT NULL column {table.name}.{column.name} to an existing table")
+        ddl = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl}"))
+
+
+def _backfill_ticket_children(conn: Connection) -> None:
+    """Populate ticket_flags / ticket_keywords from the JSON columns of older rows."""
+    tickets = Base.metadata.tables["tickets"]
+    flags = Base.metadata.tables["ticket_flags"]
+    keywords = Base.metadata.tables["ticket_keywords"]
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(tickets.c.id, tickets.c.keywords, tickets.c.custom_flags)
+            .where(tickets.c.id > last_id)
+            .order_by(tickets.c.id)
+            .limit(_BACKFILL_CHUNK)
+        ).all()
+        if not rows:
+            return
+        flag_rows = [
+            {"ticket_id": r.id, "flag": f} for r in rows for f in dict.fromkeys(r.custom_flags)
+        ]
+        keyword_rows = [
+            {"ticket_id": r.id, "keyword": k} for r in rows for k in dict.fromkeys(r.keywords)
+        ]
+        if flag_rows:
+            conn.execute(flags.insert(), flag_rows)
+        if keyword_rows:
+            conn.execute(keywords.insert(), keyword_rows)
+        last_id = rows[-1].id
+
+
+def _backfill_rollups(conn: Connection) -> None:
+    """Count tickets stored before the rollup table existed into it."""
+    from app.models import rollup_deltas, rollup_params, rollup_upsert
+
+    tickets = Base.metadata.tables["tickets"]
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(tickets.c.id, tickets.c.created_at, tickets.c.category, tickets.c.priority,
+                   tickets.c.urgency, tickets.c.custom_flags)
+            .where(tickets.c.id > last_id)
+            .order_by(tickets.c.id)
+            .limit(_BACKFILL_CHUNK)
+        ).all()
+        if not rows:
+            return
+        deltas = rollup_deltas(
+            (r.created_at, r.category, r.priority, r.urgency, r.custom_flags, 1) for r in rows
+        )
+        conn.execute(rollup_upsert(conn.dialect.name), rollup_params(deltas))
+        last_id = rows[-1].id
 
 
 async def get_db() -> AsyncSession:  # type: ignore[return]
-    """FastAPI dependency: yields a database session."""
+    """FastAPI dependency: yields a database session (write engine)."""
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_db() -> AsyncSession:  # type: ignore[return]
+    """FastAPI dependency: yields a session on the read-only pool."""
+    async with ReadSessionLocal() as session:
+        yield session
@@ -4,9 +4,22 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from app.database import init_db
+from app.config import REANALYSIS_AUTO
+from app.database import dispose_engines, engine, init_db, read_engine
+from app.metrics import CONTENT_TYPE, REGISTRY, RequestMetricsMiddleware, register_pool_metrics
+from app.controllers.analyzer_controller import router as analyzer_router
 from app.controllers.ticket_controller import router as ticket_router
+from app.services.feed_service import start_feed, stop_feed
+from app.services.reanalysis_service import start_reanalysis, stop_reanalysis
+from app.services.rules_service import start_rules
+from app.services.ticket_service import (
+    start_analysis_executor,
+    start_write_behind,
+    stop_analysis_executor,
+    stop_write_behind,
+)
 
 
 @asynccontextmanager
@@ -14,7 +27,26 @@ async def lifespan(app: FastAPI):
     # Ensure the data/ directory exists for SQLite
     os.makedirs("data", exist_ok=True)
     await init_db()
+    # Load RULES_FILE (if configured) and watch it for changes
+    rules_watcher = await start_rules()
+    # Inline / thread / process analysis (ANALYSIS_EXECUTOR)
+    await start_analysis_executor()
+    # Optional write-behind queue for POST /tickets/analyze (WRITE_BEHIND)
+    await start_write_behind()
+    # Re-score tickets from older rule sets; under app.server only the first worker does it
+    await start_reanalysis(auto=REANALYSIS_AUTO and os.getenv("APP_WORKER_INDEX", "0") == "0")
+    # Push newly stored tickets to GET /tickets/stream subscribers
+    await start_feed()
     yield
+    await stop_feed()
+    await stop_reanalysis()
+    # Drain queued tickets before the process exits
+    await stop_write_behind()
+    await stop_analysis_executor()
+    # Close pooled connections so SQLite checkpoints and removes its WAL files
+    await dispose_engines()
+    if rules_watcher is not None:
+        await rules_watcher.stop()
 
 
 app = FastAPI(
@@ -40,9 +72,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the timing covers CORS handling and the full response body
+app.add_middleware(RequestMetricsMiddleware)
+register_pool_metrics(
+    {"write": engine} if read_engine is engine else {"write": engine, "read": read_engine}
+)
+
 app.include_router(ticket_router)
+app.include_router(analyzer_router)
 
 
 @app.get("/health", tags=["meta"])
 async def health() -> dict:
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["meta"], response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,302 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Strategy:
+  - Counters and histograms are plain dicts keyed by label values; an update is
+    a dict lookup, a bisect and two adds (~0.3µs), so instrumenting the hot
+    path costs a few percent of a ~60µs analysis at most.
+  - Updates take no lock: instrumented code runs on the event loop thread (or
+    in its own worker process).  Under free threading an increment could in
+    rare cases be lost, which is acceptable for monitoring data.
+  - Gauges are callbacks evaluated only when /metrics is scraped.
+  - RequestMetricsMiddleware is a raw ASGI middleware (no per-request Request
+    objects) labelled by route template, so cardinality stays bounded.
+
+Everything lives in one process; with several workers, scrape each one.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond analysis stages up to slow requests
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class _HistogramSeries:
+    """Bucket counts and sum for one label set."""
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # +Inf last
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+
+    def labels(self, *values: str) -> _HistogramSeries:
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = _HistogramSeries(self.buckets)
+        return series
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.labels(*labels).observe(value)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series.counts) if series else 0
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self._series.items(), key=lambda item: item[0]):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series.sum!r}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge:
+    """
+    Gauge whose value is computed by ``fn`` at scrape time.  With
+    ``labelnames``, ``fn`` returns a mapping of label values -> value.
+    """
+
+    def __init__(
+        self, name: str, help: str, fn: Callable[[], Any], labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        if not self.labelnames:
+            yield f"{self.name} {_format_value(self.fn())}"
+            return
+        for labels, value in sorted(self.fn().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "ticket_stage_duration_seconds",
+    "Time spent per analysis / persistence stage.",
+    ("stage",),
+))
+TICKETS_ANALYZED = REGISTRY.register(Counter(
+    "tickets_analyzed_total",
+    "Tickets analyzed and persisted, by category and priority.",
+    ("category", "priority"),
+))
+TICKET_FLAGS = REGISTRY.register(Counter(
+    "ticket_custom_flags_total",
+    "Custom rule flags raised on persisted tickets.",
+    ("flag",),
+))
+
+ANALYSIS_RUNS = REGISTRY.register(Counter(
+    "analysis_runs_total",
+    "Tickets analysed, by where the analysis ran (inline on the event loop, thread, process).",
+    ("executor",),
+))
+
+WRITE_BATCHES = REGISTRY.register(Histogram(
+    "write_queue_batch_size",
+    "Tickets written per write-behind group commit.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+))
+WRITE_FAILURES = REGISTRY.register(Counter(
+    "write_queue_failed_total",
+    "Queued tickets whose group commit failed.",
+))
+
+
+_stage_series: Dict[str, _HistogramSeries] = {}
+
+
+def observe_stage(stage: str, started: float) -> float:
+    """Record ``stage`` as having run from ``started`` (perf_counter) until now; returns now."""
+    now = time.perf_counter()
+    series = _stage_series.get(stage)
+    if series is None:
+        series = _stage_series[stage] = STAGE_LATENCY.labels(stage)
+    series.observe(now - started)
+    return now
+
+
+def record_result(category: str, priority: str, custom_flags: Sequence[str]) -> None:
+    TICKETS_ANALYZED.inc(category, priority)
+    for flag in custom_flags:
+        TICKET_FLAGS.inc(flag)
+
+
+def register_pool_metrics(engines: Mapping[str, AsyncEngine]) -> None:
+    """
+    Export connection-pool gauges, labelled by pool name (e.g. write / read).
+    Checked-out connections are tracked with pool events, so they work for
+    every pool class; size/overflow come from QueuePool when present.
+    """
+    checked_out: Dict[str, int] = {}
+    pools = {}
+    for name, engine in engines.items():
+        pool = engine.sync_engine.pool
+        pools[name] = pool
+        checked_out[name] = 0
+
+        def _on_checkout(*_args, _name: str = name) -> None:
+            checked_out[_name] += 1
+
+        def _on_checkin(*_args, _name: str = name) -> None:
+            checked_out[_name] -= 1
+
+        event.listen(pool, "checkout", _on_checkout)
+        event.listen(pool, "checkin", _on_checkin)
+
+    REGISTRY.register(Gauge(
+        "db_pool_checked_out", "Database connections currently checked out.",
+        lambda: {(name,): count for name, count in checked_out.items()}, ("pool",),
+    ))
+    REGISTRY.register(Gauge(
+        "db_pool_size", "Configured pool size (0 when the pool does not keep connections).",
+        lambda: {(name,): p.size() if hasattr(p, "size") else 0 for name, p in pools.items()},
+        ("pool",),
+    ))
+    REGISTRY.register(Gauge(
+        "db_pool_overflow", "Connections opened beyond the pool size.",
+        lambda: {
+            (name,): max(p.overflow(), 0) if hasattr(p, "overflow") else 0 for name, p in pools.items()
+        },
+        ("pool",),
+    ))
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------------------------
+
+
+class RequestMetricsMiddleware:
+    """Time every HTTP request, labelled by the matched route template."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # unmatched paths share one label so arbitrary URLs cannot blow up cardinality
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started, scope["method"], template, str(status[0])
+            )
@@ -1,15 +1,63 @@
-"""SQLAlchemy ORM model for support tickets."""
-import json
+"""SQLAlchemy ORM models for support tickets (portable across SQLite and PostgreSQL)."""
+from collections import Counter
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
 
-from sqlalchemy import Boolean, DateTime, Float, Integer, Text
+import orjson
+
+from sqlalchemy import Boolean, Connection, DateTime, Dialect, Float, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import TypeDecorator, TypeEngine
 
 from app.database import Base
 
 
+class JSONList(TypeDecorator):
+    """
+    A list of strings: native JSONB on PostgreSQL, JSON text elsewhere.
+    Python code always sees a list.  The text is compact orjson output – the
+    exact bytes a JSON response contains for the list, so reads can splice
+    it in unchanged (app.serialization).  Rows written by json.dumps() before
+    that still decode the same, so existing databases need no migration.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Dialect) -> TypeEngine:
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value: Optional[list], dialect: Dialect) -> Any:
+        if value is None or dialect.name == "postgresql":
+            return value
+        return orjson.dumps(value).decode()
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> Optional[list]:
+        if value is None or dialect.name == "postgresql":
+            return value
+        return orjson.loads(value)
+
+
+def utcnow() -> datetime:
+    """Naive UTC – created_at is a timezone-less column on every backend."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Keyset pagination scans these newest-first; SQLite appends the rowid
+        # (id) to every index, so each one also covers the (…, id) tie-break.
+        Index("ix_tickets_created_at", "created_at"),
+        Index("ix_tickets_priority_created_at", "priority", "created_at"),
+        Index("ix_tickets_category_created_at", "category", "created_at"),
+        # Re-analysis counts / finds tickets scored under an older rule set
+        Index("ix_tickets_rules_version", "rules_version"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     subject: Mapped[str] = mapped_column(Text, nullable=False)
@@ -18,16 +66,174 @@ class Ticket(Base):
     priority: Mapped[str] = mapped_column(Text, nullable=False)
     urgency: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     confidence: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
-    # JSON-serialised lists stored as text
-    keywords: Mapped[str] = mapped_column(Text, nullable=False, default="[]")
-    custom_flags: Mapped[str] = mapped_column(Text, nullable=False, default="[]")
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
-    )
+    # Whole lists on the row (read path); the indexed copies used for
+    # filtering live in ticket_flags / ticket_keywords.
+    keywords: Mapped[list[str]] = mapped_column(JSONList, nullable=False, default=list)
+    custom_flags: Mapped[list[str]] = mapped_column(JSONList, nullable=False, default=list)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=utcnow)
+    # Version of the rule set the row was scored with; NULL for rows older than the column
+    rules_version: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
 
-    # Convenience helpers so callers get Python lists, not raw JSON strings
     def get_keywords(self) -> list[str]:
-        return json.loads(self.keywords)
+        return list(self.keywords)
 
     def get_custom_flags(self) -> list[str]:
-        return json.loads(self.custom_flags)
+        return list(self.custom_flags)
+
+
+class TicketFlag(Base):
+    """One row per custom flag raised by a ticket."""
+
+    __tablename__ = "ticket_flags"
+    __table_args__ = (Index("ix_ticket_flags_flag_ticket_id", "flag", "ticket_id"),)
+
+    ticket_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("tickets.id", ondelete="CASCADE"), primary_key=True
+    )
+    flag: Mapped[str] = mapped_column(Text, primary_key=True)
+
+
+class TicketKeyword(Base):
+    """One row per matched keyword of a ticket."""
+
+    __tablename__ = "ticket_keywords"
+    __table_args__ = (Index("ix_ticket_keywords_keyword_ticket_id", "keyword", "ticket_id"),)
+
+    ticket_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("tickets.id", ondelete="CASCADE"), primary_key=True
+    )
+    keyword: Mapped[str] = mapped_column(Text, primary_key=True)
+
+
+# ---------------------------------------------------------------------------
+# Triage rollups
+# ---------------------------------------------------------------------------
+
+# bucket width per granularity; "all" has a single bucket holding all-time totals
+ROLLUP_GRANULARITIES = ("minute", "hour", "all")
+ROLLUP_EPOCH = datetime(1970, 1, 1)
+
+RollupKey = Tuple[str, datetime, str, str]   # (granularity, bucket, dimension, value)
+
+
+class TicketRollup(Base):
+    """
+    Ticket counts per time bucket and dimension value, maintained on write.
+
+    dimension is one of "total" (value ""), "priority", "category", "flag"
+    or "urgent" (value ""); the primary key order serves "one granularity,
+    a range of buckets" scans.
+
+    Every write touches the same few rows (the "total" rows of the current
+    minute, the current hour and "all"), so on PostgreSQL concurrent writers
+    queue on those row locks until each commits.  A write is one upsert per
+    transaction, issued last (just before the commit), so the wait is one
+    commit per transaction, not per ticket; batches and write-behind group
+    commit spread it over many tickets.
+    """
+
+    __tablename__ = "ticket_rollups"
+
+    granularity: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(16), primary_key=True)
+    value: Mapped[str] = mapped_column(Text, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+def rollup_bucket(granularity: str, created_at: datetime) -> datetime:
+    if granularity == "minute":
+        return created_at.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return created_at.replace(minute=0, second=0, microsecond=0)
+    return ROLLUP_EPOCH
+
+
+def rollup_deltas(
+    entries: Iterable[Tuple[datetime, str, str, bool, Sequence[str], int]],
+) -> Dict[RollupKey, int]:
+    """
+    Aggregate (created_at, category, priority, urgency, custom_flags, sign)
+    entries into per-key count changes; sign is +1 for a new ticket and -1
+    to retract an old result.  Keys whose changes cancel out are dropped.
+    """
+    deltas: Counter = Counter()
+    for created_at, category, priority, urgency, flags, sign in entries:
+        values = [("total", ""), ("priority", priority), ("category", category)]
+        values.extend(("flag", flag) for flag in dict.fromkeys(flags))
+        if urgency:
+            values.append(("urgent", ""))
+        for granularity in ROLLUP_GRANULARITIES:
+            bucket = rollup_bucket(granularity, created_at)
+            for dimension, value in values:
+                deltas[(granularity, bucket, dimension, value)] += sign
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+@lru_cache(maxsize=None)
+def rollup_upsert(dialect_name: str):
+    """INSERT … ON CONFLICT DO UPDATE count = count + excluded.count, for executemany (built once per dialect)."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    table = TicketRollup.__table__
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.granularity, table.c.bucket, table.c.dimension, table.c.value],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+
+
+def rollup_params(deltas: Dict[RollupKey, int]) -> list[dict[str, Any]]:
+    """
+    Upsert parameters in primary-key order.  Every writer then locks the rows
+    it touches in the same order, so two concurrent transactions queue on
+    the first shared row instead of deadlocking on PostgreSQL.
+    """
+    return [
+        {"granularity": g, "bucket": b, "dimension": d, "value": v, "count": c}
+        for (g, b, d, v), c in sorted(deltas.items())
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Full-text search
+# ---------------------------------------------------------------------------
+
+SEARCH_TABLE = "tickets_fts"
+
+# SQLite: an FTS5 index over subject / description that reads the text back
+# from tickets (external content), kept current by triggers on tickets, so
+# every write path indexes in the same transaction as its insert.
+_SQLITE_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "subject, description, content='tickets', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, subject, description) VALUES (new.id, new.subject, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, subject, description) "
+    "VALUES ('delete', old.id, old.subject, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS tickets_fts_update AFTER UPDATE OF subject, description ON tickets BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, subject, description) "
+    "VALUES ('delete', old.id, old.subject, old.description); "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, subject, description) VALUES (new.id, new.subject, new.description); END",
+)
+
+# PostgreSQL: a GIN index on the expression the search query matches against
+# (app.services.search_service builds the identical expression)
+PG_SEARCH_DOCUMENT = "to_tsvector('simple'::regconfig, subject || ' ' || description)"
+_PG_SEARCH_DDL = (f"CREATE INDEX IF NOT EXISTS ix_tickets_search ON tickets USING GIN ({PG_SEARCH_DOCUMENT})",)
+
+
+def create_search_index(conn: Connection, existing: Iterable[str]) -> None:
+    """Create the full-text index if it is missing and index tickets stored before it existed."""
+    if conn.dialect.name == "postgresql":
+        for ddl in _PG_SEARCH_DDL:
+            conn.execute(text(ddl))
+        return
+    for ddl in _SQLITE_SEARCH_DDL:
+        conn.execute(text(ddl))
+    if SEARCH_TABLE not in existing or "tickets" not in existing:
+        # New index, or an index left behind by a dropped tickets table: (re)build from tickets
+        conn.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
@@ -1,9 +1,14 @@
 """Pydantic request/response schemas."""
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+MAX_BATCH_SIZE = 1000
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_STATS_BUCKETS = 1440
+
 
 class TicketRequest(BaseModel):
     subject: str = Field(..., min_length=1, max_length=300, description="Ticket subject / title")
@@ -11,8 +16,9 @@ class TicketRequest(BaseModel):
 
     @field_validator("subject", "description", mode="before")
     @classmethod
-    def strip_whitespace(cls, v: str) -> str:
-        return v.strip()
+    def strip_whitespace(cls, v: Any) -> Any:
+        # Non-strings fall through to the str type check and fail validation there
+        return v.strip() if isinstance(v, str) else v
 
 
 class TicketResponse(BaseModel):
@@ -30,6 +36,173 @@ class TicketResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class TicketAcceptedResponse(BaseModel):
+    """A ticket analyzed and queued for write-behind persistence (no id yet)."""
+    status: Literal["queued"] = "queued"
+    subject: str
+    description: str
+    category: str
+    priority: str
+    urgency: bool
+    confidence: float
+    keywords: List[str]
+    custom_flags: List[str]
+    created_at: datetime
+
+
+class TicketFilters(BaseModel):
+    """Server-side filters shared by the ticket read endpoints."""
+    category: Optional[str] = None
+    priority: Optional[str] = Field(None, pattern=r"^P[0-3]$")
+    urgency: Optional[bool] = None
+    flag: Optional[str] = Field(None, description="Only tickets that raised this custom flag")
+    keyword: Optional[str] = Field(None, description="Only tickets that matched this keyword")
+    created_after: Optional[datetime] = Field(None, description="Inclusive lower bound on created_at")
+    created_before: Optional[datetime] = Field(None, description="Exclusive upper bound on created_at")
+
+
+class TicketListQuery(TicketFilters):
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = Field(None, description="Opaque next_cursor from the previous page")
+    total: Literal["exact", "estimate", "none"] = Field(
+        "exact", description="How to compute `total`: exact COUNT, cheap estimate, or skip"
+    )
+
+
+class TicketSearchQuery(TicketListQuery):
+    q: str = Field(
+        ..., min_length=1, max_length=500,
+        description="Words that must all appear in the subject or description; `term*` matches a prefix",
+    )
+
+
+class TicketExportQuery(TicketFilters):
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+
+class TicketFeedQuery(BaseModel):
+    priority: Optional[str] = Field(None, pattern=r"^P[0-3]$")
+    flag: Optional[str] = Field(None, description="Only tickets that raised this custom flag")
+    after_id: Optional[int] = Field(
+        None, ge=0, description="Replay stored tickets with a larger id first (default: new tickets only)"
+    )
+
+
 class TicketListResponse(BaseModel):
     tickets: List[TicketResponse]
-    total: int
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class TicketSearchHit(TicketResponse):
+    score: float = Field(..., description="Relevance (BM25 on SQLite, ts_rank_cd on PostgreSQL); higher is better")
+    snippet: str = Field(..., description="Best-matching passage, matched terms wrapped in <mark>…</mark>; not HTML-escaped")
+
+
+class TicketSearchResponse(BaseModel):
+    tickets: List[TicketSearchHit]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class TicketStatsQuery(BaseModel):
+    granularity: Literal["minute", "hour"] = "hour"
+    since: Optional[datetime] = Field(None, description="Inclusive start; default 24 hours (hour) / 60 minutes (minute) before `until`")
+    until: Optional[datetime] = Field(None, description="Exclusive end; default now")
+
+
+class StatsCounts(BaseModel):
+    tickets: int = 0
+    urgent: int = 0
+    priority: Dict[str, int] = Field(default_factory=dict)
+    category: Dict[str, int] = Field(default_factory=dict)
+    flag: Dict[str, int] = Field(default_factory=dict)
+
+
+class StatsBucket(StatsCounts):
+    bucket: datetime
+
+
+class TicketStatsResponse(BaseModel):
+    granularity: str
+    since: datetime
+    until: datetime
+    totals: StatsCounts          # over [since, until)
+    all_time: StatsCounts
+    series: List[StatsBucket]    # one entry per bucket, empty buckets included
+
+
+class TicketBatchRequest(BaseModel):
+    # Items are validated one by one in the service so that a single bad ticket
+    # is reported in its own result instead of rejecting the whole batch.
+    tickets: List[Any] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TicketBatchItem(BaseModel):
+    index: int
+    ticket: Optional[TicketResponse] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+
+class TicketBatchResponse(BaseModel):
+    results: List[TicketBatchItem]
+    created: int
+    failed: int
+
+
+class RulesInfoResponse(BaseModel):
+    version: str
+    source: str
+    loaded_at: datetime
+    rules: Dict[str, Any]
+
+
+class DecisionRow(BaseModel):
+    rule: Optional[str]                  # winning custom rule; None = no rule hit
+    mask: str                            # rule-hit pattern, one char per rule: 1 hit, 0 no hit, - either
+    urgency: bool
+    category: str                        # classifier's category
+    priority: str
+    category_override: Optional[str]
+    flags: List[str]
+    min_confidence: Optional[float]
+    decisive: bool                       # same decision whatever the classifier's category
+
+
+class DecisionTableResponse(BaseModel):
+    version: str
+    rules: List[str]                     # custom rule flags in precedence order (mask positions)
+    categories: List[str]
+    rows: List[DecisionRow]
+
+
+class AnalysisCacheResponse(BaseModel):
+    maxsize: int
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+
+class ReanalysisStatusResponse(BaseModel):
+    state: str
+    rules_version: Optional[str]
+    active_rules_version: str
+    stale: int
+    scanned: int
+    changed: int
+    last_id: int
+    runs: int
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    error: Optional[str]
+
+
+class AnalysisExecutorResponse(BaseModel):
+    mode: str
+    workers: int
+    inline_max_chars: int
+    pending: int
+    inline: int
+    offloaded: int
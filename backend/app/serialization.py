@@ -0,0 +1,82 @@
+"""
+Fast JSON encoding of stored tickets (orjson).
+
+Strategy:
+  1. Ticket reads select plain columns (TICKET_COLUMNS).  keywords and
+     custom_flags come back as the stored JSON text, not decoded lists.
+  2. That text is stored in canonical form (models.JSONList): compact
+     orjson output, byte for byte what a response encoder writes for the
+     list.  A canonical value is spliced into the response as is
+     (orjson.Fragment), with no decode and no re-encode.  Rows written
+     before this form (json.dumps() with ", " separators and \\u escapes)
+     and PostgreSQL's jsonb text are re-encoded once on read.
+  3. A ticket becomes a dict in TicketResponse field order.  A whole page is
+     encoded by one orjson.dumps() call and returned as an ORJSONResponse,
+     so FastAPI does not validate and serialize it again through
+     ``response_model``.  The model is kept for the OpenAPI schema.
+
+The bytes are identical to those of the TicketResponse + JSONResponse path
+(tests/test_serialization.py).  Confidence values are rounded to 4 decimal
+places in [0, 1], where orjson and float repr() print the same digits.
+"""
+from typing import Any, Dict, Optional, Sequence
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Text, cast
+
+from app.models import Ticket
+from app.schemas import TicketResponse
+
+LIST_FIELDS = ("keywords", "custom_flags")
+
+_tickets = Ticket.__table__
+
+# TicketResponse's fields, in order; list columns as their stored text.  A real
+# CAST, not type_coerce(): asyncpg decodes jsonb to Python lists itself, so
+# PostgreSQL must hand back jsonb::text (a no-op on SQLite's TEXT column).
+TICKET_COLUMNS = tuple(
+    cast(_tickets.c[name], Text).label(name) if name in LIST_FIELDS else _tickets.c[name]
+    for name in TicketResponse.model_fields
+)
+
+
+def list_fragment(raw: str) -> orjson.Fragment:
+    """A stored list column, ready to splice into an orjson document."""
+    if '", "' in raw or "\\u" in raw:
+        # json.dumps() text (older rows) or jsonb text: normalise the separators / escapes
+        return orjson.Fragment(orjson.dumps(orjson.loads(raw)))
+    return orjson.Fragment(raw)
+
+
+def ticket_dict(row: Any) -> Dict[str, Any]:
+    """A TICKET_COLUMNS row as a JSON-ready dict, in TicketResponse field order."""
+    return {
+        "id": row.id,
+        "subject": row.subject,
+        "description": row.description,
+        "category": row.category,
+        "priority": row.priority,
+        "urgency": row.urgency,
+        "confidence": row.confidence,
+        "keywords": list_fragment(row.keywords),
+        "custom_flags": list_fragment(row.custom_flags),
+        "created_at": row.created_at,
+    }
+
+
+def ticket_json(row: Any) -> str:
+    """One ticket encoded exactly as TicketResponse.model_dump_json() would."""
+    return orjson.dumps(ticket_dict(row)).decode()
+
+
+def ticket_response(row: Any) -> TicketResponse:
+    """A validated TicketResponse from a TICKET_COLUMNS row (for callers that want models)."""
+    return TicketResponse(
+        **{name: orjson.loads(value) if name in LIST_FIELDS else value for name, value in row._mapping.items()}
+    )
+
+
+def page_json(tickets: Sequence[Any], total: Optional[int], next_cursor: Optional[str]) -> Dict[str, Any]:
+    """A TicketListResponse body, ready for ORJSONResponse."""
+    return {"tickets": [ticket_dict(row) for row in tickets], "total": total, "next_cursor": next_cursor}
@@ -0,0 +1,226 @@
+"""
+Pre-fork production server.
+
+    python -m app.server --host 0.0.0.0 --port 8000 --workers 4
+
+Strategy:
+  1. The master does all shared setup once: importing app.main compiles the
+     default rule matchers, RULES_FILE (if any) is loaded and compiled, and
+     init_db() creates / migrates the schema.  The engines are then disposed
+     so no database connection crosses a fork.
+  2. gc.freeze() moves everything allocated so far into the permanent
+     generation.  The collector never touches those objects again, so the
+     compiled matchers, rule tables and imported modules stay on pages shared
+     copy-on-write by every worker.
+  3. The master binds the listening socket and forks N workers.  Each runs its
+     own uvicorn server and event loop on the inherited socket; the kernel
+     spreads accept()s across them.  Workers find the schema ready and the
+     rules loaded, so their startup skips both.
+  4. The master only supervises: a worker that exits is replaced (after a
+     short delay if it died right after starting), and SIGTERM / SIGINT are
+     forwarded so workers finish in-flight requests and drain their
+     write-behind queue.  Workers still running after the graceful timeout
+     are killed.
+
+Workers share nothing at runtime: each has its own connection pools, result
+cache, write-behind queue and metrics (scrape every worker, or aggregate per
+pod).  A rules reload through the API reaches only the worker that served it;
+use RULES_FILE with RULES_WATCH_INTERVAL to update all of them.
+
+POSIX only (os.fork).  For development keep using ``uvicorn app.main:app --reload``.
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional, Sequence
+
+from app.config import RULES_FILE, SERVER_GRACEFUL_TIMEOUT, WEB_CONCURRENCY
+
+logger = logging.getLogger("app.server")
+
+# A worker that exits sooner than this after starting is treated as crashing
+_MIN_WORKER_UPTIME = 1.0
+_RESPAWN_DELAY = 1.0
+
+
+# ---------------------------------------------------------------------------
+# Master setup
+# ---------------------------------------------------------------------------
+
+
+def prepare() -> None:
+    """Shared, once-per-deployment setup run in the master before forking."""
+    from app.analyzers.rules import install_snapshot
+    from app.database import dispose_engines, init_db
+    from app.main import app  # noqa: F401 – imports routes, compiles default matchers
+    from app.services.rules_service import build_snapshot
+
+    if RULES_FILE is not None:
+        install_snapshot(build_snapshot(RULES_FILE))
+
+    async def _init() -> None:
+        os.makedirs("data", exist_ok=True)
+        await init_db()
+        await dispose_engines()
+
+    asyncio.run(_init())
+    gc.collect()
+    gc.freeze()
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+
+def _run_worker(
+    sock: socket.socket, index: int, workers: int, log_level: str, graceful_timeout: float,
+) -> None:
+    import uvicorn
+
+    from app.main import app
+
+    # Singleton background work (the re-analysis job) runs in worker 0 only
+    os.environ["APP_WORKER_INDEX"] = str(index)
+    # Sizes the analysis pool so all workers' pools share the CPUs
+    os.environ["APP_WORKER_COUNT"] = str(workers)
+    # The master's handlers must not run in the worker; uvicorn installs its own
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+        signal.signal(sig, signal.SIG_DFL)
+    config = uvicorn.Config(
+        app, log_level=log_level, timeout_graceful_shutdown=int(graceful_timeout) or None,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket, index: int, workers: int, log_level: str, graceful_timeout: float) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(sock, index, workers, log_level, graceful_timeout)
+        except BaseException:  # noqa: BLE001 – report and exit the child, never return to the master loop
+            logger.exception("worker %d crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+    logger.info("started worker %d (index %d)", pid, index)
+    return pid
+
+
+# ---------------------------------------------------------------------------
+# Supervisor
+# ---------------------------------------------------------------------------
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 1,
+    log_level: str = "info",
+    graceful_timeout: float = SERVER_GRACEFUL_TIMEOUT,
+) -> int:
+    """Prepare, fork ``workers`` workers and supervise them until SIGTERM / SIGINT."""
+    prepare()
+    sock = bind_socket(host, port)
+    logger.info("listening on %s:%d with %d workers", host, port, workers)
+
+    started: Dict[int, float] = {}
+    slots: Dict[int, int] = {}   # pid -> worker index, reused by its replacement
+    stopping = False
+
+    def _stop(signum, _frame) -> None:
+        nonlocal stopping
+        if stopping:
+            return
+        stopping = True
+        logger.info("received %s, stopping workers", signal.Signals(signum).name)
+        for pid in started:
+            _kill(pid, signal.SIGTERM)
+        signal.alarm(max(1, int(graceful_timeout) + 1))
+
+    def _timeout(_signum, _frame) -> None:
+        for pid in started:
+            logger.warning("worker %d did not stop in time, killing it", pid)
+            _kill(pid, signal.SIGKILL)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGALRM, _timeout)
+
+    def _start(index: int) -> None:
+        pid = _spawn(sock, index, workers, log_level, graceful_timeout)
+        started[pid], slots[pid] = time.monotonic(), index
+
+    for index in range(workers):
+        _start(index)
+
+    while started:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        uptime = time.monotonic() - started.pop(pid, time.monotonic())
+        index = slots.pop(pid, 0)
+        if stopping:
+            continue
+        logger.warning("worker %d exited (status %d), restarting", pid, os.waitstatus_to_exitcode(status))
+        if uptime < _MIN_WORKER_UPTIME:
+            time.sleep(_RESPAWN_DELAY)   # crash loop: don't spin
+        if not stopping:
+            _start(index)
+
+    signal.alarm(0)
+    sock.close()
+    logger.info("all workers stopped")
+    return 0
+
+
+def _kill(pid: int, sig: int) -> None:
+    try:
+        os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.server", description="Run the API with pre-forked workers."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int, default=WEB_CONCURRENCY or os.cpu_count() or 1,
+        help="worker processes (default WEB_CONCURRENCY, else one per CPU)",
+    )
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument(
+        "--graceful-timeout", type=float, default=SERVER_GRACEFUL_TIMEOUT,
+        help="seconds workers get to shut down before being killed",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    return serve(args.host, args.port, args.workers, args.log_level, args.graceful_timeout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Where analyze() runs – inline on the event loop, or offloaded to a pool.
+
+analyze() is pure CPU: a ~5 KB ticket takes well under a millisecond, but
+while it runs nothing else on the event loop does, /health included.
+
+Modes (ANALYSIS_EXECUTOR):
+  - inline : call analyze() on the loop (lowest latency for small tickets).
+  - thread : run every analysis in a thread pool.  Keeps the loop responsive
+             (the GIL is handed back every few ms) but adds no CPU.
+  - process: run every analysis in a process pool.  Workers are preloaded
+             with the active rule snapshot by the pool initializer, so a task
+             only ships the ticket text and the result.
+  - auto   : inline while the text is at most ANALYSIS_INLINE_MAX_CHARS,
+             the process pool above that.  Small tickets pay no IPC; large
+             ones no longer stall every other request.
+
+Strategy:
+  1. Route every ticket by its own length (subject + description), batches
+     included: the large tickets of a batch go to the pool, split into
+     chunks so it works on them in parallel, while the small ones run inline
+     in the meantime.  Inline work yields to the event loop after every
+     ANALYSIS_INLINE_MAX_CHARS characters, so a batch of many small tickets
+     does not stall other requests either.
+  2. Process workers are bound to the rule-set version they were started
+     with.  When the active snapshot changes, the next offload replaces the
+     pool; tasks already submitted finish on the old one, with the rules they
+     were submitted under.
+  3. The result cache stays in the server process: offloaded tickets are
+     looked up before and stored after the round trip, so duplicates never
+     leave the loop.
+  4. ``pending`` (offloaded, not yet finished) is exported as the
+     analysis_executor_pending gauge and by GET /analyzer/executor.
+  5. ProcessPoolExecutor starts its workers lazily, on submit.  warm_up()
+     (run by the startup hook) submits one no-op per worker and waits, so
+     the first large ticket pays neither the spawn nor compile_rules().  A
+     pool replaced after a rules reload starts on its first offload.
+  6. Each pre-forked server worker (app.server) has its own pool.  The
+     default size is min(4, CPUs / server workers), so all pools together
+     stay within the machine's CPUs.
+
+Stage timings recorded inside process workers stay in those workers; the
+per-executor counter (analysis_runs_total) is always recorded here.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from app.analyzers.analyzer import AnalysisResult, analyze, lookup_cached, store_cached
+from app.analyzers.rules import RuleSet, RuleSnapshot, compile_rules, current_snapshot, install_snapshot
+from app.config import ANALYSIS_EXECUTOR, ANALYSIS_INLINE_MAX_CHARS, ANALYSIS_WORKERS
+from app.metrics import ANALYSIS_RUNS, REGISTRY, Gauge
+
+MODES = ("inline", "thread", "process", "auto")
+
+Ticket = Tuple[str, str]   # (subject, description)
+
+
+# ---------------------------------------------------------------------------
+# Process-pool worker side
+# ---------------------------------------------------------------------------
+
+
+def _init_worker(rules: RuleSet, source: str) -> None:
+    """Pool initializer: compile the server's rule set once per worker process."""
+    install_snapshot(compile_rules(rules, source=source))
+
+
+def _analyze_chunk(tickets: Sequence[Ticket]) -> List[AnalysisResult]:
+    return [analyze(subject, description) for subject, description in tickets]
+
+
+def _ready() -> int:
+    """No-op task: returns once the worker is up and its initializer has run."""
+    return os.getpid()
+
+
+# ---------------------------------------------------------------------------
+# Executor
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ExecutorStats:
+    mode: str
+    workers: int
+    inline_max_chars: int
+    pending: int
+    inline: int
+    offloaded: int
+
+
+class AnalysisExecutor:
+    def __init__(self, mode: str = "inline", workers: int = 2, inline_max_chars: int = 4000) -> None:
+        if mode not in MODES:
+            raise ValueError(f"ANALYSIS_EXECUTOR must be one of {', '.join(MODES)}, not {mode!r}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.inline_max_chars = inline_max_chars
+        self.pending = 0
+        self._pool: Optional[Executor] = None
+        self._pool_version: Optional[str] = None
+
+    @property
+    def _offload_kind(self) -> Optional[str]:
+        if self.mode == "auto":
+            return "process"
+        return None if self.mode == "inline" else self.mode
+
+    def start(self) -> None:
+        """Register the pending gauge and create the pool (its workers start in warm_up())."""
+        REGISTRY.register(Gauge(
+            "analysis_executor_pending", "Analyses offloaded to the pool and not yet finished.",
+            lambda: self.pending,
+        ))
+        if self._offload_kind is not None:
+            self._ensure_pool(current_snapshot())
+
+    async def warm_up(self) -> None:
+        """Start every pool worker now instead of on the first offloaded ticket."""
+        kind = self._offload_kind
+        if kind is None:
+            return
+        pool = self._ensure_pool(current_snapshot())
+        if kind == "process":
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(pool, _ready) for _ in range(self.workers)))
+
+    async def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await asyncio.to_thread(pool.shutdown, wait=True)
+
+    def stats(self) -> ExecutorStats:
+        return ExecutorStats(
+            mode=self.mode,
+            workers=self.workers if self._offload_kind else 0,
+            inline_max_chars=self.inline_max_chars,
+            pending=self.pending,
+            inline=int(ANALYSIS_RUNS.value("inline")),
+            offloaded=int(ANALYSIS_RUNS.value("thread") + ANALYSIS_RUNS.value("process")),
+        )
+
+    def _offloads(self, chars: int) -> bool:
+        if self.mode == "inline":
+            return False
+        return self.mode != "auto" or chars > self.inline_max_chars
+
+    def _ensure_pool(self, snapshot: RuleSnapshot) -> Executor:
+        kind = self._offload_kind
+        if kind == "thread":
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="analysis")
+            return self._pool
+        if self._pool is None or self._pool_version != snapshot.version:
+            old = self._pool
+            # spawn: never fork a process that runs an event loop and driver threads
+            self._pool = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(snapshot.rules, snapshot.source),
+            )
+            self._pool_version = snapshot.version
+            if old is not None:
+                old.shutdown(wait=False)   # in-flight tasks finish on the old rules
+        return self._pool
+
+    async def analyze(self, subject: str, description: str) -> AnalysisResult:
+        return (await self.analyze_many([(subject, description)]))[0]
+
+    async def analyze_many(self, tickets: Sequence[Ticket]) -> List[AnalysisResult]:
+        """Analyse ``tickets`` (in order), each inline or on the pool depending on mode and its size."""
+        results: List[Optional[AnalysisResult]] = [None] * len(tickets)
+        offload = [
+            i for i, (subject, description) in enumerate(tickets)
+            if self._offloads(len(subject) + len(description))
+        ]
+        offloaded = self._offload(tickets, offload, results) if offload else None
+
+        # The pool (if any) is already working; analyse the small tickets meanwhile
+        inline = 0
+        budget = 0
+        offload_set = set(offload)
+        for i, (subject, description) in enumerate(tickets):
+            if i in offload_set:
+                continue
+            results[i] = analyze(subject, description)
+            inline += 1
+            budget += len(subject) + len(description)
+            if budget > self.inline_max_chars:
+                budget = 0
+                await asyncio.sleep(0)      # let other requests in between inline tickets
+        if inline:
+            ANALYSIS_RUNS.inc("inline", amount=inline)
+        if offloaded is not None:
+            await offloaded
+        return results
+
+    async def _offload(
+        self, tickets: Sequence[Ticket], indexes: List[int], results: List[Optional[AnalysisResult]],
+    ) -> None:
+        """Analyse ``tickets[i]`` for every i in ``indexes`` on the pool, filling ``results`` in place."""
+        snapshot = current_snapshot()
+        pool = self._ensure_pool(snapshot)
+        kind = self._offload_kind
+        todo = indexes
+        if kind == "process":
+            for i in indexes:
+                results[i] = lookup_cached(*tickets[i], snapshot)
+            todo = [i for i in indexes if results[i] is None]
+
+        loop = asyncio.get_running_loop()
+        chunks = [todo[start::self.workers] for start in range(min(self.workers, len(todo)))]
+        futures = [loop.run_in_executor(pool, _analyze_chunk, [tickets[i] for i in chunk]) for chunk in chunks]
+        self.pending += len(todo)
+        try:
+            done = await asyncio.gather(*futures)
+        finally:
+            self.pending -= len(todo)
+
+        for chunk, chunk_results in zip(chunks, done):
+            for i, result in zip(chunk, chunk_results):
+                results[i] = result
+                if kind == "process":
+                    store_cached(*tickets[i], snapshot, result)
+        ANALYSIS_RUNS.inc(kind, amount=len(todo))
+        if len(todo) < len(indexes):
+            ANALYSIS_RUNS.inc("inline", amount=len(indexes) - len(todo))   # cache hits, served on the loop
+
+
+def create_executor(
+    mode: str = ANALYSIS_EXECUTOR,
+    workers: int = ANALYSIS_WORKERS,
+    inline_max_chars: int = ANALYSIS_INLINE_MAX_CHARS,
+) -> AnalysisExecutor:
+    return AnalysisExecutor(mode, workers or default_workers(), inline_max_chars)
+
+
+def default_workers() -> int:
+    """Pool size when ANALYSIS_WORKERS is 0: min(4, CPUs / pre-forked server workers), at least 1."""
+    server_workers = int(os.getenv("APP_WORKER_COUNT") or 1)
+    return max(1, min(4, (os.cpu_count() or 1) // server_workers))
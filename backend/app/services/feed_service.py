@@ -0,0 +1,279 @@
+"""
+Live ticket feed – push newly stored tickets to clients (GET /tickets/stream).
+
+Strategy:
+  1. One tail poller per process reads committed tickets in id order
+     (``id > cursor ORDER BY id``) on the read pool, encodes each ticket once
+     and hands it to every subscriber whose filters match.  The query only
+     runs while someone is subscribed, and it is one primary-key range scan
+     however many subscribers there are.
+  2. Commits made by this process wake the poller at once (ticket_service's
+     commit listeners).  Tickets stored by other workers or processes are
+     picked up within FEED_POLL_INTERVAL.
+  3. Every event carries the ticket id as its SSE ``id``.  A client resumes
+     with ``after_id`` – or the Last-Event-ID header EventSource sends on
+     reconnect – and the tickets it missed are replayed from the database
+     (keyset pagination, same filters) before it joins the live tail.  Each
+     subscriber drops ids it has already sent, so a client sees every
+     matching ticket once, in id order.
+  4. Each subscriber buffers at most FEED_QUEUE_MAX tickets.  One that falls
+     further behind loses its buffer and catches up from the database from
+     its last sent id, so a slow client never grows server memory.
+  5. An idle stream gets a comment line every FEED_HEARTBEAT_INTERVAL seconds
+     so proxies keep the connection open.
+
+Ids are taken from the tickets table, so the tail relies on tickets
+becoming visible in id order.  That holds on SQLite (one writer at a time).
+On PostgreSQL two concurrent transactions can commit out of id order; a
+ticket that becomes visible after a larger id was already sent is missed
+by live subscribers (it is still in GET /tickets and in every replay).
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, FrozenSet, List, Optional, Union
+
+import orjson
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import FEED_HEARTBEAT_INTERVAL, FEED_POLL_INTERVAL, FEED_QUEUE_MAX
+from app.database import ReadSessionLocal
+from app.metrics import REGISTRY, Gauge
+from app.models import Ticket, TicketFlag
+from app.schemas import TicketFeedQuery
+from app.serialization import TICKET_COLUMNS, ticket_json
+from app.services import ticket_service
+
+logger = logging.getLogger(__name__)
+
+FEED_BATCH_SIZE = 500
+RETRY_MS = 2000           # EventSource reconnect delay, sent once per stream
+
+_LAGGED = object()        # buffer overflowed: catch up from the database
+_CLOSED = object()        # feed stopped: end the stream
+
+
+@dataclass(frozen=True)
+class FeedEvent:
+    id: int
+    priority: str
+    flags: FrozenSet[str]
+    frame: str            # the complete SSE frame, shared by every subscriber
+
+
+def _event(row: Any) -> FeedEvent:
+    return FeedEvent(
+        id=row.id,
+        priority=row.priority,
+        flags=frozenset(orjson.loads(row.custom_flags)),
+        frame=f"id: {row.id}\nevent: ticket\ndata: {ticket_json(row)}\n\n",
+    )
+
+
+class _Subscription:
+    def __init__(self, query: TicketFeedQuery, maxsize: int) -> None:
+        self.query = query
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.lagged = False
+
+    def matches(self, event: FeedEvent) -> bool:
+        return (
+            (self.query.priority is None or event.priority == self.query.priority)
+            and (self.query.flag is None or self.query.flag in event.flags)
+        )
+
+    def offer(self, event: FeedEvent) -> None:
+        if self.lagged or not self.matches(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagged = True
+            self.replace_buffer(_LAGGED)
+
+    def replace_buffer(self, item: object) -> None:
+        """Drop everything buffered and queue ``item`` alone."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(item)
+
+
+class TicketFeed:
+    def __init__(
+        self,
+        read_sessions: async_sessionmaker = ReadSessionLocal,
+        poll_interval: float = FEED_POLL_INTERVAL,
+        heartbeat_interval: float = FEED_HEARTBEAT_INTERVAL,
+        queue_max: int = FEED_QUEUE_MAX,
+    ) -> None:
+        self._read_sessions = read_sessions
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.queue_max = queue_max
+        self.cursor = 0                  # highest ticket id handed to subscribers
+        self._subscriptions: set = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    # ------------------------------------------------------------------
+    # Tail poller
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        REGISTRY.register(Gauge(
+            "ticket_feed_subscribers", "Open GET /tickets/stream connections.", lambda: self.subscribers,
+        ))
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="ticket-feed")
+
+    def notify(self) -> None:
+        """New tickets were committed in this process: poll now instead of at the next tick."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self) -> None:
+        """Stop polling and end every open stream."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscription in list(self._subscriptions):
+            subscription.replace_buffer(_CLOSED)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self._subscriptions:
+                continue
+            try:
+                await self.poll()
+            except Exception:  # noqa: BLE001 – keep tailing; the next tick retries from the same cursor
+                logger.exception("ticket feed poll failed")
+
+    async def poll(self) -> int:
+        """Fan out every ticket committed since the cursor; returns how many were read."""
+        read = 0
+        while True:
+            events = await self._read(self.cursor)
+            for event in events:
+                for subscription in list(self._subscriptions):
+                    subscription.offer(event)
+            if events:
+                self.cursor = events[-1].id
+            read += len(events)
+            if len(events) < FEED_BATCH_SIZE:
+                return read
+
+    async def _read(self, after_id: int, query: Optional[TicketFeedQuery] = None) -> List[FeedEvent]:
+        stmt = select(*TICKET_COLUMNS).where(Ticket.id > after_id).order_by(Ticket.id).limit(FEED_BATCH_SIZE)
+        if query is not None and query.priority is not None:
+            stmt = stmt.where(Ticket.priority == query.priority)
+        if query is not None and query.flag is not None:
+            stmt = stmt.where(exists().where(TicketFlag.ticket_id == Ticket.id, TicketFlag.flag == query.flag))
+        async with self._read_sessions() as db:
+            rows = (await db.execute(stmt)).all()
+        return [_event(row) for row in rows]
+
+    async def _head(self) -> int:
+        async with self._read_sessions() as db:
+            return await db.scalar(select(func.max(Ticket.id))) or 0
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    async def subscribe(self, query: TicketFeedQuery) -> AsyncIterator[str]:
+        """
+        Yield SSE frames: stored tickets after ``query.after_id`` (if given),
+        then new tickets as they are committed, until the client goes away or
+        the feed stops.
+        """
+        subscription = _Subscription(query, self.queue_max)
+        if not self._subscriptions:
+            # The poller skips work while nobody listens; start the tail at the head
+            self.cursor = max(self.cursor, await self._head())
+        self._subscriptions.add(subscription)
+        last_id = query.after_id if query.after_id is not None else self.cursor
+        catch_up = query.after_id is not None
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                if catch_up:
+                    # Reset the buffer first: anything offered from now on is kept,
+                    # anything already replayed is skipped by id below
+                    subscription.lagged = False
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    async for event in self._replay(query, last_id):
+                        yield event.frame
+                        last_id = event.id
+                    catch_up = False
+                    continue
+                try:
+                    item: Union[FeedEvent, object] = await asyncio.wait_for(
+                        subscription.queue.get(), self.heartbeat_interval
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is _CLOSED:
+                    return
+                if item is _LAGGED:
+                    catch_up = True
+                    continue
+                if item.id <= last_id:
+                    continue
+                yield item.frame
+                last_id = item.id
+        finally:
+            self._subscriptions.discard(subscription)
+
+    async def _replay(self, query: TicketFeedQuery, after_id: int) -> AsyncIterator[FeedEvent]:
+        while True:
+            events = await self._read(after_id, query)
+            for event in events:
+                yield event
+            if len(events) < FEED_BATCH_SIZE:
+                return
+            after_id = events[-1].id
+
+
+# ---------------------------------------------------------------------------
+# Lifespan hooks
+# ---------------------------------------------------------------------------
+
+_feed: Optional[TicketFeed] = None
+
+
+async def start_feed() -> TicketFeed:
+    """Startup hook: start the tail poller and wake it on every local commit."""
+    global _feed
+    feed = TicketFeed()
+    feed.start()
+    ticket_service.on_tickets_committed(lambda: feed.notify() if _feed is feed else None)
+    _feed = feed
+    return feed
+
+
+async def stop_feed() -> None:
+    global _feed
+    feed, _feed = _feed, None
+    if feed is not None:
+        await feed.stop()
+
+
+def current_feed() -> Optional[TicketFeed]:
+    return _feed
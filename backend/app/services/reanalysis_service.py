@@ -0,0 +1,346 @@
+"""
+Re-analysis job – re-score stored tickets after the rules change.
+
+    python -m app.services.reanalysis_service --rate 0      # one-off run from a shell
+
+Strategy:
+  1. Every ticket row carries the ``rules_version`` it was scored with.  Rows
+     whose version differs from the active snapshot (or is NULL, for tickets
+     older than the column) are stale; nothing else is ever read.
+  2. Stale rows are walked in id order with keyset pagination
+     (``id > last_id ORDER BY id LIMIT chunk``) on the read pool.  The chunk
+     is analysed through the analysis executor – off the event loop when it
+     is large – before any write connection is taken.
+  3. Each chunk is written in one short transaction.  Rows whose result
+     changed get their result columns, ticket_flags / ticket_keywords and
+     stats rollups rewritten; unchanged rows only get the new version
+     stamped.  Every UPDATE is guarded by "rules_version is still the one
+     read", so a row re-scored concurrently (another worker, a second run)
+     is left alone.  Changed rows are updated one by one and only those the
+     UPDATE actually hit get their child rows and rollups rewritten, so a
+     race never applies a rollup delta twice.
+  4. Progress lives in the rows themselves, so the job is resumable: after a
+     crash or restart the next run picks up exactly the rows still stale.  If
+     the rules change mid-run, the walk restarts under the new version.
+  5. Throttled to REANALYSIS_RATE tickets per second by sleeping between
+     chunks; with one small commit per chunk, live intake never waits behind
+     more than one chunk's write.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.analyzers.analyzer import AnalysisResult
+from app.analyzers.rules import current_snapshot, on_snapshot_change
+from app.config import REANALYSIS_AUTO, REANALYSIS_CHUNK_SIZE, REANALYSIS_RATE
+from app.database import AsyncSessionLocal, ReadSessionLocal
+from app.models import Ticket, TicketFlag, TicketKeyword, rollup_deltas, rollup_params, rollup_upsert
+from app.services import ticket_service
+
+logger = logging.getLogger(__name__)
+
+AnalyzeMany = Callable[[Sequence[Tuple[str, str]]], Awaitable[List[AnalysisResult]]]
+
+RESULT_COLUMNS = ("category", "priority", "urgency", "confidence", "keywords", "custom_flags")
+
+_tickets = Ticket.__table__
+
+
+def _stale(version: str):
+    return or_(_tickets.c.rules_version.is_(None), _tickets.c.rules_version != version)
+
+
+@dataclass
+class ReanalysisStatus:
+    state: str = "idle"            # idle | running | stopped | failed
+    rules_version: Optional[str] = None
+    scanned: int = 0               # stale rows re-analysed in the current / last run
+    changed: int = 0               # ... whose category / priority / flags / … changed
+    last_id: int = 0               # keyset cursor
+    runs: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class ReanalysisJob:
+    def __init__(
+        self,
+        chunk_size: int = REANALYSIS_CHUNK_SIZE,
+        rate: float = REANALYSIS_RATE,
+        sessions: async_sessionmaker = AsyncSessionLocal,
+        read_sessions: async_sessionmaker = ReadSessionLocal,
+        analyze_many: AnalyzeMany = ticket_service.analyze_many,
+    ) -> None:
+        self.chunk_size = chunk_size
+        self.rate = rate
+        self._sessions = sessions
+        self._read_sessions = read_sessions
+        self._analyze_many = analyze_many
+        self.status = ReanalysisStatus()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Background task
+    # ------------------------------------------------------------------
+
+    def start(self, run_now: bool = True) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        if run_now:
+            self._wake.set()
+        self._task = asyncio.create_task(self._run_forever(), name="reanalysis-job")
+
+    def kick(self) -> None:
+        """Request a run (safe from any thread); a running walk notices the new version itself."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            if self.status.state == "running":
+                self.status.state = "stopped"
+
+    async def _run_forever(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            try:
+                await self.run()
+            except Exception as exc:  # noqa: BLE001 – keep the job alive for the next kick
+                logger.exception("re-analysis run failed")
+                self.status.state, self.status.error = "failed", str(exc)
+
+    # ------------------------------------------------------------------
+    # Walk
+    # ------------------------------------------------------------------
+
+    async def run(self) -> ReanalysisStatus:
+        """Re-score every stale ticket, chunk by chunk, then return the final status."""
+        status = self.status
+        status.state, status.error = "running", None
+        status.scanned = status.changed = status.last_id = 0
+        status.runs += 1
+        status.started_at, status.finished_at = datetime.now(timezone.utc), None
+        status.rules_version = current_snapshot().version
+
+        while True:
+            version = current_snapshot().version
+            if version != status.rules_version:
+                logger.info("rules changed to %s during re-analysis, restarting the walk", version)
+                status.rules_version, status.last_id = version, 0
+            started = time.perf_counter()
+            count = await self.run_chunk(version)
+            if count == 0:
+                break
+            await self._throttle(count, time.perf_counter() - started)
+
+        status.state, status.finished_at = "idle", datetime.now(timezone.utc)
+        logger.info(
+            "re-analysis done: %d tickets re-scored under %s, %d changed",
+            status.scanned, status.rules_version, status.changed,
+        )
+        return status
+
+    async def _throttle(self, count: int, elapsed: float) -> None:
+        # always yield between chunks so live requests get the writer first
+        delay = count / self.rate - elapsed if self.rate > 0 else 0.0
+        await asyncio.sleep(max(delay, 0.0))
+
+    async def run_chunk(self, version: str) -> int:
+        """Re-analyse the next chunk of stale rows; returns how many were read (0 = done)."""
+        status = self.status
+        async with self._read_sessions() as db:
+            rows = (await db.execute(
+                select(_tickets.c.id, _tickets.c.subject, _tickets.c.description, _tickets.c.created_at,
+                       _tickets.c.rules_version, *(_tickets.c[name] for name in RESULT_COLUMNS))
+                .where(_tickets.c.id > status.last_id, _stale(version))
+                .order_by(_tickets.c.id)
+                .limit(self.chunk_size)
+            )).all()
+        if not rows:
+            return 0
+
+        results = await self._analyze_many([(row.subject, row.description) for row in rows])
+        changed = [(row, result) for row, result in zip(rows, results) if _differs(row, result)]
+        unchanged = [(row, result) for row, result in zip(rows, results) if not _differs(row, result)]
+
+        async with self._sessions() as db:
+            if unchanged:
+                await db.execute(
+                    update(_tickets)
+                    .where(_tickets.c.id == bindparam("b_id"), _as_read())
+                    .values(rules_version=bindparam("b_version")),
+                    [{"b_id": row.id, "b_read": row.rules_version, "b_version": result.rules_version}
+                     for row, result in unchanged],
+                )
+            # Last before the commit: the rollup upsert holds the shared total rows' locks
+            written = await _write_changed(db, changed)
+            await db.commit()
+
+        status.last_id = rows[-1].id
+        status.scanned += len(rows)
+        status.changed += written
+        return len(rows)
+
+
+def _as_read():
+    """The row still carries the rules_version it was read with (NULL included)."""
+    return _tickets.c.rules_version.is_not_distinct_from(bindparam("b_read"))
+
+
+def _differs(row: Any, result: AnalysisResult) -> bool:
+    return any(getattr(row, name) != getattr(result, name) for name in RESULT_COLUMNS)
+
+
+async def _write_changed(db: AsyncSession, changed: List[Tuple[Any, AnalysisResult]]) -> int:
+    """Write back changed results; returns how many rows were still as read and got written."""
+    if not changed:
+        return 0
+    stmt = (
+        update(_tickets)
+        .where(_tickets.c.id == bindparam("b_id"), _as_read())
+        .values(
+            rules_version=bindparam("b_version"),
+            **{name: bindparam(f"b_{name}") for name in RESULT_COLUMNS},
+        )
+    )
+    # One statement per row: an executemany() rowcount cannot tell which rows
+    # a concurrent run had already re-scored
+    written = []
+    for row, result in changed:
+        hit = await db.execute(stmt, {
+            "b_id": row.id, "b_read": row.rules_version, "b_version": result.rules_version,
+            **{f"b_{name}": getattr(result, name) for name in RESULT_COLUMNS},
+        })
+        if hit.rowcount == 1:
+            written.append((row, result))
+    if not written:
+        return 0
+    changed = written
+    ids = [row.id for row, _ in changed]
+    await db.execute(delete(TicketFlag).where(TicketFlag.ticket_id.in_(ids)))
+    await db.execute(delete(TicketKeyword).where(TicketKeyword.ticket_id.in_(ids)))
+    flag_rows = [
+        {"ticket_id": row.id, "flag": flag}
+        for row, result in changed for flag in dict.fromkeys(result.custom_flags)
+    ]
+    keyword_rows = [
+        {"ticket_id": row.id, "keyword": kw} for row, result in changed for kw in result.keywords
+    ]
+    if flag_rows:
+        await db.execute(insert(TicketFlag), flag_rows)
+    if keyword_rows:
+        await db.execute(insert(TicketKeyword), keyword_rows)
+
+    # Move the tickets between stats buckets: retract the old result, count the new one
+    deltas = rollup_deltas(
+        entry
+        for row, result in changed
+        for entry in (
+            (row.created_at, row.category, row.priority, row.urgency, row.custom_flags, -1),
+            (row.created_at, result.category, result.priority, result.urgency, result.custom_flags, 1),
+        )
+    )
+    if deltas:
+        await db.execute(rollup_upsert(db.bind.dialect.name), rollup_params(deltas))
+    return len(changed)
+
+
+async def count_stale(db: AsyncSession, version: Optional[str] = None) -> int:
+    """Tickets not yet scored with ``version`` (default: the active rule set)."""
+    version = version or current_snapshot().version
+    return await db.scalar(select(func.count()).select_from(_tickets).where(_stale(version)))
+
+
+# ---------------------------------------------------------------------------
+# Lifespan hooks
+# ---------------------------------------------------------------------------
+
+_job: Optional[ReanalysisJob] = None
+
+
+async def start_reanalysis(auto: bool = REANALYSIS_AUTO) -> ReanalysisJob:
+    """
+    Startup hook.  The job always exists so it can be triggered through the
+    API; with ``auto`` it also runs now and after every rules reload.
+    """
+    global _job
+    job = ReanalysisJob()
+    job.start(run_now=auto)
+    if auto:
+        on_snapshot_change(lambda _snapshot: job.kick() if _job is job else None)
+    _job = job
+    return job
+
+
+async def stop_reanalysis() -> None:
+    global _job
+    job, _job = _job, None
+    if job is not None:
+        await job.stop()
+
+
+def current_job() -> Optional[ReanalysisJob]:
+    return _job
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+async def _run_once(chunk_size: int, rate: float) -> Dict[str, Any]:
+    from app.database import dispose_engines, init_db
+
+    await init_db()
+    try:
+        job = ReanalysisJob(chunk_size=chunk_size, rate=rate)
+        status = await job.run()
+        async with ReadSessionLocal() as db:
+            remaining = await count_stale(db)
+    finally:
+        await dispose_engines()
+    return {"rules_version": status.rules_version, "scanned": status.scanned,
+            "changed": status.changed, "stale_remaining": remaining}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.reanalysis_service",
+        description="Re-score stored tickets that were analysed under an older rule set.",
+    )
+    parser.add_argument("--chunk-size", type=int, default=REANALYSIS_CHUNK_SIZE)
+    parser.add_argument("--rate", type=float, default=REANALYSIS_RATE, help="tickets per second; 0 = unthrottled")
+    parser.add_argument("--rules", help="rules file to score against (default RULES_FILE / config)")
+    args = parser.parse_args(argv)
+
+    from app.config import RULES_FILE
+    from app.analyzers.rules import install_snapshot
+    from app.services.rules_service import build_snapshot
+
+    if args.rules or RULES_FILE:
+        install_snapshot(build_snapshot(args.rules or RULES_FILE))
+    summary = asyncio.run(_run_once(args.chunk_size, args.rate))
+    sys.stdout.write(" ".join(f"{key}={value}" for key, value in summary.items()) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Rules service – load, hot-reload and watch the analysis rule set.
+
+    python -m app.services.rules_service --rules rules.yaml --format csv   # export the decision table
+
+Responsibilities:
+  - Load RULES_FILE into a compiled snapshot (at startup and on demand)
+  - Poll RULES_FILE for changes and reload it in the background
+  - Export the compiled decision table (CLI) for auditing rule precedence
+  - Keep compilation off the event loop: parsing and regex compilation run
+    in a worker thread, and only the final reference swap touches shared state
+
+A rules file that fails validation is rejected and the active snapshot stays
+in place.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+from typing import Optional, Sequence, TextIO
+
+from app.analyzers.rules import (
+    DEFAULT_RULES,
+    RuleSnapshot,
+    RuleValidationError,
+    compile_rules,
+    current_snapshot,
+    install_snapshot,
+    load_rules_file,
+)
+from app.config import RULES_FILE, RULES_WATCH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class RulesNotConfiguredError(RuntimeError):
+    """Raised when a reload is requested but no RULES_FILE is configured."""
+
+
+def build_snapshot(path: Optional[str]) -> RuleSnapshot:
+    """Load + validate + compile; raises RuleValidationError and changes nothing on failure."""
+    if path is None:
+        return compile_rules(DEFAULT_RULES)
+    return compile_rules(load_rules_file(path), source=path)
+
+
+async def reload_rules(path: Optional[str] = None) -> RuleSnapshot:
+    """Rebuild the snapshot from ``path`` (default RULES_FILE) and swap it in atomically."""
+    path = path or RULES_FILE
+    if path is None:
+        raise RulesNotConfiguredError("RULES_FILE is not configured")
+    snapshot = await asyncio.to_thread(build_snapshot, path)
+    return install_snapshot(snapshot)
+
+
+class RulesFileWatcher:
+    """Background task that reloads the rules file whenever its mtime changes."""
+
+    def __init__(self, path: str, interval: float) -> None:
+        self.path = path
+        self.interval = interval
+        self._mtime = self._current_mtime()
+        self._task: Optional[asyncio.Task] = None
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="rules-file-watcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def check(self) -> Optional[RuleSnapshot]:
+        """Reload if the file changed since the last check; returns the new snapshot, if any."""
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        try:
+            snapshot = await reload_rules(self.path)
+        except RuleValidationError as exc:
+            logger.error("rules reload from %s rejected: %s", self.path, exc)
+            return None
+        logger.info("rules reloaded from %s (version %s)", self.path, snapshot.version)
+        return snapshot
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+
+async def start_rules(
+    path: Optional[str] = RULES_FILE, interval: float = RULES_WATCH_INTERVAL
+) -> Optional[RulesFileWatcher]:
+    """Startup hook: load the configured rules file and, if enabled, start watching it."""
+    if path is None:
+        return None
+    # app.server compiles the file before forking; keep that shared snapshot
+    if current_snapshot().source != path:
+        await reload_rules(path)
+    if interval <= 0:
+        return None
+    watcher = RulesFileWatcher(path, interval)
+    watcher.start()
+    return watcher
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def write_decisions(snapshot: RuleSnapshot, out: TextIO, fmt: str = "csv") -> None:
+    """Write the snapshot's decision table as CSV (one row per entry) or JSON."""
+    rows = snapshot.decisions.rows()
+    if fmt == "json":
+        json.dump({"version": snapshot.version, "rules": list(snapshot.decisions.flags), "rows": rows}, out, indent=2)
+        out.write("\n")
+        return
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({**row, "flags": " ".join(row["flags"])})
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.rules_service",
+        description="Print the decision table compiled from a rule set (priority, overrides, flags).",
+    )
+    parser.add_argument("--rules", help="rules file to compile (default RULES_FILE / config)")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    args = parser.parse_args(argv)
+    try:
+        snapshot = build_snapshot(args.rules or RULES_FILE)
+    except RuleValidationError as exc:
+        sys.stderr.write(f"error: {exc}\n")
+        return 2
+    write_decisions(snapshot, sys.stdout, args.format)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Full-text ticket search (GET /tickets/search).
+
+Strategy:
+  1. The index lives next to the tickets table (app.models.create_search_index).
+     On SQLite it is an FTS5 table over subject and description, kept current
+     by triggers on tickets.  So analyze_and_save, batches, write-behind
+     groups and bulk loads all index a ticket in the transaction that stores
+     it, and a search never sees a ticket that GET /tickets does not.  On
+     PostgreSQL it is a GIN index on to_tsvector(subject || ' ' || description).
+  2. ``q`` is reduced to its words.  Each word must appear (AND) and a
+     trailing ``*`` makes it a prefix.  Quotes, operators and column filters
+     are never passed through, so no input can be a query syntax error.
+  3. Hits are ranked by BM25 on SQLite (subject matches weigh double) or
+     ts_rank_cd on PostgreSQL.  ``score`` is higher-is-better on both.  Each
+     hit carries a snippet with the matched terms wrapped in <mark>…</mark>.
+  4. Filters, ``limit``, ``total`` and cursors work as on GET /tickets.  Pages
+     are keyset-paginated on (score, id).  Scores depend on corpus statistics,
+     so tickets stored between two page requests can shift the ranking.
+  5. The body is built like GET /tickets (app.serialization): no models, the
+     stored keyword / flag JSON is spliced in, one orjson encode per page.
+"""
+import base64
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, column, desc, func, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import PG_SEARCH_DOCUMENT, SEARCH_TABLE, Ticket
+from app.schemas import TicketSearchQuery
+from app.serialization import TICKET_COLUMNS, ticket_dict
+from app.services.ticket_service import InvalidCursorError, filter_clauses
+
+MAX_SEARCH_TERMS = 16
+SNIPPET_TOKENS = 16
+SUBJECT_WEIGHT = 2.0
+MARK_START, MARK_END, ELLIPSIS = "<mark>", "</mark>", "…"
+
+# Words as both FTS5's unicode61 tokenizer and PostgreSQL's parser see them:
+# runs of letters and digits (so "sign-in" and "foo_bar" are two words)
+_TERM = re.compile(r"([^\W_]+)(\*?)")
+
+_fts = table(SEARCH_TABLE, column("rowid"))
+_fts_ref = literal_column(SEARCH_TABLE)
+
+
+class InvalidSearchQueryError(ValueError):
+    """Raised when a search query has no words, or too many."""
+
+
+def parse_terms(q: str) -> List[Tuple[str, bool]]:
+    """The (word, is_prefix) pairs of a search query, lower-cased."""
+    terms = [(match.group(1).lower(), bool(match.group(2))) for match in _TERM.finditer(q)]
+    if not terms:
+        raise InvalidSearchQueryError("search query must contain at least one letter or digit")
+    if len(terms) > MAX_SEARCH_TERMS:
+        raise InvalidSearchQueryError(f"search query has more than {MAX_SEARCH_TERMS} words")
+    return terms
+
+
+def fts5_query(terms: Sequence[Tuple[str, bool]]) -> str:
+    """An FTS5 MATCH expression: every word as a quoted phrase, ANDed."""
+    return " ".join(f'"{word}"*' if prefix else f'"{word}"' for word, prefix in terms)
+
+
+def tsquery(terms: Sequence[Tuple[str, bool]]) -> str:
+    """A to_tsquery() expression: every word ANDed, prefixes as ``word:*``."""
+    return " & ".join(f"{word}:*" if prefix else word for word, prefix in terms)
+
+
+def encode_search_cursor(score: float, ticket_id: int) -> str:
+    raw = f"{score!r}|{ticket_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, ticket_id = raw.rsplit("|", 1)
+        return float(score), int(ticket_id)
+    except ValueError as exc:  # covers binascii.Error and UnicodeDecodeError
+        raise InvalidCursorError(f"invalid cursor: {cursor!r}") from exc
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+
+def _sqlite_search(terms: Sequence[Tuple[str, bool]]) -> Tuple[Any, Any, Any, Any]:
+    """(from clause, match clause, score, snippet) against the FTS5 table."""
+    match = _fts_ref.op("MATCH")(fts5_query(terms))
+    score = -func.bm25(_fts_ref, SUBJECT_WEIGHT, 1.0)
+    snippet = func.snippet(_fts_ref, -1, MARK_START, MARK_END, ELLIPSIS, SNIPPET_TOKENS)
+    source = _fts.join(Ticket.__table__, Ticket.id == _fts.c.rowid)
+    return source, match, score, snippet
+
+
+def _pg_search(terms: Sequence[Tuple[str, bool]]) -> Tuple[Any, Any, Any, Any]:
+    """(from clause, match clause, score, snippet) against the GIN-indexed expression."""
+    # Spelled exactly as in the index definition, so the planner uses the index
+    document = literal_column(PG_SEARCH_DOCUMENT)
+    query = func.to_tsquery(literal_column("'simple'::regconfig"), tsquery(terms))
+    headline = (
+        f"StartSel={MARK_START}, StopSel={MARK_END}, FragmentDelimiter={ELLIPSIS}, "
+        f"MaxFragments=1, MaxWords={SNIPPET_TOKENS}, MinWords={SNIPPET_TOKENS // 2}"
+    )
+    snippet = func.ts_headline(
+        literal_column("'simple'::regconfig"), literal_column("subject || ' ' || description"), query, headline,
+    )
+    return Ticket.__table__, document.op("@@")(query), func.ts_rank_cd(document, query), snippet
+
+
+async def _search_page(
+    db: AsyncSession, query: TicketSearchQuery
+) -> Tuple[Sequence[Any], Optional[int], Optional[str]]:
+    terms = parse_terms(query.q)
+    build = _pg_search if db.bind.dialect.name == "postgresql" else _sqlite_search
+    source, match, score, snippet = build(terms)
+    clauses = [match, *filter_clauses(query)]
+
+    stmt = (
+        select(*TICKET_COLUMNS, score.label("score"), snippet.label("snippet"))
+        .select_from(source)
+        .where(*clauses)
+        .order_by(desc(score), desc(Ticket.id))
+        .limit(query.limit + 1)
+    )
+    if query.cursor:
+        last_score, ticket_id = decode_search_cursor(query.cursor)
+        stmt = stmt.where(or_(score < last_score, and_(score == last_score, Ticket.id < ticket_id)))
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > query.limit:
+        rows = rows[:query.limit]
+        next_cursor = encode_search_cursor(rows[-1].score, rows[-1].id)
+
+    total = None
+    if query.total != "none":
+        # The match clause is always a filter, so "estimate" is an exact count too
+        total = await db.scalar(select(func.count()).select_from(source).where(*clauses))
+    return rows, total, next_cursor
+
+
+async def search_tickets_json(db: AsyncSession, query: TicketSearchQuery) -> Dict[str, Any]:
+    """One page of search hits, best first, as a TicketSearchResponse body for ORJSONResponse."""
+    rows, total, next_cursor = await _search_page(db, query)
+    hits = []
+    for row in rows:
+        hit = ticket_dict(row)
+        hit["score"] = row.score
+        hit["snippet"] = row.snippet
+        hits.append(hit)
+    return {"tickets": hits, "total": total, "next_cursor": next_cursor}
@@ -0,0 +1,110 @@
+"""
+Stats service – triage counts served from the ticket_rollups table.
+
+Responsibilities:
+  - Read per-minute / per-hour buckets for a time window and shape them into
+    a dense series plus window totals
+  - Serve all-time totals from the single "all" bucket
+
+Rollups are maintained by the write paths (ticket_service, re-analysis) in
+the same transaction as the tickets, so the numbers are always consistent
+with the stored rows.  A request reads at most MAX_STATS_BUCKETS buckets ×
+the number of distinct dimension values – never the tickets themselves.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ROLLUP_EPOCH, TicketRollup, rollup_bucket
+from app.schemas import MAX_STATS_BUCKETS, StatsBucket, StatsCounts, TicketStatsQuery, TicketStatsResponse
+
+_BUCKET_WIDTH = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1)}
+_DEFAULT_BUCKETS = {"minute": 60, "hour": 24}
+
+
+class InvalidStatsWindowError(ValueError):
+    """Raised when a stats window is empty or spans too many buckets."""
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _add(counts: StatsCounts, dimension: str, value: str, count: int) -> None:
+    if dimension == "total":
+        counts.tickets += count
+    elif dimension == "urgent":
+        counts.urgent += count
+    else:
+        bucket: Dict[str, int] = getattr(counts, dimension)
+        bucket[value] = bucket.get(value, 0) + count
+
+
+def _fold(rows: Iterable[Tuple[str, str, int]]) -> StatsCounts:
+    counts = StatsCounts()
+    for dimension, value, count in rows:
+        if count:
+            _add(counts, dimension, value, count)
+    return counts
+
+
+def resolve_window(query: TicketStatsQuery, now: datetime) -> Tuple[datetime, datetime]:
+    """[since, until) aligned to bucket boundaries; until rounds up so the current bucket is included."""
+    width = _BUCKET_WIDTH[query.granularity]
+    until = _naive_utc(query.until) if query.until is not None else now
+    until_floor = rollup_bucket(query.granularity, until)
+    until = until_floor if until_floor == until else until_floor + width
+    if query.since is not None:
+        since = rollup_bucket(query.granularity, _naive_utc(query.since))
+    else:
+        since = until - width * _DEFAULT_BUCKETS[query.granularity]
+    if since >= until:
+        raise InvalidStatsWindowError("since must be before until")
+    if (until - since) / width > MAX_STATS_BUCKETS:
+        raise InvalidStatsWindowError(
+            f"window spans more than {MAX_STATS_BUCKETS} {query.granularity} buckets"
+        )
+    return since, until
+
+
+async def get_ticket_stats(db: AsyncSession, query: TicketStatsQuery) -> TicketStatsResponse:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    since, until = resolve_window(query, now)
+    width = _BUCKET_WIDTH[query.granularity]
+
+    rows = (await db.execute(
+        select(TicketRollup.bucket, TicketRollup.dimension, TicketRollup.value, TicketRollup.count)
+        .where(
+            TicketRollup.granularity == query.granularity,
+            TicketRollup.bucket >= since,
+            TicketRollup.bucket < until,
+        )
+    )).all()
+    all_time = (await db.execute(
+        select(TicketRollup.dimension, TicketRollup.value, TicketRollup.count)
+        .where(TicketRollup.granularity == "all", TicketRollup.bucket == ROLLUP_EPOCH)
+    )).all()
+
+    series: Dict[datetime, StatsBucket] = {}
+    bucket = since
+    while bucket < until:
+        series[bucket] = StatsBucket(bucket=bucket)
+        bucket += width
+    totals = StatsCounts()
+    for row in rows:
+        if row.count:
+            _add(series[row.bucket], row.dimension, row.value, row.count)
+            _add(totals, row.dimension, row.value, row.count)
+
+    return TicketStatsResponse(
+        granularity=query.granularity,
+        since=since,
+        until=until,
+        totals=totals,
+        all_time=_fold(all_time),
+        series=list(series.values()),
+    )
@@ -3,59 +3,574 @@ Ticket service – business logic layer.
 
 Responsibilities:
   - Orchestrate analysis (calls analyzer)
-  - Persist tickets to DB
-  - Fetch ticket lists
+  - Persist tickets to DB (one at a time, as a single bulk insert, or through
+    the optional write-behind queue with group commit)
+  - Fetch ticket lists (filtered, keyset-paginated on (created_at, id)), as
+    models or as a JSON-ready body with the stored lists spliced in
+  - Stream full exports (NDJSON / CSV) in constant memory
+  - Record persistence stage timings and per-category/priority/flag counters
+  - Tell commit listeners (the live feed) when new tickets are stored
 """
+import base64
+import csv
+import io
 import json
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, NamedTuple, Optional, Sequence, Tuple, Union
 
-from sqlalchemy import desc, select
+from pydantic import ValidationError
+from sqlalchemy import and_, desc, exists, func, insert, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.analyzers.analyzer import analyze
-from app.models import Ticket
-from app.schemas import TicketRequest, TicketResponse, TicketListResponse
+from app.analyzers.analyzer import AnalysisResult
+from app.config import (
+    ANALYSIS_EXECUTOR,
+    ANALYSIS_INLINE_MAX_CHARS,
+    ANALYSIS_WORKERS,
+    PG_COPY_MIN_ROWS,
+    WRITE_BATCH_SIZE,
+    WRITE_BEHIND,
+    WRITE_DURABILITY,
+    WRITE_ENQUEUE_TIMEOUT,
+    WRITE_FLUSH_INTERVAL_MS,
+    WRITE_QUEUE_MAX,
+)
+from app.database import AsyncSessionLocal, ReadSessionLocal
+from app.metrics import observe_stage, record_result
+from app.models import (
+    Ticket,
+    TicketFlag,
+    TicketKeyword,
+    rollup_deltas,
+    rollup_params,
+    rollup_upsert,
+    utcnow,
+)
+from app.schemas import (
+    TicketAcceptedResponse,
+    TicketBatchItem,
+    TicketBatchResponse,
+    TicketExportQuery,
+    TicketFilters,
+    TicketListQuery,
+    TicketListResponse,
+    TicketRequest,
+    TicketResponse,
+)
+from app.serialization import TICKET_COLUMNS, page_json, ticket_json, ticket_response
+from app.services.analysis_executor import AnalysisExecutor, ExecutorStats, create_executor
+from app.services.write_queue import WriteBehindQueue
 
 
-def _to_response(ticket: Ticket) -> TicketResponse:
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_COLUMNS = [
+    "id", "subject", "description", "category", "priority", "urgency",
+    "confidence", "keywords", "custom_flags", "created_at",
+]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, ticket_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{ticket_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, ticket_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except ValueError as exc:  # covers binascii.Error and UnicodeDecodeError
+        raise InvalidCursorError(f"invalid cursor: {cursor!r}") from exc
+
+
+def filter_clauses(filters: TicketFilters) -> list:
+    clauses = []
+    if filters.category is not None:
+        clauses.append(Ticket.category == filters.category)
+    if filters.priority is not None:
+        clauses.append(Ticket.priority == filters.priority)
+    if filters.urgency is not None:
+        clauses.append(Ticket.urgency == filters.urgency)
+    if filters.flag is not None:
+        clauses.append(exists().where(
+            TicketFlag.ticket_id == Ticket.id, TicketFlag.flag == filters.flag
+        ))
+    if filters.keyword is not None:
+        clauses.append(exists().where(
+            TicketKeyword.ticket_id == Ticket.id, TicketKeyword.keyword == filters.keyword
+        ))
+    if filters.created_after is not None:
+        clauses.append(Ticket.created_at >= _as_naive_utc(filters.created_after))
+    if filters.created_before is not None:
+        clauses.append(Ticket.created_at < _as_naive_utc(filters.created_before))
+    return clauses
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    """created_at is stored as naive UTC; align aware query values with it."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def _insert_children(
+    db: AsyncSession, ticket_ids: Sequence[int], results: Sequence[AnalysisResult]
+) -> None:
+    """Write the indexed flag / keyword rows for freshly inserted tickets."""
+    flag_rows = [
+        {"ticket_id": tid, "flag": flag}
+        for tid, result in zip(ticket_ids, results)
+        for flag in dict.fromkeys(result.custom_flags)
+    ]
+    keyword_rows = [
+        {"ticket_id": tid, "keyword": kw}
+        for tid, result in zip(ticket_ids, results)
+        for kw in result.keywords
+    ]
+    if flag_rows:
+        await db.execute(insert(TicketFlag), flag_rows)
+    if keyword_rows:
+        await db.execute(insert(TicketKeyword), keyword_rows)
+
+
+def _ticket_row(request: TicketRequest, result: AnalysisResult) -> dict[str, Any]:
+    return {
+        "subject": request.subject,
+        "description": request.description,
+        "category": result.category,
+        "priority": result.priority,
+        "urgency": result.urgency,
+        "confidence": result.confidence,
+        "keywords": result.keywords,
+        "custom_flags": result.custom_flags,
+        "rules_version": result.rules_version,
+    }
+
+
+async def _insert_tickets(db: AsyncSession, rows: list[dict[str, Any]]) -> list[Any]:
+    """
+    Write ticket rows with one Core INSERT … RETURNING id, created_at.
+
+    Bypasses the ORM unit of work: no identity-map bookkeeping, no flush, and
+    no post-commit refresh SELECT – the generated values come back with the
+    insert itself.  Returned rows are in ``rows`` order.
+    """
+    tickets = Ticket.__table__
+    inserted = await db.execute(
+        insert(tickets).returning(
+            tickets.c.id, tickets.c.created_at, sort_by_parameter_order=True
+        ),
+        rows,
+    )
+    return inserted.all()
+
+
+class _CopiedTicket(NamedTuple):
+    id: int
+    created_at: datetime
+
+
+async def _copy_tickets(
+    db: AsyncSession, rows: list[dict[str, Any]], results: Sequence[AnalysisResult]
+) -> list[_CopiedTicket]:
+    """
+    PostgreSQL bulk ingest: reserve ids from the sequence, then stream tickets
+    and their child rows with COPY – no per-row INSERT parsing or planning.
+    Runs inside the session's transaction, so it commits or rolls back with it.
+    """
+    ids = (await db.scalars(
+        select(func.nextval(func.pg_get_serial_sequence("tickets", "id")))
+        .select_from(func.generate_series(1, len(rows)))
+    )).all()
+    now = utcnow()
+    created = [row.get("created_at") or now for row in rows]
+
+    raw = await (await db.connection()).get_raw_connection()
+    pg = raw.driver_connection   # asyncpg connection, already inside the transaction
+    await pg.copy_records_to_table(
+        "tickets",
+        columns=[
+            "id", "subject", "description", "category", "priority", "urgency",
+            "confidence", "keywords", "custom_flags", "created_at", "rules_version",
+        ],
+        records=[
+            (
+                tid, row["subject"], row["description"], row["category"], row["priority"],
+                row["urgency"], row["confidence"], json.dumps(row["keywords"]),
+                json.dumps(row["custom_flags"]), created_at, row["rules_version"],
+            )
+            for tid, row, created_at in zip(ids, rows, created)
+        ],
+    )
+    await pg.copy_records_to_table(
+        "ticket_flags",
+        columns=["ticket_id", "flag"],
+        records=[(tid, f) for tid, r in zip(ids, results) for f in dict.fromkeys(r.custom_flags)],
+    )
+    await pg.copy_records_to_table(
+        "ticket_keywords",
+        columns=["ticket_id", "keyword"],
+        records=[(tid, kw) for tid, r in zip(ids, results) for kw in r.keywords],
+    )
+    return [_CopiedTicket(tid, created_at) for tid, created_at in zip(ids, created)]
+
+
+async def _persist_rows(
+    db: AsyncSession, rows: list[dict[str, Any]], results: Sequence[AnalysisResult]
+) -> list[Any]:
+    """Write tickets, child rows and rollups (uncommitted); COPY for large PostgreSQL batches."""
+    if db.bind.dialect.name == "postgresql" and len(rows) >= PG_COPY_MIN_ROWS:
+        generated = await _copy_tickets(db, rows, results)
+    else:
+        generated = await _insert_tickets(db, rows)
+        await _insert_children(db, [g.id for g in generated], results)
+    await _bump_rollups(db, generated, results)
+    return generated
+
+
+async def _bump_rollups(db: AsyncSession, generated: Sequence[Any], results: Sequence[AnalysisResult]) -> None:
+    """Count new tickets into the stats rollups – one upsert statement per write."""
+    deltas = rollup_deltas(
+        (g.created_at, r.category, r.priority, r.urgency, r.custom_flags, 1)
+        for g, r in zip(generated, results)
+    )
+    if deltas:
+        await db.execute(rollup_upsert(db.bind.dialect.name), rollup_params(deltas))
+
+
+def _row_response(
+    row: dict[str, Any], generated: Any, result: AnalysisResult
+) -> TicketResponse:
     return TicketResponse(
-        id=ticket.id,
-        subject=ticket.subject,
-        description=ticket.description,
-        category=ticket.category,
-        priority=ticket.priority,
-        urgency=ticket.urgency,
-        confidence=ticket.confidence,
-        keywords=ticket.get_keywords(),
-        custom_flags=ticket.get_custom_flags(),
-        created_at=ticket.created_at,
-    )
-
-
-async def analyze_and_save(request: TicketRequest, db: AsyncSession) -> TicketResponse:
-    """Run analysis pipeline and persist the result."""
-    result = analyze(request.subject, request.description)
-
-    ticket = Ticket(
-        subject=request.subject,
-        description=request.description,
+        id=generated.id,
+        subject=row["subject"],
+        description=row["description"],
         category=result.category,
         priority=result.priority,
         urgency=result.urgency,
         confidence=result.confidence,
-        keywords=json.dumps(result.keywords),
-        custom_flags=json.dumps(result.custom_flags),
+        keywords=result.keywords,
+        custom_flags=result.custom_flags,
+        created_at=generated.created_at,
     )
-    db.add(ticket)
+
+
+async def analyze_and_save(
+    request: TicketRequest, db: AsyncSession
+) -> Union[TicketResponse, TicketAcceptedResponse]:
+    """
+    Run analysis pipeline and persist the result.
+
+    With write-behind enabled the ticket goes through the group-commit queue:
+    durability "commit" still returns the stored ticket, "enqueue" returns a
+    TicketAcceptedResponse as soon as it is queued.
+    """
+    result = await _executor.analyze(request.subject, request.description)
+    row = _ticket_row(request, result)
+    if _write_queue is not None:
+        return await _submit(_write_queue, row, result)
+
+    persist_started = started = time.perf_counter()
+    (generated,) = await _persist_rows(db, [row], [result])
+    started = observe_stage("insert", started)
     await db.commit()
-    await db.refresh(ticket)
-    return _to_response(ticket)
+    observe_stage("commit", started)
+    observe_stage("persist", persist_started)
+    record_result(result.category, result.priority, result.custom_flags)
+    _notify_committed()
+    return _row_response(row, generated, result)
+
+
+# ---------------------------------------------------------------------------
+# Commit listeners
+# ---------------------------------------------------------------------------
+
+_commit_listeners: list[Callable[[], None]] = []
+
+
+def on_tickets_committed(listener: Callable[[], None]) -> None:
+    """Register a callback run (on the event loop) after every commit that stored new tickets."""
+    _commit_listeners.append(listener)
+
+
+def _notify_committed() -> None:
+    for listener in list(_commit_listeners):
+        listener()
+
+
+# ---------------------------------------------------------------------------
+# Analysis executor
+# ---------------------------------------------------------------------------
+
+# Inline until the lifespan starts the configured executor
+_executor = AnalysisExecutor("inline")
+
+
+async def start_analysis_executor(
+    mode: str = ANALYSIS_EXECUTOR,
+    workers: int = ANALYSIS_WORKERS,
+    inline_max_chars: int = ANALYSIS_INLINE_MAX_CHARS,
+) -> AnalysisExecutor:
+    """Startup hook: choose where analyze() runs (ANALYSIS_EXECUTOR)."""
+    global _executor
+    executor = create_executor(mode, workers, inline_max_chars)
+    executor.start()
+    await executor.warm_up()
+    _executor = executor
+    return executor
 
 
-async def list_tickets(db: AsyncSession) -> TicketListResponse:
-    """Return all tickets ordered by newest first."""
-    result = await db.execute(select(Ticket).order_by(desc(Ticket.created_at)))
-    tickets = result.scalars().all()
+async def stop_analysis_executor() -> None:
+    """Shutdown hook: back to inline analysis, then stop the pool."""
+    global _executor
+    executor, _executor = _executor, AnalysisExecutor("inline")
+    await executor.shutdown()
+
+
+def executor_stats() -> ExecutorStats:
+    return _executor.stats()
+
+
+async def analyze_many(tickets: Sequence[tuple[str, str]]) -> list[AnalysisResult]:
+    """Analyse (subject, description) pairs on the configured executor, in order."""
+    return await _executor.analyze_many(tickets)
+
+
+# ---------------------------------------------------------------------------
+# Write-behind persistence
+# ---------------------------------------------------------------------------
+
+_write_queue: Optional[WriteBehindQueue] = None
+_durability = WRITE_DURABILITY
+
+
+async def _submit(
+    queue: WriteBehindQueue, row: dict[str, Any], result: AnalysisResult
+) -> Union[TicketResponse, TicketAcceptedResponse]:
+    # Stamped at enqueue time so created_at reflects arrival order and the
+    # "enqueue" response carries the value that will be stored.
+    row["created_at"] = _as_naive_utc(datetime.now(timezone.utc))
+    if _durability == "enqueue":
+        await queue.submit((row, result), wait=False)
+        return TicketAcceptedResponse(
+            subject=row["subject"],
+            description=row["description"],
+            category=result.category,
+            priority=result.priority,
+            urgency=result.urgency,
+            confidence=result.confidence,
+            keywords=result.keywords,
+            custom_flags=result.custom_flags,
+            created_at=row["created_at"],
+        )
+    generated = await queue.submit((row, result))
+    return _row_response(row, generated, result)
+
+
+async def _write_group(items: list[tuple[dict[str, Any], AnalysisResult]]) -> list[Any]:
+    """Persist one group of queued tickets in a single transaction."""
+    rows = [row for row, _ in items]
+    results = [result for _, result in items]
+    async with AsyncSessionLocal() as db:
+        generated = await _persist_rows(db, rows, results)
+        await db.commit()
+    for result in results:
+        record_result(result.category, result.priority, result.custom_flags)
+    _notify_committed()
+    return generated
+
+
+async def start_write_behind(
+    enabled: bool = WRITE_BEHIND,
+    durability: str = WRITE_DURABILITY,
+    batch_size: int = WRITE_BATCH_SIZE,
+    flush_interval_ms: float = WRITE_FLUSH_INTERVAL_MS,
+    maxsize: int = WRITE_QUEUE_MAX,
+    enqueue_timeout: float = WRITE_ENQUEUE_TIMEOUT,
+) -> Optional[WriteBehindQueue]:
+    """Startup hook: route POST /tickets/analyze through a group-commit queue."""
+    global _write_queue, _durability
+    if not enabled:
+        return None
+    if durability not in ("commit", "enqueue"):
+        raise ValueError(f"WRITE_DURABILITY must be 'commit' or 'enqueue', not {durability!r}")
+    queue = WriteBehindQueue(
+        _write_group,
+        batch_size=batch_size,
+        flush_interval=flush_interval_ms / 1000,
+        maxsize=maxsize,
+        enqueue_timeout=enqueue_timeout,
+    )
+    queue.start()
+    _write_queue, _durability = queue, durability
+    return queue
+
+
+async def stop_write_behind() -> None:
+    """Shutdown hook: switch back to direct writes and drain the queue."""
+    global _write_queue
+    queue, _write_queue = _write_queue, None
+    if queue is not None:
+        await queue.close()
+
+
+async def analyze_and_save_batch(items: Sequence[Any], db: AsyncSession) -> TicketBatchResponse:
+    """
+    Validate, analyze and persist many tickets in one transaction.
+
+    Invalid items are reported with their validation errors and skipped; all
+    valid items are written with a single bulk INSERT … RETURNING.  Results are
+    returned in input order.
+    """
+    results: list[TicketBatchItem] = []
+    requests: list[TicketRequest] = []
+    row_items: list[TicketBatchItem] = []
+
+    for index, item in enumerate(items):
+        try:
+            request = TicketRequest.model_validate(item)
+        except ValidationError as exc:
+            results.append(TicketBatchItem(
+                index=index,
+                errors=exc.errors(include_url=False, include_context=False, include_input=False),
+            ))
+            continue
+
+        requests.append(request)
+        item_result = TicketBatchItem(index=index)
+        row_items.append(item_result)
+        results.append(item_result)
+
+    row_results = await _executor.analyze_many([(r.subject, r.description) for r in requests])
+    rows = [_ticket_row(request, result) for request, result in zip(requests, row_results)]
+
+    if rows:
+        started = time.perf_counter()
+        generated = await _persist_rows(db, rows, row_results)
+        await db.commit()
+        observe_stage("persist_batch", started)
+        for item_result, row, gen, result in zip(row_items, rows, generated, row_results):
+            item_result.ticket = _row_response(row, gen, result)
+            record_result(result.category, result.priority, result.custom_flags)
+        _notify_committed()
+
+    return TicketBatchResponse(
+        results=results,
+        created=len(rows),
+        failed=len(results) - len(rows),
+    )
+
+
+async def list_tickets(
+    db: AsyncSession, query: Optional[TicketListQuery] = None
+) -> TicketListResponse:
+    """
+    Return one page of tickets, newest first.
+
+    Pages are keyset-paginated on (created_at, id): the cursor encodes the last
+    row of the previous page, so every page costs the same however deep it is.
+    """
+    rows, total, next_cursor = await _ticket_page(db, query or TicketListQuery())
     return TicketListResponse(
-        tickets=[_to_response(t) for t in tickets],
-        total=len(tickets),
+        tickets=[ticket_response(row) for row in rows],
+        total=total,
+        next_cursor=next_cursor,
+    )
+
+
+async def list_tickets_json(
+    db: AsyncSession, query: Optional[TicketListQuery] = None
+) -> Dict[str, Any]:
+    """
+    list_tickets() as a body for ORJSONResponse (GET /tickets): no models are
+    built and the stored keyword / flag JSON is spliced in, see app.serialization.
+    """
+    return page_json(*await _ticket_page(db, query or TicketListQuery()))
+
+
+async def _ticket_page(
+    db: AsyncSession, query: TicketListQuery
+) -> Tuple[Sequence[Any], Optional[int], Optional[str]]:
+    clauses = filter_clauses(query)
+
+    stmt = (
+        select(*TICKET_COLUMNS)
+        .where(*clauses)
+        .order_by(desc(Ticket.created_at), desc(Ticket.id))
+        .limit(query.limit + 1)
+    )
+    if query.cursor:
+        created_at, ticket_id = decode_cursor(query.cursor)
+        stmt = stmt.where(or_(
+            Ticket.created_at < created_at,
+            and_(Ticket.created_at == created_at, Ticket.id < ticket_id),
+        ))
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > query.limit:
+        rows = rows[:query.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, await _count_tickets(db, clauses, query.total), next_cursor
+
+
+async def _count_tickets(db: AsyncSession, clauses: list, mode: str) -> Optional[int]:
+    """
+    Compute the list total separately from the page query.
+
+    "estimate" uses MAX(id) – an index-only lookup that is exact as long as no
+    rows are deleted – and falls back to an exact COUNT when filters are set.
+    """
+    if mode == "none":
+        return None
+    if mode == "estimate" and not clauses:
+        return await db.scalar(select(func.max(Ticket.id))) or 0
+    return await db.scalar(select(func.count()).select_from(Ticket).where(*clauses))
+
+
+async def export_tickets(query: TicketExportQuery) -> AsyncIterator[str]:
+    """
+    Yield the filtered ticket table as NDJSON lines or CSV, oldest first.
+
+    Rows are streamed from a server-side cursor EXPORT_CHUNK_SIZE at a time,
+    so memory stays flat regardless of table size.  The export owns its
+    session because the response body outlives the request dependencies.
+    """
+    stmt = (
+        select(*TICKET_COLUMNS)
+        .where(*filter_clauses(query))
+        .order_by(Ticket.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
     )
+    if query.format == "csv":
+        yield _csv_chunk([EXPORT_COLUMNS])
+
+    async with ReadSessionLocal() as session:
+        result = await session.stream(stmt)
+        async for chunk in result.partitions():
+            if query.format == "csv":
+                yield _csv_chunk([_csv_row(row) for row in chunk])
+            else:
+                yield "".join(ticket_json(row) + "\n" for row in chunk)
+
+
+def _csv_row(row: Any) -> list[Any]:
+    # Lists are written as JSON so they survive the round trip (json.dumps() form, as before)
+    return [
+        row.id, row.subject, row.description, row.category, row.priority,
+        row.urgency, row.confidence, json.dumps(json.loads(row.keywords)), json.dumps(json.loads(row.custom_flags)),
+        row.created_at.isoformat(),
+    ]
+
+
+def _csv_chunk(rows: list[list[Any]]) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
@@ -0,0 +1,142 @@
+"""
+Write-behind queue with group commit.
+
+Strategy:
+  1. Producers put items on a bounded asyncio.Queue.  When it is full they
+     wait up to ``enqueue_timeout`` (backpressure), then get WriteQueueFullError.
+  2. One background task takes whatever is queued, lingers up to
+     ``flush_interval`` for more while the batch is below ``batch_size``, and
+     hands the batch to ``write_batch`` – one transaction, one commit (one
+     fsync on SQLite) for the whole group.
+  3. Producers that asked to wait get their item's result (or the batch's
+     exception) through a future resolved after the commit.
+  4. close() stops intake and drains every queued item before returning.  It
+     runs in the lifespan shutdown, after the server has finished in-flight
+     requests, so no producer is left waiting.
+
+The queue knows nothing about tickets; the ticket service supplies
+``write_batch``.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from app.metrics import REGISTRY, WRITE_BATCHES, WRITE_FAILURES, Gauge, observe_stage
+
+logger = logging.getLogger(__name__)
+
+WriteBatch = Callable[[List[Any]], Awaitable[Sequence[Any]]]
+
+_STOP = object()
+
+
+class WriteQueueFullError(RuntimeError):
+    """Raised when the queue stays full for longer than the enqueue timeout."""
+
+
+class WriteQueueClosedError(RuntimeError):
+    """Raised when submitting to a queue that is shutting down."""
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        write_batch: WriteBatch,
+        batch_size: int,
+        flush_interval: float,
+        maxsize: int,
+        enqueue_timeout: float,
+    ) -> None:
+        self._write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        REGISTRY.register(Gauge("write_queue_depth", "Tickets waiting for a group commit.", lambda: self.depth))
+        self._task = asyncio.create_task(self._run(), name="write-behind-queue")
+
+    async def submit(self, item: Any, wait: bool = True) -> Any:
+        """
+        Queue ``item``.  With ``wait`` the call returns ``write_batch``'s result
+        for it once its group has committed; otherwise it returns as soon as
+        the item is queued.
+        """
+        if self._closed:
+            raise WriteQueueClosedError("write-behind queue is shutting down")
+        future = asyncio.get_running_loop().create_future() if wait else None
+        try:
+            await asyncio.wait_for(self._queue.put((item, future)), self.enqueue_timeout)
+        except asyncio.TimeoutError as exc:
+            raise WriteQueueFullError(
+                f"write queue full ({self._queue.maxsize} items) for {self.enqueue_timeout}s"
+            ) from exc
+        return await future if future is not None else None
+
+    async def close(self) -> None:
+        """Stop accepting items and wait until everything queued is written."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def _drain_into(self, batch: List[Tuple[Any, Optional[asyncio.Future]]]) -> bool:
+        """Move queued items into ``batch`` without waiting; True if the stop marker was seen."""
+        while len(batch) < self.batch_size:
+            try:
+                entry = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return False
+            if entry is _STOP:
+                return True
+            batch.append(entry)
+        return False
+
+    async def _run(self) -> None:
+        while True:
+            entry = await self._queue.get()
+            if entry is _STOP:
+                return
+            batch = [entry]
+            stop = self._drain_into(batch)
+            if not stop and len(batch) < self.batch_size and self.flush_interval > 0:
+                await asyncio.sleep(self.flush_interval)
+                stop = self._drain_into(batch)
+            await self._flush(batch)
+            if stop:
+                # producers that were blocked on a full queue when close() ran
+                while True:
+                    batch = []
+                    self._drain_into(batch)
+                    if not batch:
+                        return
+                    await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[Any, Optional[asyncio.Future]]]) -> None:
+        started = time.perf_counter()
+        try:
+            results = await self._write_batch([item for item, _ in batch])
+        except Exception as exc:  # noqa: BLE001 – reported to waiters, never kills the writer
+            WRITE_FAILURES.inc(amount=len(batch))
+            logger.exception("write-behind group commit of %d items failed", len(batch))
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+        observe_stage("group_commit", started)
+        WRITE_BATCHES.observe(len(batch))
+        for (_, future), result in zip(batch, results):
+            if future is not None and not future.done():
+                future.set_result(result)
@@ -0,0 +1 @@
+"""Benchmark suite for the analyzer and API hot paths (python -m benchmarks.run)."""
@@ -0,0 +1,317 @@
+"""
+Analyzer and API benchmark suite.
+
+    python -m benchmarks.run --tickets 5000 --requests 500 -o results.json
+    python -m benchmarks.run --compare results.json     # diff against a baseline
+
+Strategy:
+  1. Generate a synthetic corpus (see benchmarks.corpus).
+  2. analyze(): per-call latency (p50/p99) and throughput of the full pipeline
+     with the result cache bypassed, then a second pass served by the cache.
+     analyze_many(): throughput of columnar scoring of the whole corpus.
+  3. API: POST /tickets/analyze, GET /tickets (plain and filtered) and
+     GET /tickets/search through ASGITransport against a throwaway SQLite
+     file pre-populated with ``--seed-tickets`` rows, so the dev database is
+     never touched.
+  4. Memory: tracemalloc peak allocation per call, measured in a separate pass
+     so tracing overhead does not skew the timings.
+  5. Write everything, plus run metadata, to a JSON file for comparison.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.analyzers.analyzer import RESULT_CACHE, analyze, analyze_context
+from app.analyzers.context import AnalysisContext
+from app.analyzers.vectorized import analyze_many
+from app.database import _create_schema, create_engines, get_db, get_read_db
+from app.main import app
+from app.schemas import MAX_BATCH_SIZE
+from app.services.ticket_service import analyze_and_save_batch
+from benchmarks.corpus import generate_corpus
+
+Corpus = List[Tuple[str, str]]
+
+# Metrics diffed by --compare
+COMPARED = ("throughput_per_s", "p50_ms", "p99_ms", "mem_peak_kib_mean")
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+def summarise(latencies_ns: List[int], wall_s: float) -> Dict[str, float]:
+    values = sorted(ns / 1e6 for ns in latencies_ns)
+    return {
+        "count": len(values),
+        "wall_s": round(wall_s, 4),
+        "throughput_per_s": round(len(values) / wall_s, 1) if wall_s > 0 else 0.0,
+        "mean_ms": round(sum(values) / len(values), 4) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 4),
+        "p99_ms": round(percentile(values, 99), 4),
+        "max_ms": round(values[-1], 4) if values else 0.0,
+    }
+
+
+def _memory(peaks: List[int]) -> Dict[str, float]:
+    if not peaks:
+        return {"mem_peak_kib_mean": 0.0, "mem_peak_kib_max": 0.0}
+    return {
+        "mem_peak_kib_mean": round(sum(peaks) / len(peaks) / 1024, 2),
+        "mem_peak_kib_max": round(max(peaks) / 1024, 2),
+    }
+
+
+# ---------------------------------------------------------------------------
+# analyze()
+# ---------------------------------------------------------------------------
+
+
+def _time_calls(fn: Callable[[str, str], Any], corpus: Corpus) -> Dict[str, float]:
+    latencies: List[int] = []
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+    for subject, description in corpus:
+        t0 = clock()
+        fn(subject, description)
+        latencies.append(clock() - t0)
+    return summarise(latencies, time.perf_counter() - start)
+
+
+def _memory_calls(fn: Callable[[str, str], Any], corpus: Corpus) -> Dict[str, float]:
+    peaks: List[int] = []
+    tracemalloc.start()
+    try:
+        for subject, description in corpus:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(subject, description)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return _memory(peaks)
+
+
+def _uncached(subject: str, description: str) -> Any:
+    return analyze_context(AnalysisContext(subject, description))
+
+
+def bench_analyze(corpus: Corpus, memory_sample: int) -> Dict[str, Dict[str, float]]:
+    RESULT_CACHE.clear()
+    pipeline = {
+        **_time_calls(_uncached, corpus),
+        **_memory_calls(_uncached, corpus[:memory_sample]),
+    }
+
+    for subject, description in corpus:   # warm the cache
+        analyze(subject, description)
+    cached = _time_calls(analyze, corpus)
+    RESULT_CACHE.clear()
+
+    subjects = [subject for subject, _ in corpus]
+    descriptions = [description for _, description in corpus]
+    start = time.perf_counter()
+    analyze_many(subjects, descriptions)
+    wall = time.perf_counter() - start
+    batch = {"count": len(corpus), "wall_s": round(wall, 4), "throughput_per_s": round(len(corpus) / wall, 1)}
+    return {"analyze": pipeline, "analyze_cached": cached, "analyze_many": batch}
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+
+async def _time_requests(
+    send: Callable[[int], Awaitable[Any]], count: int, memory_sample: int
+) -> Dict[str, float]:
+    latencies: List[int] = []
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+    for i in range(count):
+        t0 = clock()
+        resp = await send(i)
+        latencies.append(clock() - t0)
+        resp.raise_for_status()
+    result = summarise(latencies, time.perf_counter() - start)
+
+    peaks: List[int] = []
+    tracemalloc.start()
+    try:
+        for i in range(memory_sample):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            await send(count + i)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return {**result, **_memory(peaks)}
+
+
+async def bench_api(
+    corpus: Corpus, seed_tickets: int, requests: int, memory_sample: int
+) -> Dict[str, Dict[str, float]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        # Same engine profile (SQLITE_PROFILE) as the app, on a throwaway file
+        engine, read_engine = create_engines(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        read_sessions = async_sessionmaker(read_engine, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_schema)
+
+        payloads = [
+            {"subject": s[:300], "description": d[:5000]} for s, d in corpus
+        ]
+        async with sessions() as db:
+            for i in range(0, seed_tickets, MAX_BATCH_SIZE):
+                chunk = [payloads[j % len(payloads)] for j in range(i, min(i + MAX_BATCH_SIZE, seed_tickets))]
+                await analyze_and_save_batch(chunk, db)
+
+        async def override_db():
+            async with sessions() as session:
+                yield session
+
+        async def override_read_db():
+            async with read_sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[get_read_db] = override_read_db
+        RESULT_CACHE.clear()
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+                results = {
+                    "post_analyze": await _time_requests(
+                        lambda i: client.post("/tickets/analyze", json=payloads[i % len(payloads)]),
+                        requests, memory_sample,
+                    ),
+                    "get_tickets": await _time_requests(
+                        lambda i: client.get("/tickets"), requests, memory_sample,
+                    ),
+                    "get_tickets_filtered": await _time_requests(
+                        lambda i: client.get("/tickets", params={"priority": "P0", "urgency": "true"}),
+                        requests, memory_sample,
+                    ),
+                    "search_tickets": await _time_requests(
+                        lambda i: client.get("/tickets/search", params={"q": "refund payment"}),
+                        requests, memory_sample,
+                    ),
+                }
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            app.dependency_overrides.pop(get_read_db, None)
+            RESULT_CACHE.clear()
+            await engine.dispose()
+            await read_engine.dispose()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Orchestration & reporting
+# ---------------------------------------------------------------------------
+
+
+def run_benchmarks(
+    tickets: int = 2000,
+    requests: int = 200,
+    seed_tickets: int = 5000,
+    mean_words: int = 40,
+    max_words: int = 400,
+    memory_sample: int = 50,
+    seed: int = 0,
+    skip_api: bool = False,
+) -> Dict[str, Any]:
+    """Run the suite and return the JSON-serialisable results document."""
+    corpus = generate_corpus(tickets, seed=seed, mean_words=mean_words, max_words=max_words)
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {
+                "tickets": tickets, "requests": requests, "seed_tickets": seed_tickets,
+                "mean_words": mean_words, "max_words": max_words,
+                "memory_sample": memory_sample, "seed": seed,
+            },
+        },
+        **bench_analyze(corpus, memory_sample),
+    }
+    if not skip_api:
+        results.update(asyncio.run(bench_api(corpus, seed_tickets, requests, memory_sample)))
+    return results
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Human-readable per-metric deltas between two result documents."""
+    lines = [f"{'benchmark':<22} {'metric':<18} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for name, metrics in current.items():
+        if name == "meta" or name not in baseline:
+            continue
+        for key in COMPARED:
+            old, new = baseline[name].get(key), metrics.get(key)
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            lines.append(f"{name:<22} {key:<18} {old:>12} {new:>12} {change:>9}")
+    return lines
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark analyze() and the ticket API hot paths.",
+    )
+    parser.add_argument("--tickets", type=int, default=2000, help="corpus size for analyze()")
+    parser.add_argument("--requests", type=int, default=200, help="requests per API benchmark")
+    parser.add_argument("--seed-tickets", type=int, default=5000, help="rows pre-loaded into the bench DB")
+    parser.add_argument("--mean-words", type=int, default=40, help="mean description length in words")
+    parser.add_argument("--max-words", type=int, default=400, help="longest description in words")
+    parser.add_argument("--memory-sample", type=int, default=50, help="calls traced for memory per benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-api", action="store_true", help="only benchmark analyze()")
+    parser.add_argument("-o", "--output", help="write results JSON here (default stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="print deltas against a previous results file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        tickets=args.tickets, requests=args.requests, seed_tickets=args.seed_tickets,
+        mean_words=args.mean_words, max_words=args.max_words,
+        memory_sample=args.memory_sample, seed=args.seed, skip_api=args.skip_api,
+    )
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        sys.stderr.write("\n".join(compare(baseline, results)) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
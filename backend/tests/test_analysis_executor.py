@@ -0,0 +1,152 @@
+"""
+Tests for the analysis executor – inline, thread and process modes.
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+from app.analyzers.analyzer import RESULT_CACHE, analyze
+from app.analyzers.rules import RuleSet, compile_rules, current_snapshot, install_snapshot
+from app.metrics import ANALYSIS_RUNS
+from app.services.analysis_executor import AnalysisExecutor, default_workers
+
+SMALL = ("Refund please", "I was charged twice")
+LARGE = ("Server outage", "The production server is down and the app keeps crashing. " * 100)
+
+
+@pytest_asyncio.fixture
+async def make_executor():
+    created = []
+
+    def _make(mode: str, **kwargs) -> AnalysisExecutor:
+        executor = AnalysisExecutor(mode, **kwargs)
+        executor.start()
+        created.append(executor)
+        return executor
+
+    original = current_snapshot()
+    yield _make
+    install_snapshot(original)
+    for executor in created:
+        await executor.shutdown()
+
+
+def _runs(executor: str) -> float:
+    return ANALYSIS_RUNS.value(executor)
+
+
+# ---------------------------------------------------------------------------
+# Routing
+# ---------------------------------------------------------------------------
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        AnalysisExecutor("gpu")
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+async def test_modes_match_inline_analysis(make_executor, mode):
+    RESULT_CACHE.clear()
+    executor = make_executor(mode, workers=1)
+    tickets = [SMALL, LARGE, ("Feature idea", "Please add dark mode")]
+    assert await executor.analyze_many(tickets) == [analyze(*t) for t in tickets]
+
+
+async def test_auto_offloads_only_large_tickets(make_executor):
+    RESULT_CACHE.clear()
+    executor = make_executor("auto", workers=1, inline_max_chars=1000)
+    inline, process = _runs("inline"), _runs("process")
+
+    await executor.analyze(*SMALL)
+    assert (_runs("inline"), _runs("process")) == (inline + 1, process)
+
+    await executor.analyze(*LARGE)
+    assert _runs("process") == process + 1
+
+    await executor.analyze(*LARGE)   # cache hit: answered on the loop, no round trip
+    assert (_runs("inline"), _runs("process")) == (inline + 2, process + 1)
+
+
+async def test_auto_routes_each_ticket_of_a_batch_by_its_own_size(make_executor):
+    RESULT_CACHE.clear()
+    executor = make_executor("auto", workers=2, inline_max_chars=1000)
+    tickets = [SMALL, LARGE, ("Feature idea", "Please add dark mode"), ("Outage", LARGE[1])]
+    inline, process = _runs("inline"), _runs("process")
+
+    assert await executor.analyze_many(tickets) == [analyze(*t) for t in tickets]
+    assert (_runs("inline"), _runs("process")) == (inline + 2, process + 2)
+
+
+async def test_inline_batches_yield_to_the_event_loop(make_executor):
+    executor = make_executor("auto", workers=1, inline_max_chars=100)
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0)
+            ticks += 1
+
+    task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    await executor.analyze_many([SMALL] * 50)
+    task.cancel()
+    assert ticks >= 10
+
+
+async def test_warm_up_starts_every_pool_worker(make_executor):
+    executor = make_executor("process", workers=2)
+    await executor.warm_up()
+    assert len(executor._pool._processes) == 2
+
+
+def test_default_pool_size_is_shared_between_server_workers(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    monkeypatch.delenv("APP_WORKER_COUNT", raising=False)
+    assert default_workers() == 4
+    monkeypatch.setenv("APP_WORKER_COUNT", "4")
+    assert default_workers() == 2
+    monkeypatch.setenv("APP_WORKER_COUNT", "16")
+    assert default_workers() == 1
+
+
+async def test_event_loop_stays_responsive_while_offloaded(make_executor):
+    RESULT_CACHE.clear()
+    executor = make_executor("process", workers=1)
+    tickets = [(f"Outage {i}", LARGE[1]) for i in range(200)]
+    await executor.analyze(*SMALL)   # pool warm
+
+    ticks = 0
+    seen_pending = 0
+
+    async def heartbeat():
+        nonlocal ticks, seen_pending
+        while True:
+            await asyncio.sleep(0.001)
+            ticks += 1
+            seen_pending = max(seen_pending, executor.pending)
+
+    task = asyncio.create_task(heartbeat())
+    await executor.analyze_many(tickets)
+    task.cancel()
+    assert ticks > 5
+    assert seen_pending == len(tickets)
+    assert executor.pending == 0
+
+
+# ---------------------------------------------------------------------------
+# Rule reloads
+# ---------------------------------------------------------------------------
+
+
+async def test_process_pool_follows_rule_reload(make_executor):
+    RESULT_CACHE.clear()
+    executor = make_executor("process", workers=1)
+    text = ("Hello", "VIP customer here")
+    assert "vip_customer" not in (await executor.analyze(*text)).custom_flags
+
+    rules = RuleSet.from_dict({"rules": [{"flag": "vip_customer", "keywords": ["vip"], "priority": "P1"}]})
+    install_snapshot(compile_rules(rules, source="test"))
+    result = await executor.analyze(*text)
+    assert result.custom_flags == ["vip_customer"] and result.priority == "P1"
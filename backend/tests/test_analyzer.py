@@ -0,0 +1,79 @@
+"""Unit tests for the analyzer orchestrator and its shared context."""
+import pytest
+from app.analyzers.analyzer import analyze, analyze_context
+from app.analyzers.classifier import classify_context
+from app.analyzers.context import AnalysisContext
+
+
+# ---------------------------------------------------------------------------
+# AnalysisContext
+# ---------------------------------------------------------------------------
+
+
+def test_context_normalises_text_once():
+    ctx = AnalysisContext("URGENT Refund", "Payment FAILED")
+    assert ctx.text == "urgent refund payment failed"
+    assert ctx.has("urgency")
+    assert ctx.keywords("refund_detected") == ["refund"]
+    assert ctx.keywords("Account") == []
+
+
+def test_context_token_offsets():
+    ctx = AnalysisContext("Login", "can't sign-in")
+    assert [ctx.text[s:e] for s, e in ctx.tokens] == ["login", "can", "t", "sign", "in"]
+
+
+def test_context_hits_carry_offsets_and_groups():
+    ctx = AnalysisContext("Refund", "please")
+    (hit,) = [h for h in ctx.hits if h.keyword == "refund"]
+    assert hit.start == 0
+    assert set(hit.groups) == {"Billing", "refund_detected"}
+
+
+# ---------------------------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------------------------
+
+
+def test_analyze_context_matches_analyze():
+    subject, description = "Security breach", "I think my account was hacked"
+    assert analyze_context(AnalysisContext(subject, description)) == analyze(subject, description)
+
+
+def test_security_overrides_category_and_confidence():
+    result = analyze("Security breach", "I think my account was hacked")
+    assert result.priority == "P0"
+    assert result.category == "Technical"
+    assert result.confidence >= 0.95
+    assert result.custom_flags == ["security_escalation"]
+
+
+# ---------------------------------------------------------------------------
+# Decision table
+# ---------------------------------------------------------------------------
+
+
+def _full_evaluation(ctx):
+    """classify → decision table → overrides, spelled out step by step."""
+    category, confidence, keywords = classify_context(ctx)
+    decisions = ctx.snapshot.decisions
+    decision = decisions.resolve(ctx.matches, ctx.has("urgency"), category)
+    if decision.min_confidence is not None:
+        confidence = max(confidence, decision.min_confidence)
+    return (decision.category or category, decision.priority, round(confidence, 4),
+            list(dict.fromkeys(keywords)), list(decision.flags))
+
+
+@pytest.mark.parametrize("subject, description", [
+    ("Security breach", "hacked account asap, server error and refund"),
+    ("Data loss", "all my files were deleted, invoice attached"),
+    ("Refund", "please refund my payment"),
+    ("Refund", "urgent refund, the server is down"),       # urgent Technical is P0 by the ladder
+    ("GDPR", "data protection request for my account"),    # no category override
+    ("Idea", "add dark mode"),
+])
+def test_analysis_matches_step_by_step_evaluation(subject, description):
+    ctx = AnalysisContext(subject, description)
+    result = analyze_context(ctx)
+    assert (result.category, result.priority, result.confidence, result.keywords, result.custom_flags) \
+        == _full_evaluation(ctx)
@@ -4,19 +4,32 @@ Integration tests for the REST API.
 Uses httpx.AsyncClient with ASGITransport so no real server is needed.
 An in-memory SQLite DB is used per test run.
 """
+import asyncio
+import csv
+import io
+import json
+
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
 
 from app.main import app
-from app.database import engine, Base
+from app.database import engine, Base, _create_schema
+from app.services.feed_service import start_feed, stop_feed
+from app.services.ticket_service import (
+    start_analysis_executor,
+    start_write_behind,
+    stop_analysis_executor,
+    stop_write_behind,
+)
 
 
 @pytest_asyncio.fixture(autouse=True)
 async def setup_db():
-    """Create tables before each test, drop after."""
+    """Create (or migrate) tables before each test, drop after."""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_schema)
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -103,6 +116,71 @@ async def test_analyze_validates_missing_fields(client):
     assert resp.status_code == 422
 
 
+async def test_analyze_rejects_non_string_subject(client):
+    resp = await client.post("/tickets/analyze", json={
+        "subject": 123,
+        "description": "Some description",
+    })
+    assert resp.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# POST /tickets/analyze/batch
+# ---------------------------------------------------------------------------
+
+
+async def test_batch_analyze_preserves_input_order(client):
+    resp = await client.post("/tickets/analyze/batch", json={"tickets": [
+        {"subject": "Refund request", "description": "Please process my refund"},
+        {"subject": "App is down", "description": "Getting 500 errors, this is urgent"},
+        {"subject": "Idea", "description": "Add dark mode please"},
+    ]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["created"] == 3
+    assert data["failed"] == 0
+    assert [r["index"] for r in data["results"]] == [0, 1, 2]
+    tickets = [r["ticket"] for r in data["results"]]
+    assert "refund_detected" in tickets[0]["custom_flags"]
+    assert tickets[1]["priority"] == "P0"
+    assert tickets[2]["priority"] == "P3"
+    assert tickets[0]["id"] < tickets[1]["id"] < tickets[2]["id"]
+
+    listed = (await client.get("/tickets")).json()
+    assert listed["total"] == 3
+
+
+async def test_batch_analyze_reports_per_item_errors(client):
+    resp = await client.post("/tickets/analyze/batch", json={"tickets": [
+        {"subject": "", "description": "Some description"},
+        {"subject": "Invoice", "description": "I have a billing question"},
+        "not a ticket",
+    ]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["created"] == 1
+    assert data["failed"] == 2
+    first, second, third = data["results"]
+    assert first["ticket"] is None
+    assert first["errors"][0]["loc"] == ["subject"]
+    assert second["errors"] is None
+    assert second["ticket"]["category"] == "Billing"
+    assert third["ticket"] is None
+    assert third["errors"]
+
+
+async def test_batch_analyze_all_invalid_writes_nothing(client):
+    resp = await client.post("/tickets/analyze/batch", json={"tickets": [{}]})
+    assert resp.status_code == 200
+    assert resp.json()["created"] == 0
+    assert (await client.get("/tickets")).json()["total"] == 0
+
+
+async def test_batch_analyze_rejects_empty_batch(client):
+    resp = await client.post("/tickets/analyze/batch", json={"tickets": []})
+    assert resp.status_code == 422
+
+
 # ---------------------------------------------------------------------------
 # GET /tickets
 # ---------------------------------------------------------------------------
@@ -140,3 +218,411 @@ async def test_health(client):
     resp = await client.get("/health")
     assert resp.status_code == 200
     assert resp.json() == {"status": "ok"}
+
+
+# ---------------------------------------------------------------------------
+# GET /tickets – pagination & filters
+# ---------------------------------------------------------------------------
+
+
+async def _seed(client, tickets):
+    resp = await client.post("/tickets/analyze/batch", json={"tickets": [
+        {"subject": s, "description": d} for s, d in tickets
+    ]})
+    assert resp.status_code == 200
+
+
+async def test_get_tickets_keyset_pagination(client):
+    await _seed(client, [(f"Ticket {i}", "Some issue") for i in range(5)])
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        data = (await client.get("/tickets", params=params)).json()
+        assert data["total"] == 5
+        seen.extend(t["id"] for t in data["tickets"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+async def test_get_tickets_filters(client):
+    await _seed(client, [
+        ("Refund request", "Please process my refund"),
+        ("App is down", "Getting 500 errors, this is urgent"),
+        ("Idea", "Add dark mode please"),
+    ])
+
+    data = (await client.get("/tickets", params={"priority": "P0"})).json()
+    assert data["total"] == 1
+    assert data["tickets"][0]["subject"] == "App is down"
+
+    data = (await client.get("/tickets", params={"flag": "refund_detected"})).json()
+    assert [t["subject"] for t in data["tickets"]] == ["Refund request"]
+
+    data = (await client.get("/tickets", params={"urgency": "false", "category": "Billing"})).json()
+    assert [t["subject"] for t in data["tickets"]] == ["Refund request"]
+
+
+async def test_get_tickets_total_modes(client):
+    await _seed(client, [("Ticket", "Some issue")] * 3)
+    assert (await client.get("/tickets", params={"total": "none"})).json()["total"] is None
+    assert (await client.get("/tickets", params={"total": "estimate"})).json()["total"] == 3
+
+
+async def test_get_tickets_invalid_cursor(client):
+    resp = await client.get("/tickets", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+async def test_get_tickets_invalid_priority_filter(client):
+    resp = await client.get("/tickets", params={"priority": "P9"})
+    assert resp.status_code == 422
+
+
+async def test_get_tickets_keyword_and_time_filters(client):
+    await _seed(client, [
+        ("Invoice", "I have a billing question"),
+        ("Login problem", "My account is locked"),
+    ])
+
+    data = (await client.get("/tickets", params={"keyword": "locked"})).json()
+    assert [t["subject"] for t in data["tickets"]] == ["Login problem"]
+
+    data = (await client.get("/tickets", params={"created_after": "2000-01-01T00:00:00Z"})).json()
+    assert data["total"] == 2
+    data = (await client.get("/tickets", params={"created_before": "2000-01-01T00:00:00Z"})).json()
+    assert data["total"] == 0
+
+
+# ---------------------------------------------------------------------------
+# GET /tickets/search
+# ---------------------------------------------------------------------------
+
+
+async def test_search_ranks_highlights_and_filters(client):
+    await _seed(client, [
+        ("Voucher refund", "Please refund the voucher for the duplicate payment"),
+        ("Login problem", "My account is locked, maybe a voucher is needed too"),
+        ("Idea", "Add dark mode please"),
+    ])
+    await client.post("/tickets/analyze", json={"subject": "Voucher", "description": "Voucher expired"})
+
+    resp = await client.get("/tickets/search", params={"q": "voucher"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 3
+    assert [t["subject"] for t in data["tickets"]][-1] == "Login problem"      # body-only match ranks last
+    scores = [t["score"] for t in data["tickets"]]
+    assert scores == sorted(scores, reverse=True)
+    assert "<mark>voucher</mark>" in data["tickets"][-1]["snippet"]
+
+    data = (await client.get("/tickets/search", params={"q": "voucher", "category": "Account"})).json()
+    assert [t["subject"] for t in data["tickets"]] == ["Login problem"]
+    data = (await client.get("/tickets/search", params={"q": "vouch* DUPLICATE"})).json()
+    assert [t["subject"] for t in data["tickets"]] == ["Voucher refund"]
+
+
+async def test_search_pagination_visits_every_hit_once(client):
+    await _seed(client, [(f"Ticket {i}", "Voucher " * (i % 3 + 1)) for i in range(7)])
+    seen, cursor = [], None
+    while True:
+        params = {"q": "voucher", "limit": 3, **({"cursor": cursor} if cursor else {})}
+        data = (await client.get("/tickets/search", params=params)).json()
+        assert data["total"] == 7
+        seen.extend(t["id"] for t in data["tickets"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 7 and len(set(seen)) == 7
+
+
+async def test_search_rejects_bad_input(client):
+    assert (await client.get("/tickets/search")).status_code == 422
+    assert (await client.get("/tickets/search", params={"q": "\"*!"})).status_code == 422
+    assert (await client.get("/tickets/search", params={"q": "x", "cursor": "not-a-cursor"})).status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# GET /tickets/stream
+# ---------------------------------------------------------------------------
+
+
+async def test_stream_unavailable_without_feed(client):
+    resp = await client.get("/tickets/stream")
+    assert resp.status_code == 503
+
+
+async def test_stream_rejects_bad_resume_ids(client):
+    await start_feed()
+    try:
+        resp = await client.get("/tickets/stream", headers={"Last-Event-ID": "abc"})
+        assert resp.status_code == 400
+        resp = await client.get("/tickets/stream", params={"priority": "P9"})
+        assert resp.status_code == 422
+    finally:
+        await stop_feed()
+
+
+# ---------------------------------------------------------------------------
+# GET /tickets/stats
+# ---------------------------------------------------------------------------
+
+
+async def test_stats_match_stored_tickets(client):
+    await _seed(client, [
+        ("Security breach", "Our account was hacked urgently"),
+        ("Refund please", "I was charged twice"),
+        ("Refund again", "Double charged"),
+    ])
+    await client.post("/tickets/analyze", json={"subject": "Feature idea", "description": "Add dark mode"})
+    tickets = (await client.get("/tickets")).json()["tickets"]
+
+    resp = await client.get("/tickets/stats")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["granularity"] == "hour" and len(data["series"]) == 24
+    for counts in (data["totals"], data["all_time"]):
+        assert counts["tickets"] == 4
+        assert counts["urgent"] == sum(t["urgency"] for t in tickets)
+        assert sum(counts["priority"].values()) == 4
+        assert counts["category"]["Billing"] == sum(t["category"] == "Billing" for t in tickets)
+        assert counts["flag"]["refund_detected"] == 2
+    assert sum(bucket["tickets"] for bucket in data["series"]) == 4
+
+
+async def test_stats_minute_series_and_window_validation(client):
+    await _seed(client, [("Refund please", "I was charged twice")])
+    data = (await client.get("/tickets/stats", params={"granularity": "minute"})).json()
+    assert len(data["series"]) == 60 and data["totals"]["tickets"] == 1
+
+    old = (await client.get("/tickets/stats", params={
+        "since": "2020-01-01T00:00:00Z", "until": "2020-01-02T00:00:00Z",
+    })).json()
+    assert old["totals"]["tickets"] == 0 and old["all_time"]["tickets"] == 1
+
+    too_long = await client.get("/tickets/stats", params={"since": "2020-01-01T00:00:00Z"})
+    assert too_long.status_code == 422
+    backwards = await client.get("/tickets/stats", params={
+        "since": "2020-01-02T00:00:00Z", "until": "2020-01-01T00:00:00Z",
+    })
+    assert backwards.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# GET /tickets/export
+# ---------------------------------------------------------------------------
+
+
+async def test_export_ndjson_streams_all_rows(client, monkeypatch):
+    from app.services import ticket_service
+    monkeypatch.setattr(ticket_service, "EXPORT_CHUNK_SIZE", 2)
+    await _seed(client, [(f"Ticket {i}", "Some issue") for i in range(5)])
+
+    resp = await client.get("/tickets/export")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["subject"] for r in rows] == [f"Ticket {i}" for i in range(5)]
+    assert isinstance(rows[0]["keywords"], list)
+
+
+async def test_export_csv_with_filter(client):
+    await _seed(client, [
+        ("Refund request", "Please process my refund"),
+        ("Idea", "Add dark mode please"),
+    ])
+    resp = await client.get("/tickets/export", params={"format": "csv", "flag": "refund_detected"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(resp.text)))
+    assert rows[0][:3] == ["id", "subject", "description"]
+    assert len(rows) == 2
+    assert rows[1][1] == "Refund request"
+    assert json.loads(rows[1][8]) == ["refund_detected"]
+
+
+# ---------------------------------------------------------------------------
+# Analyzer rules
+# ---------------------------------------------------------------------------
+
+
+async def test_get_rules(client):
+    resp = await client.get("/analyzer/rules")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["source"] == "config"
+    assert len(data["version"]) == 12
+    assert "security_escalation" in [r["flag"] for r in data["rules"]["rules"]]
+
+
+async def test_get_rule_decisions(client):
+    resp = await client.get("/analyzer/rules/decisions")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["rules"][0] == "security_escalation"
+    first_rule = [row for row in data["rows"] if row["rule"] == "security_escalation"]
+    assert {row["priority"] for row in first_rule} == {"P0"}
+    assert len(data["rows"]) == (len(data["rules"]) + 1) * 2 * len(data["categories"])
+
+
+async def test_reload_rules_without_rules_file(client):
+    resp = await client.post("/analyzer/rules/reload")
+    assert resp.status_code == 409
+
+
+async def test_cache_stats(client):
+    await _seed(client, [("Refund please", "Charged twice")] * 3)
+    resp = await client.get("/analyzer/cache")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["hits"] >= 2
+    assert 0 < data["size"] <= data["maxsize"]
+    assert 0.0 <= data["hit_rate"] <= 1.0
+
+
+async def test_reanalysis_endpoints(client):
+    from app.services.reanalysis_service import start_reanalysis, stop_reanalysis
+
+    assert (await client.get("/analyzer/reanalysis")).status_code == 503   # job not started
+    await _seed(client, [("Refund please", "Charged twice")] * 2)
+    await start_reanalysis(auto=False)
+    try:
+        resp = await client.post("/analyzer/reanalysis")
+        assert resp.status_code == 202
+        for _ in range(50):
+            data = (await client.get("/analyzer/reanalysis")).json()
+            if data["runs"] == 1 and data["state"] == "idle":
+                break
+            await asyncio.sleep(0.01)
+        assert data["stale"] == 0 and data["rules_version"] == data["active_rules_version"]
+    finally:
+        await stop_reanalysis()
+
+
+async def test_executor_offloads_large_tickets(client):
+    await start_analysis_executor(mode="auto", workers=1, inline_max_chars=100)
+    try:
+        small = await client.post("/tickets/analyze", json={"subject": "Refund", "description": "Charged twice"})
+        large = await client.post("/tickets/analyze", json={
+            "subject": "Server down", "description": "The server is down and crashing. " * 20,
+        })
+        assert small.status_code == large.status_code == 201
+        assert large.json()["category"] == "Technical"
+        data = (await client.get("/analyzer/executor")).json()
+        assert data["mode"] == "auto" and data["workers"] == 1
+        assert data["offloaded"] >= 1 and data["pending"] == 0
+    finally:
+        await stop_analysis_executor()
+
+
+# ---------------------------------------------------------------------------
+# GET /metrics
+# ---------------------------------------------------------------------------
+
+
+async def test_metrics_endpoint(client):
+    await client.post("/tickets/analyze", json={
+        "subject": "Security breach", "description": "Our account was hacked",
+    })
+    await client.get("/tickets")
+    await client.get("/no/such/path")
+
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/tickets/analyze",status="201"}' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/tickets",status="200"}' in text
+    assert 'route="unmatched",status="404"' in text
+    assert 'ticket_stage_duration_seconds_count{stage="commit"}' in text
+    assert 'tickets_analyzed_total{category="Technical",priority="P0"}' in text
+    assert 'ticket_custom_flags_total{flag="security_escalation"}' in text
+    assert 'db_pool_checked_out{pool="write"} 0.0' in text
+
+
+# ---------------------------------------------------------------------------
+# Persistence round trips
+# ---------------------------------------------------------------------------
+
+
+async def test_analyze_response_matches_stored_row(client):
+    created = (await client.post("/tickets/analyze", json={
+        "subject": "Refund", "description": "Please refund my duplicate payment",
+    })).json()
+    listed = (await client.get("/tickets")).json()["tickets"][0]
+    assert created == listed
+
+
+async def test_analyze_issues_no_select(client):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        resp = await client.post("/tickets/analyze", json={
+            "subject": "Security breach", "description": "Our account was hacked",
+        })
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    assert resp.status_code == 201
+    assert "SELECT" not in statements
+    assert statements.count("INSERT") == 4   # ticket, flags, keywords, rollup upsert
+
+
+# ---------------------------------------------------------------------------
+# Write-behind persistence
+# ---------------------------------------------------------------------------
+
+
+async def test_write_behind_counts_into_stats(client):
+    await start_write_behind(enabled=True, durability="enqueue", flush_interval_ms=5)
+    try:
+        for _ in range(3):
+            await client.post("/tickets/analyze", json={"subject": "Refund", "description": "Charged twice"})
+    finally:
+        await stop_write_behind()
+    assert (await client.get("/tickets/stats")).json()["all_time"]["flag"]["refund_detected"] == 3
+
+
+async def test_write_behind_commit_durability(client):
+    await start_write_behind(enabled=True, durability="commit", flush_interval_ms=5)
+    try:
+        responses = await asyncio.gather(*(
+            client.post("/tickets/analyze", json={"subject": f"Ticket {i}", "description": "App crashed"})
+            for i in range(10)
+        ))
+    finally:
+        await stop_write_behind()
+    assert all(r.status_code == 201 for r in responses)
+    ids = {r.json()["id"] for r in responses}
+    assert len(ids) == 10
+
+    listed = (await client.get("/tickets")).json()
+    assert {t["id"] for t in listed["tickets"]} == ids
+
+
+async def test_write_behind_enqueue_durability(client):
+    await start_write_behind(enabled=True, durability="enqueue", flush_interval_ms=5)
+    try:
+        resp = await client.post("/tickets/analyze", json={
+            "subject": "Refund", "description": "Please refund my payment",
+        })
+        assert resp.status_code == 202
+        queued = resp.json()
+        assert queued["status"] == "queued"
+        assert queued["custom_flags"] == ["refund_detected"]
+    finally:
+        await stop_write_behind()   # drains the queue
+
+    stored = (await client.get("/tickets")).json()["tickets"]
+    assert len(stored) == 1
+    assert stored[0]["created_at"] == queued["created_at"]
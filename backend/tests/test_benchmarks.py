@@ -0,0 +1,43 @@
+"""Smoke tests for the benchmark suite (tiny sizes – correctness, not speed)."""
+import json
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.run import compare, main, percentile
+
+
+def test_corpus_is_deterministic_and_bounded():
+    corpus = generate_corpus(200, seed=7, mean_words=20, min_words=3, max_words=50)
+    assert corpus == generate_corpus(200, seed=7, mean_words=20, min_words=3, max_words=50)
+    lengths = [len(description.split()) for _, description in corpus]
+    assert min(lengths) >= 3
+    # multi-word keywords may add a few words on top of the cap
+    assert max(lengths) <= 50 * 3
+
+
+def test_duplicate_ratio():
+    corpus = generate_corpus(500, seed=1, duplicate_ratio=0.5)
+    assert len(set(corpus)) < 350
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_run_writes_comparable_results(tmp_path, capsys):
+    out = tmp_path / "results.json"
+    argv = ["--tickets", "30", "--requests", "5", "--seed-tickets", "20", "--memory-sample", "2"]
+    assert main(argv + ["-o", str(out)]) == 0
+
+    results = json.loads(out.read_text())
+    assert results["meta"]["params"]["tickets"] == 30
+    for name in ("analyze", "analyze_cached", "post_analyze", "get_tickets", "get_tickets_filtered", "search_tickets"):
+        assert results[name]["count"] > 0
+        assert results[name]["p99_ms"] >= results[name]["p50_ms"] > 0
+    assert results["post_analyze"]["mem_peak_kib_mean"] > 0
+    assert results["analyze_many"]["count"] == 30
+
+    lines = compare(results, results)
+    assert any(line.startswith("analyze ") and "+0.0%" in line for line in lines)
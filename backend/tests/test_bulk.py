@@ -0,0 +1,60 @@
+"""Tests for the bulk offline analyzer CLI."""
+import csv
+import json
+
+import pytest
+from app.analyzers.analyzer import analyze
+from app.analyzers.bulk import main
+
+TICKETS = [
+    {"id": 1, "subject": "Refund request", "description": "Please process my refund"},
+    {"id": 2, "subject": "App is down", "description": "Getting 500 errors, this is urgent"},
+    {"id": 3, "subject": "Idea", "description": "Add dark mode please"},
+]
+
+
+def _write_jsonl(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_jsonl_round_trip_preserves_order(tmp_path, capsys, workers):
+    src, dst = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, TICKETS)
+
+    assert main([str(src), "-o", str(dst), "--workers", str(workers), "--chunksize", "1"]) == 0
+
+    rows = [json.loads(line) for line in dst.read_text().splitlines()]
+    assert [r["id"] for r in rows] == [1, 2, 3]
+    for row, ticket in zip(rows, TICKETS):
+        expected = analyze(ticket["subject"], ticket["description"])
+        assert row["priority"] == expected.priority
+        assert row["custom_flags"] == expected.custom_flags
+    assert "3 tickets" in capsys.readouterr().err
+
+
+def test_csv_input_and_output(tmp_path):
+    src, dst = tmp_path / "in.csv", tmp_path / "out.csv"
+    with src.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "subject", "description"])
+        writer.writeheader()
+        writer.writerows(TICKETS)
+
+    main([str(src), "-o", str(dst), "--workers", "1"])
+
+    with dst.open(newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["id"] for r in rows] == ["1", "2", "3"]
+    assert json.loads(rows[0]["custom_flags"]) == ["refund_detected"]
+    assert rows[1]["priority"] == "P0"
+
+
+def test_invalid_record_reported_not_fatal(tmp_path):
+    src, dst = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, [{"id": 1, "subject": "only a subject"}, TICKETS[0]])
+
+    main([str(src), "-o", str(dst), "--workers", "1"])
+
+    first, second = [json.loads(line) for line in dst.read_text().splitlines()]
+    assert "error" in first
+    assert second["custom_flags"] == ["refund_detected"]
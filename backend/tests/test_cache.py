@@ -0,0 +1,77 @@
+"""Unit tests for the analysis result cache."""
+import pytest
+from app.analyzers.analyzer import RESULT_CACHE, analyze
+from app.analyzers.cache import AnalysisCache, cache_key
+from app.analyzers.rules import RuleSet, compile_rules, current_snapshot, install_snapshot
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    original = current_snapshot()
+    RESULT_CACHE.clear()
+    RESULT_CACHE.reset_stats()
+    yield
+    install_snapshot(original)
+
+
+# ---------------------------------------------------------------------------
+# AnalysisCache
+# ---------------------------------------------------------------------------
+
+
+def test_lru_eviction_and_counters():
+    cache = AnalysisCache(maxsize=2)
+    a, b, c = (cache_key("v1", t) for t in ("a", "b", "c"))
+    cache.put(a, 1)
+    cache.put(b, 2)
+    assert cache.get(a) == 1          # a is now most recently used
+    cache.put(c, 3)                   # evicts b
+    assert cache.get(b) is None
+    assert cache.get(c) == 3
+
+    stats = cache.stats()
+    assert (stats.size, stats.hits, stats.misses, stats.evictions) == (2, 2, 1, 1)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+
+
+def test_key_depends_on_version_and_text():
+    assert cache_key("v1", "text") == cache_key("v1", "text")
+    assert cache_key("v1", "text") != cache_key("v2", "text")
+    assert cache_key("v1", "text") != cache_key("v1", "text ")
+
+
+def test_zero_size_disables_storage():
+    cache = AnalysisCache(maxsize=0)
+    cache.put(cache_key("v1", "a"), 1)
+    assert cache.stats().size == 0
+
+
+# ---------------------------------------------------------------------------
+# analyze() integration
+# ---------------------------------------------------------------------------
+
+
+def test_duplicate_ticket_is_served_from_cache():
+    first = analyze("Password reset", "I cannot login to my account")
+    second = analyze("PASSWORD RESET", "I cannot login to my account")   # same normalised text
+    assert first == second
+    stats = RESULT_CACHE.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_cached_result_is_a_copy():
+    first = analyze("Refund", "I want a refund for the double charge")
+    first.keywords.append("tampered")
+    first.custom_flags.clear()
+    second = analyze("Refund", "I want a refund for the double charge")
+    assert "tampered" not in second.keywords
+    assert second.custom_flags == ["refund_detected"]
+
+
+def test_rule_reload_invalidates_cache():
+    assert analyze("VIP support", "Just saying hello").custom_flags == ["spam_likely"]
+    install_snapshot(compile_rules(RuleSet.from_dict(
+        {"rules": [{"flag": "vip_customer", "keywords": ["vip"], "priority": "P1"}]}
+    )))
+    assert RESULT_CACHE.stats().size == 0
+    assert analyze("VIP support", "Just saying hello").custom_flags == ["vip_customer"]
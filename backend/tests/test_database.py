@@ -0,0 +1,164 @@
+"""Schema / migration tests, run against a throwaway synchronous SQLite engine."""
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import app.models  # noqa: F401  – registers the tables on Base.metadata
+from app.database import _create_schema
+
+
+@pytest.fixture
+def sync_engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    yield eng
+    eng.dispose()
+
+
+def _create_legacy_schema(conn):
+    conn.execute(text(
+        "CREATE TABLE tickets (id INTEGER PRIMARY KEY, subject TEXT NOT NULL, "
+        "description TEXT NOT NULL, category TEXT NOT NULL, priority TEXT NOT NULL, "
+        "urgency BOOLEAN NOT NULL, confidence FLOAT NOT NULL, keywords TEXT NOT NULL, "
+        "custom_flags TEXT NOT NULL, created_at DATETIME NOT NULL)"
+    ))
+    conn.execute(text(
+        "INSERT INTO tickets VALUES (1, 's', 'd', 'Billing', 'P1', 0, 0.8, "
+        "'[\"refund\", \"payment\"]', '[\"refund_detected\"]', '2026-01-01 00:00:00')"
+    ))
+
+
+def test_existing_database_gets_indexes_and_backfill(sync_engine):
+    with sync_engine.begin() as conn:
+        _create_legacy_schema(conn)
+        _create_schema(conn)
+
+    insp = inspect(sync_engine)
+    index_names = {ix["name"] for ix in insp.get_indexes("tickets")}
+    assert {
+        "ix_tickets_created_at",
+        "ix_tickets_priority_created_at",
+        "ix_tickets_category_created_at",
+    } <= index_names
+
+    with sync_engine.connect() as conn:
+        flags = conn.execute(text("SELECT ticket_id, flag FROM ticket_flags")).all()
+        keywords = conn.execute(text("SELECT keyword FROM ticket_keywords ORDER BY keyword")).scalars().all()
+    assert flags == [(1, "refund_detected")]
+    assert keywords == ["payment", "refund"]
+
+    columns = {c["name"]: c for c in insp.get_columns("tickets")}
+    assert columns["rules_version"]["nullable"]            # added by ALTER TABLE
+    assert "ix_tickets_rules_version" in index_names
+    with sync_engine.connect() as conn:
+        assert conn.execute(text("SELECT rules_version FROM tickets")).scalar() is None   # stale
+        rollups = conn.execute(text(
+            "SELECT granularity, bucket, count FROM ticket_rollups WHERE dimension = 'flag'"
+        )).all()
+    assert sorted(rollups) == [
+        ("all", "1970-01-01 00:00:00.000000", 1),
+        ("hour", "2026-01-01 00:00:00.000000", 1),
+        ("minute", "2026-01-01 00:00:00.000000", 1),
+    ]
+
+
+def test_create_schema_is_idempotent(sync_engine):
+    with sync_engine.begin() as conn:
+        _create_schema(conn)
+        _create_schema(conn)
+
+
+def test_triage_query_uses_index(sync_engine):
+    with sync_engine.begin() as conn:
+        _create_schema(conn)
+        plan = " ".join(str(row[-1]) for row in conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM tickets WHERE priority = 'P0' "
+            "AND created_at >= '2026-01-01' AND EXISTS (SELECT 1 FROM ticket_flags "
+            "WHERE ticket_flags.ticket_id = tickets.id AND flag = 'compliance_risk')"
+        )))
+    assert "ix_tickets_priority_created_at" in plan
+    assert "SCAN tickets" not in plan
+
+
+# ---------------------------------------------------------------------------
+# SQLite "tuned" profile
+# ---------------------------------------------------------------------------
+
+
+async def test_tuned_profile_pragmas_and_read_only_pool(tmp_path, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    import app.database as database
+
+    monkeypatch.setattr(database, "SQLITE_PROFILE", "tuned")
+    writer, reader = database.create_engines(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+    try:
+        assert writer is not reader
+        async with writer.begin() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+            assert (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar() == "wal"
+            assert (await conn.exec_driver_sql("PRAGMA synchronous")).scalar() == 1   # NORMAL
+            assert (await conn.exec_driver_sql("PRAGMA busy_timeout")).scalar() == database.SQLITE_BUSY_TIMEOUT_MS
+
+        async with reader.connect() as conn:
+            assert (await conn.exec_driver_sql("PRAGMA query_only")).scalar() == 1
+            assert (await conn.exec_driver_sql("SELECT count(*) FROM tickets")).scalar() == 0
+            with pytest.raises(OperationalError):
+                await conn.exec_driver_sql("DELETE FROM tickets")
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+
+def test_default_profile_and_non_file_urls_share_one_engine(monkeypatch):
+    import app.database as database
+
+    monkeypatch.setattr(database, "SQLITE_PROFILE", "tuned")
+    writer, reader = database.create_engines("sqlite+aiosqlite:///:memory:")
+    assert writer is reader
+
+    monkeypatch.setattr(database, "SQLITE_PROFILE", "default")
+    writer, reader = database.create_engines("sqlite+aiosqlite:///./data/other.db")
+    assert writer is reader
+
+
+# ---------------------------------------------------------------------------
+# Portability (PostgreSQL)
+# ---------------------------------------------------------------------------
+
+
+def test_list_columns_are_jsonb_on_postgres_and_text_on_sqlite():
+    from sqlalchemy.dialects import postgresql, sqlite
+    from sqlalchemy.schema import CreateTable
+
+    from app.models import Ticket
+
+    pg_ddl = str(CreateTable(Ticket.__table__).compile(dialect=postgresql.dialect()))
+    assert "keywords JSONB NOT NULL" in pg_ddl
+    assert "custom_flags JSONB NOT NULL" in pg_ddl
+    sqlite_ddl = str(CreateTable(Ticket.__table__).compile(dialect=sqlite.dialect()))
+    assert "keywords TEXT NOT NULL" in sqlite_ddl
+
+
+def test_sqlite_lists_are_stored_compact_and_old_rows_still_read(sync_engine):
+    from app.models import Ticket
+
+    with sync_engine.begin() as conn:
+        _create_schema(conn)
+        conn.execute(Ticket.__table__.insert(), {
+            "subject": "s", "description": "d", "category": "Billing", "priority": "P2",
+            "urgency": False, "confidence": 1.0, "keywords": ["refund", "päyment"], "custom_flags": [],
+        })
+        raw = conn.execute(text("SELECT keywords, custom_flags FROM tickets")).one()
+        assert tuple(raw) == ('["refund","päyment"]', "[]")
+        # a row written by json.dumps() before the compact form
+        conn.execute(text("UPDATE tickets SET keywords = :kw"), {"kw": '["refund", "p\\u00e4yment"]'})
+        assert conn.execute(Ticket.__table__.select()).one().keywords == ["refund", "päyment"]
+
+
+def test_server_database_gets_one_sized_pool(monkeypatch):
+    pytest.importorskip("asyncpg")
+    import app.database as database
+
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 7)
+    writer, reader = database.create_engines("postgresql+asyncpg://u:p@localhost/tickets")
+    assert writer is reader
+    assert writer.sync_engine.pool.size() == 7
@@ -0,0 +1,131 @@
+"""
+Tests for the live ticket feed (GET /tickets/stream), against a throwaway SQLite file.
+"""
+import asyncio
+import json
+
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import _create_schema, create_engines
+from app.schemas import TicketFeedQuery
+from app.services.feed_service import TicketFeed
+from app.services.ticket_service import analyze_and_save_batch
+
+REFUND = {"subject": "Refund", "description": "Please refund my payment"}
+IDEA = {"subject": "Idea", "description": "Add dark mode"}
+BREACH = {"subject": "Security breach", "description": "Unauthorized access to our account"}
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'feed.db'}")
+    async with writer.begin() as conn:
+        await conn.run_sync(_create_schema)
+    yield async_sessionmaker(writer, expire_on_commit=False), async_sessionmaker(reader, expire_on_commit=False)
+    await writer.dispose()
+    await reader.dispose()
+
+
+@pytest_asyncio.fixture
+async def feed(db):
+    feed = TicketFeed(read_sessions=db[1], poll_interval=0.02, heartbeat_interval=0.2)
+    feed.start()
+    yield feed
+    await feed.stop()
+
+
+async def _write(db, *tickets) -> None:
+    async with db[0]() as session:
+        await analyze_and_save_batch(list(tickets), session)
+
+
+async def _next(stream) -> str:
+    return await asyncio.wait_for(stream.__anext__(), 2)
+
+
+async def _tickets(stream, n: int) -> list:
+    """The next ``n`` ticket events as (id, body), skipping retry / keep-alive lines."""
+    events = []
+    while len(events) < n:
+        frame = await _next(stream)
+        if frame.startswith("id: "):
+            lines = frame.strip().split("\n")
+            assert lines[1] == "event: ticket"
+            events.append((int(lines[0][4:]), json.loads(lines[2][6:])))
+    return events
+
+
+# ---------------------------------------------------------------------------
+# Live tail
+# ---------------------------------------------------------------------------
+
+
+async def test_new_tickets_are_pushed_in_id_order(db, feed):
+    await _write(db, REFUND)                       # before subscribing: not sent
+    stream = feed.subscribe(TicketFeedQuery())
+    assert await _next(stream) == "retry: 2000\n\n"
+
+    await _write(db, IDEA, BREACH)
+    events = await _tickets(stream, 2)
+    assert [ticket_id for ticket_id, _ in events] == [2, 3]
+    assert events[0][1]["subject"] == "Idea"
+    assert feed.subscribers == 1
+    await stream.aclose()
+    assert feed.subscribers == 0
+
+
+async def test_filters_by_priority_and_flag(db, feed):
+    p0 = feed.subscribe(TicketFeedQuery(priority="P0"))
+    refunds = feed.subscribe(TicketFeedQuery(flag="refund_detected"))
+    await _next(p0)
+    await _next(refunds)
+
+    await _write(db, REFUND, IDEA, BREACH)
+    assert [body["subject"] for _, body in await _tickets(p0, 1)] == ["Security breach"]
+    assert [body["subject"] for _, body in await _tickets(refunds, 1)] == ["Refund"]
+    await p0.aclose()
+    await refunds.aclose()
+
+
+async def test_idle_stream_sends_keep_alives(feed):
+    stream = feed.subscribe(TicketFeedQuery())
+    await _next(stream)
+    assert await _next(stream) == ": keep-alive\n\n"
+    await stream.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Resume
+# ---------------------------------------------------------------------------
+
+
+async def test_resume_replays_missed_tickets_then_continues_live(db, feed):
+    await _write(db, REFUND, IDEA, BREACH)
+    stream = feed.subscribe(TicketFeedQuery(after_id=1))
+    assert [ticket_id for ticket_id, _ in await _tickets(stream, 2)] == [2, 3]
+
+    await _write(db, IDEA)
+    assert [ticket_id for ticket_id, _ in await _tickets(stream, 1)] == [4]
+    await stream.aclose()
+
+
+async def test_slow_subscriber_catches_up_from_the_database(db):
+    feed = TicketFeed(read_sessions=db[1], poll_interval=0.02, heartbeat_interval=0.2, queue_max=2)
+    feed.start()
+    stream = feed.subscribe(TicketFeedQuery())
+    await _next(stream)
+
+    await _write(db, *[IDEA] * 7)                   # overflows the 2-ticket buffer
+    await feed.poll()
+    assert [ticket_id for ticket_id, _ in await _tickets(stream, 7)] == list(range(1, 8))
+    await stream.aclose()
+    await feed.stop()
+
+
+async def test_stop_ends_open_streams(feed):
+    stream = feed.subscribe(TicketFeedQuery())
+    await _next(stream)
+    await feed.stop()
+    frames = [frame async for frame in stream]
+    assert frames == []
@@ -0,0 +1,70 @@
+"""Unit tests for the compiled keyword matcher."""
+import random
+
+import pytest
+
+from app.analyzers.matcher import KeywordMatcher
+from app.analyzers.rules import current_snapshot
+
+
+def _naive_match(groups: dict[str, list[str]], text: str) -> dict[str, list[str]]:
+    """Reference implementation: the original per-keyword substring scan."""
+    matched = {name: [kw for kw in kws if kw in text] for name, kws in groups.items()}
+    return {name: kws for name, kws in matched.items() if kws}
+
+
+# ---------------------------------------------------------------------------
+# Hit reporting
+# ---------------------------------------------------------------------------
+
+
+def test_overlapping_keywords_all_reported():
+    matcher = KeywordMatcher({"a": ["hack", "hacked"], "b": ["ack"]})
+    hits = matcher.scan("i was hacked")
+    assert [(h.keyword, h.start) for h in hits] == [("hack", 6), ("hacked", 6), ("ack", 7)]
+
+
+def test_hits_tagged_with_every_owning_group():
+    matcher = KeywordMatcher({"Billing": ["refund"], "refund_detected": ["refund", "chargeback"]})
+    hits = matcher.scan("refund")
+    assert len(hits) == 1
+    assert hits[0].groups == ("Billing", "refund_detected")
+
+
+def test_substring_semantics_preserved():
+    """Keywords match inside longer words, exactly like ``kw in text``."""
+    matcher = KeywordMatcher({"compliance_risk": ["sue"]})
+    assert matcher.match("there is an issue") == {"compliance_risk": ["sue"]}
+
+
+def test_group_keywords_in_config_order():
+    matcher = KeywordMatcher({"Billing": ["invoice", "payment", "fee"]})
+    assert matcher.match("fee on payment, fee on invoice") == {"Billing": ["invoice", "payment", "fee"]}
+
+
+def test_scan_joined_marks_the_end_of_every_text():
+    matcher = KeywordMatcher({"a": ["hack", "hacked"], "b": ["ack"]})
+    assert matcher.scan_joined(["i was hacked", "", "ack"]) == ["hacked", "ack", "", "", "ack", ""]
+    assert matcher.scan_joined([]) == []
+
+
+def test_empty_keyword_rejected():
+    with pytest.raises(ValueError):
+        KeywordMatcher({"bad": [""]})
+
+
+# ---------------------------------------------------------------------------
+# Equivalence with the per-keyword scan
+# ---------------------------------------------------------------------------
+
+
+def test_default_matcher_equivalent_to_substring_scan():
+    matcher = current_snapshot().matcher
+    groups = {name: list(kws) for name, kws in matcher.groups.items()}
+    vocab = [kw for kws in groups.values() for kw in kws] + [
+        "the", "a", "my", "please", "thanks", "x", "-", "ed", "ing",
+    ]
+    rng = random.Random(1234)
+    for _ in range(200):
+        text = rng.choice(["", " "]).join(rng.choice(vocab) for _ in range(rng.randint(0, 40)))
+        assert matcher.match(text) == _naive_match(groups, text), text
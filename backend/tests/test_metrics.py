@@ -0,0 +1,44 @@
+"""Unit tests for the in-process metrics registry."""
+from app.analyzers.analyzer import RESULT_CACHE, analyze
+from app.metrics import STAGE_LATENCY, Counter, Gauge, Histogram, Registry
+
+
+def test_counter_exposition():
+    registry = Registry()
+    counter = registry.register(Counter("things_total", "Things.", ("kind",)))
+    counter.inc("a")
+    counter.inc("a")
+    counter.inc('quo"te', amount=3)
+    text = registry.render()
+    assert "# TYPE things_total counter" in text
+    assert 'things_total{kind="a"} 2.0' in text
+    assert 'things_total{kind="quo\\"te"} 3.0' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "/x")
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/x",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/x"} 4' in text
+    assert 'latency_seconds_sum{route="/x"} 6.05' in text
+
+
+def test_gauge_is_evaluated_at_scrape_time():
+    registry = Registry()
+    value = [1]
+    registry.register(Gauge("queue_depth", "Depth.", lambda: value[0]))
+    value[0] = 7
+    assert "queue_depth 7.0" in registry.render()
+
+
+def test_analysis_records_stage_timings():
+    RESULT_CACHE.clear()
+    before = {stage: STAGE_LATENCY.count(stage) for stage in ("scan", "classify", "detect_priority", "overrides")}
+    analyze("Metrics check", "App crashed with error 500 for a unique metrics test")
+    for stage, count in before.items():
+        assert STAGE_LATENCY.count(stage) == count + 1
@@ -0,0 +1,83 @@
+"""
+PostgreSQL integration tests.
+
+Skipped unless TEST_POSTGRES_URL points at a disposable database, e.g.
+
+    docker run --rm -e POSTGRES_PASSWORD=pw -p 5432:5432 postgres:16
+    TEST_POSTGRES_URL=postgresql+asyncpg://postgres:pw@localhost/postgres pytest tests/test_postgres.py
+
+The whole API suite can also run against it with DB_URL set to the same URL.
+"""
+import os
+
+import pytest
+import pytest_asyncio
+
+pytest.importorskip("asyncpg")
+PG_URL = os.getenv("TEST_POSTGRES_URL")
+pytestmark = pytest.mark.skipif(not PG_URL, reason="TEST_POSTGRES_URL not set")
+
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.database import Base, _create_schema  # noqa: E402
+from app.models import Ticket, TicketFlag, TicketKeyword  # noqa: E402
+from app.schemas import TicketListQuery, TicketSearchQuery  # noqa: E402
+from app.services.search_service import search_tickets_json  # noqa: E402
+from app.services.ticket_service import analyze_and_save_batch, list_tickets  # noqa: E402
+
+
+@pytest_asyncio.fixture
+async def pg_session():
+    engine = create_async_engine(PG_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(_create_schema)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as session:
+        yield session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.mark.parametrize("count", [3, 150])   # INSERT … RETURNING, then COPY
+async def test_batch_ingest(pg_session, count):
+    items = [{"subject": f"Refund {i}", "description": "Please refund my payment"} for i in range(count)]
+    response = await analyze_and_save_batch(items, pg_session)
+    assert response.created == count
+
+    ids = [r.ticket.id for r in response.results]
+    assert len(set(ids)) == count
+    assert await pg_session.scalar(select(func.count()).select_from(Ticket)) == count
+    assert await pg_session.scalar(select(func.count()).select_from(TicketFlag)) == count
+    assert await pg_session.scalar(select(func.count()).select_from(TicketKeyword)) >= count
+
+    stored = await pg_session.get(Ticket, ids[0])
+    assert stored.custom_flags == ["refund_detected"]   # JSONB round trip
+
+
+async def test_filters_and_pagination(pg_session):
+    await analyze_and_save_batch(
+        [{"subject": "Security breach", "description": "We were hacked"}] * 3
+        + [{"subject": "Idea", "description": "Add dark mode"}] * 2,
+        pg_session,
+    )
+    page = await list_tickets(pg_session, TicketListQuery(flag="security_escalation", limit=2))
+    assert page.total == 3
+    assert len(page.tickets) == 2 and page.next_cursor
+    rest = await list_tickets(pg_session, TicketListQuery(flag="security_escalation", cursor=page.next_cursor))
+    assert len(rest.tickets) == 1
+
+
+async def test_full_text_search(pg_session):
+    await analyze_and_save_batch([
+        {"subject": "Refund", "description": "Please refund my payment"},
+        {"subject": "Login", "description": "Locked out, refund the subscription"},
+        {"subject": "Idea", "description": "Add dark mode"},
+    ], pg_session)
+    body = await search_tickets_json(pg_session, TicketSearchQuery(q="refund"))
+    assert body["total"] == 2
+    assert "<mark>refund</mark>" in body["tickets"][0]["snippet"].lower()
+    body = await search_tickets_json(pg_session, TicketSearchQuery(q="subscr*", limit=1))
+    assert [hit["subject"] for hit in body["tickets"]] == ["Login"]
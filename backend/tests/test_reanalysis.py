@@ -0,0 +1,156 @@
+"""
+Tests for the re-analysis job, against a throwaway SQLite file.
+"""
+import time
+
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.analyzers.rules import DEFAULT_RULES, RuleSet, compile_rules, current_snapshot, install_snapshot
+from app.database import _create_schema, create_engines
+from app.models import Ticket, TicketFlag, TicketRollup
+from app.services.reanalysis_service import ReanalysisJob, count_stale
+from app.services import ticket_service
+from app.services.ticket_service import analyze_and_save_batch
+
+# The default rules plus one new rule that only matches two of the seeded tickets
+VIP_RULES = RuleSet.from_dict({
+    **DEFAULT_RULES.to_dict(),
+    "rules": DEFAULT_RULES.to_dict()["rules"] + [
+        {"flag": "vip_customer", "keywords": ["vip"], "priority": "P1", "category": "Account"},
+    ],
+})
+
+TICKETS = [
+    {"subject": "VIP customer", "description": "Our VIP account needs help"},
+    {"subject": "Refund", "description": "Please refund my payment"},
+    {"subject": "Idea", "description": "Add dark mode"},
+    {"subject": "Vip again", "description": "Another vip request"},
+    {"subject": "Crash", "description": "The app is crashing"},
+]
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'reanalysis.db'}")
+    async with writer.begin() as conn:
+        await conn.run_sync(_create_schema)
+    sessions = async_sessionmaker(writer, expire_on_commit=False)
+    read_sessions = async_sessionmaker(reader, expire_on_commit=False)
+    async with sessions() as session:
+        await analyze_and_save_batch(TICKETS, session)
+    original = current_snapshot()
+    yield sessions, read_sessions
+    install_snapshot(original)
+    await writer.dispose()
+    await reader.dispose()
+
+
+def _job(db, **kwargs) -> ReanalysisJob:
+    sessions, read_sessions = db
+    return ReanalysisJob(sessions=sessions, read_sessions=read_sessions, **kwargs)
+
+
+async def _stale(db) -> int:
+    async with db[0]() as session:
+        return await count_stale(session)
+
+
+# ---------------------------------------------------------------------------
+# Version stamping
+# ---------------------------------------------------------------------------
+
+
+async def test_new_tickets_are_stamped_with_the_active_version(db):
+    async with db[0]() as session:
+        versions = set((await session.scalars(select(Ticket.rules_version))).all())
+    assert versions == {current_snapshot().version}
+    assert await _stale(db) == 0
+
+
+# ---------------------------------------------------------------------------
+# Re-analysis
+# ---------------------------------------------------------------------------
+
+
+async def test_rule_change_rescores_and_writes_back_only_changes(db):
+    install_snapshot(compile_rules(VIP_RULES, source="test"))
+    assert await _stale(db) == len(TICKETS)
+
+    status = await _job(db, chunk_size=2, rate=0).run()
+    assert (status.state, status.scanned, status.changed) == ("idle", 5, 2)
+    assert await _stale(db) == 0
+
+    async with db[0]() as session:
+        vip = (await session.scalars(select(Ticket).where(Ticket.subject.like("V%")))).all()
+        assert {(t.category, t.priority) for t in vip} == {("Account", "P1")}
+        assert all(t.custom_flags == ["vip_customer"] for t in vip)
+        flagged = (await session.scalars(select(TicketFlag.ticket_id).where(TicketFlag.flag == "vip_customer"))).all()
+        assert sorted(flagged) == sorted(t.id for t in vip)
+
+    async with db[0]() as session:
+        rollups = (await session.execute(
+            select(TicketRollup.granularity, TicketRollup.count)
+            .where(TicketRollup.dimension == "flag", TicketRollup.value == "vip_customer")
+        )).all()
+        assert {g: c for g, c in rollups} == {"minute": 2, "hour": 2, "all": 2}
+        account = await session.scalar(select(TicketRollup.count).where(
+            TicketRollup.granularity == "all", TicketRollup.dimension == "category", TicketRollup.value == "Account",
+        ))
+        assert account == 2
+
+    again = await _job(db, rate=0).run()
+    assert again.scanned == 0
+
+
+async def test_overlapping_runs_apply_each_change_once(db):
+    install_snapshot(compile_rules(VIP_RULES, source="test"))
+
+    async def analyze_after_a_rival_run(texts):
+        # Another worker re-scores the same rows between this run's read and write
+        await _job(db, rate=0).run()
+        return await ticket_service.analyze_many(texts)
+
+    late = await _job(db, rate=0, analyze_many=analyze_after_a_rival_run).run()
+    assert (late.scanned, late.changed) == (len(TICKETS), 0)
+    assert await _stale(db) == 0
+
+    async with db[0]() as session:
+        flags = (await session.scalars(select(TicketFlag.ticket_id).where(TicketFlag.flag == "vip_customer"))).all()
+        assert len(flags) == 2
+        rollups = (await session.execute(
+            select(TicketRollup.granularity, TicketRollup.dimension, TicketRollup.value, TicketRollup.count)
+            .where(TicketRollup.granularity == "all")
+        )).all()
+    counts = {(dimension, value): count for _, dimension, value, count in rollups}
+    assert counts[("total", "")] == len(TICKETS)
+    assert counts[("flag", "vip_customer")] == 2
+    assert counts[("category", "Account")] == 2
+    assert sum(c for (dimension, _), c in counts.items() if dimension == "priority") == len(TICKETS)
+
+
+async def test_job_resumes_from_the_rows_left_stale(db):
+    install_snapshot(compile_rules(VIP_RULES, source="test"))
+    interrupted = _job(db, chunk_size=2, rate=0)
+    assert await interrupted.run_chunk(current_snapshot().version) == 2   # then "crash"
+
+    status = await _job(db, chunk_size=2, rate=0).run()
+    assert status.scanned == len(TICKETS) - 2
+    assert await _stale(db) == 0
+
+
+async def test_legacy_rows_without_a_version_are_stale(db):
+    async with db[0]() as session:
+        await session.execute(text("UPDATE tickets SET rules_version = NULL WHERE id <= 2"))
+        await session.commit()
+    assert await _stale(db) == 2
+    status = await _job(db, rate=0).run()
+    assert (status.scanned, status.changed) == (2, 0)   # same rules: stamped, not rewritten
+
+
+async def test_rate_limit_spaces_out_chunks(db):
+    install_snapshot(compile_rules(VIP_RULES, source="test"))
+    started = time.perf_counter()
+    await _job(db, chunk_size=1, rate=50).run()
+    assert time.perf_counter() - started >= len(TICKETS) / 50 * 0.9
@@ -0,0 +1,219 @@
+"""Unit tests for rule sets, snapshots and hot reloading."""
+import csv
+import io
+import itertools
+import json
+import os
+
+import pytest
+from app.analyzers.analyzer import analyze, analyze_context
+from app.analyzers.context import AnalysisContext
+from app.analyzers.rules import (
+    DEFAULT_RULES,
+    PRIORITY_ORDER,
+    RuleSet,
+    RuleValidationError,
+    compile_rules,
+    current_snapshot,
+    install_snapshot,
+    load_rules_file,
+)
+from app.services.rules_service import RulesFileWatcher, build_snapshot, main, reload_rules, start_rules
+
+VIP_RULES = {
+    "rules": [
+        {"flag": "vip_customer", "keywords": ["VIP"], "priority": "P1", "category": "Account",
+         "min_confidence": 0.85},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def restore_default_rules():
+    original = current_snapshot()
+    yield
+    install_snapshot(original)
+
+
+# ---------------------------------------------------------------------------
+# RuleSet construction & validation
+# ---------------------------------------------------------------------------
+
+
+def test_default_rules_mirror_config():
+    data = DEFAULT_RULES.to_dict()
+    assert [r["flag"] for r in data["rules"]][:2] == ["security_escalation", "compliance_risk"]
+    assert data["ladder"][-1] == {"priority": "P3", "requires_urgency": False, "categories": None}
+    assert RuleSet.from_dict(data) == DEFAULT_RULES
+
+
+def test_partial_document_falls_back_to_config():
+    rules = RuleSet.from_dict(VIP_RULES)
+    assert rules.categories == DEFAULT_RULES.categories
+    assert [r.flag for r in rules.custom_rules] == ["vip_customer"]
+    assert rules.custom_rules[0].keywords == ("vip",)   # keywords are lowercased
+
+
+@pytest.mark.parametrize("document", [
+    {"unknown": {}},
+    {"categories": {}},
+    {"categories": {"Other": ["x"]}},
+    {"urgency": []},
+    {"rules": [{"flag": "x", "keywords": ["y"], "priority": "P9"}]},
+    {"rules": [{"flag": "x", "keywords": ["y"], "category": "Nope"}]},
+    {"rules": [{"flag": "x", "keywords": ["y"], "min_confidence": 2}]},
+    {"rules": [{"flag": "x", "keywords": [""]}]},
+    {"rules": [{"flag": "Billing", "keywords": ["y"]}]},
+    {"ladder": [{"priority": "P0", "requires_urgency": True}]},
+])
+def test_invalid_documents_rejected(document):
+    with pytest.raises(RuleValidationError):
+        RuleSet.from_dict(document)
+
+
+def test_load_json_and_yaml(tmp_path):
+    json_file = tmp_path / "rules.json"
+    json_file.write_text(json.dumps(VIP_RULES))
+    yaml_file = tmp_path / "rules.yaml"
+    yaml_file.write_text(
+        "rules:\n"
+        "  - flag: vip_customer\n"
+        "    keywords: [VIP]\n"
+        "    priority: P1\n"
+        "    category: Account\n"
+        "    min_confidence: 0.85\n"
+    )
+    assert load_rules_file(str(json_file)) == load_rules_file(str(yaml_file))
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
+
+
+def test_version_tracks_content():
+    assert compile_rules(DEFAULT_RULES).version == current_snapshot().version
+    assert compile_rules(RuleSet.from_dict(VIP_RULES)).version != current_snapshot().version
+
+
+def test_installed_snapshot_drives_analysis():
+    install_snapshot(compile_rules(RuleSet.from_dict(VIP_RULES)))
+    result = analyze("VIP support", "Just saying hello")
+    assert result.custom_flags == ["vip_customer"]
+    assert result.priority == "P1"
+    assert result.category == "Account"
+    assert result.confidence == 0.85
+
+
+def test_context_keeps_its_snapshot_across_swap():
+    ctx = AnalysisContext("Security breach", "I think my account was hacked")
+    install_snapshot(compile_rules(RuleSet.from_dict(VIP_RULES)))
+    assert analyze_context(ctx).custom_flags == ["security_escalation"]
+
+
+# ---------------------------------------------------------------------------
+# Decision table
+# ---------------------------------------------------------------------------
+
+
+def _reference_decision(rules, hit_flags, urgency, category):
+    """The ladder walk + first-hit custom rule, evaluated directly."""
+    priority = next(s.priority for s in rules.ladder
+                    if (urgency or not s.requires_urgency) and (s.categories is None or category in s.categories))
+    for rule in rules.custom_rules:
+        if rule.flag in hit_flags:
+            if rule.priority is not None:
+                priority = min(priority, rule.priority, key=PRIORITY_ORDER.index)
+            return priority, rule.category, (rule.flag,), rule.min_confidence
+    return priority, None, (), None
+
+
+@pytest.mark.parametrize("document", [{}, VIP_RULES])
+def test_decision_table_matches_rule_evaluation_for_every_mask(document):
+    rules = RuleSet.from_dict(document)
+    table = compile_rules(rules).decisions
+    flags = table.flags
+    assert len(table) == (len(flags) + 1) * 2 * (len(rules.categories) + 1)
+    for mask, urgency, category in itertools.product(range(2 ** len(flags)), (False, True), table.categories):
+        hit_flags = {flag for i, flag in enumerate(flags) if mask >> i & 1}
+        decision = table.decide(mask, urgency, category)
+        assert table.mask(hit_flags | {"urgency", "Billing"}) == mask
+        assert (decision.priority, decision.category, decision.flags, decision.min_confidence) == \
+            _reference_decision(rules, hit_flags, urgency, category)
+
+
+def test_decision_rows_describe_precedence():
+    table = current_snapshot().decisions
+    rows = table.rows()
+    assert len(rows) == len(table)
+    refund = next(r for r in rows if r["rule"] == "refund_detected" and r["urgency"] and r["category"] == "Other")
+    assert refund["mask"] == "0000" + "1" + "-" * (len(table.flags) - 5)
+    assert (refund["priority"], refund["category_override"], refund["flags"]) == ("P1", "Billing", ["refund_detected"])
+    no_rule = rows[0]
+    assert no_rule["rule"] is None and no_rule["mask"] == "0" * len(table.flags)
+
+
+def test_decisive_rules_settle_without_the_category():
+    table = current_snapshot().decisions
+    bit = {flag: 1 << i for i, flag in enumerate(table.flags)}
+    for urgency in (False, True):
+        decision = table.settled(bit["security_escalation"] | bit["refund_detected"], urgency)
+        assert (decision.priority, decision.category) == ("P0", "Technical")
+    assert table.settled(bit["refund_detected"], False).priority == "P1"
+    assert table.settled(bit["refund_detected"], True) is None        # the ladder may still say P0
+    assert table.settled(bit["compliance_risk"], False) is None       # keeps the classifier's category
+    assert table.settled(0, True) is None
+
+
+def test_decision_table_cli_exports_csv_and_json(tmp_path, capsys):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(VIP_RULES))
+    assert main(["--rules", str(path)]) == 0
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert rows[-1]["rule"] == "vip_customer" and rows[-1]["min_confidence"] == "0.85"
+
+    assert main(["--rules", str(path), "--format", "json"]) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["rules"] == ["vip_customer"]
+    assert len(data["rows"]) == len(rows)
+
+    path.write_text("{not json")
+    assert main(["--rules", str(path)]) == 2
+
+
+# ---------------------------------------------------------------------------
+# Reloading
+# ---------------------------------------------------------------------------
+
+
+async def test_reload_from_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(VIP_RULES))
+    snapshot = await reload_rules(str(path))
+    assert current_snapshot() is snapshot
+    assert snapshot.source == str(path)
+
+
+async def test_startup_keeps_snapshot_preloaded_before_fork(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(VIP_RULES))
+    preloaded = install_snapshot(build_snapshot(str(path)))   # what app.server does
+    assert await start_rules(str(path), interval=0) is None
+    assert current_snapshot() is preloaded
+
+
+async def test_watcher_reloads_on_change_and_keeps_old_rules_on_error(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({}))
+    watcher = RulesFileWatcher(str(path), interval=60)
+    assert await watcher.check() is None   # unchanged
+
+    path.write_text(json.dumps(VIP_RULES))
+    os.utime(path, (1, 1))
+    snapshot = await watcher.check()
+    assert snapshot is not None and current_snapshot() is snapshot
+
+    path.write_text("{not json")
+    os.utime(path, (2, 2))
+    assert await watcher.check() is None
+    assert current_snapshot() is snapshot
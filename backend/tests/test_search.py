@@ -0,0 +1,131 @@
+"""
+Tests for full-text ticket search (app.services.search_service) and its FTS5
+index, against a throwaway SQLite file.
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, insert, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import Base, _create_schema, create_engines
+from app.models import Ticket
+from app.schemas import TicketSearchQuery
+from app.services.search_service import (
+    InvalidSearchQueryError,
+    fts5_query,
+    parse_terms,
+    search_tickets_json,
+    tsquery,
+)
+from app.services.ticket_service import analyze_and_save_batch
+
+TICKETS = [
+    {"subject": "Refund", "description": "Please refund my payment"},
+    {"subject": "Café menu crashes", "description": "The app crashes on the café page"},
+    {"subject": "Sign-in loop", "description": "Cannot sign in, the page reloads"},
+]
+
+
+@pytest_asyncio.fixture
+async def engines(tmp_path):
+    writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'search.db'}")
+    yield writer, reader
+    await writer.dispose()
+    await reader.dispose()
+
+
+@pytest_asyncio.fixture
+async def sessions(engines):
+    writer, reader = engines
+    async with writer.begin() as conn:
+        await conn.run_sync(_create_schema)
+    writes = async_sessionmaker(writer, expire_on_commit=False)
+    async with writes() as session:
+        await analyze_and_save_batch(TICKETS, session)
+    yield writes, async_sessionmaker(reader, expire_on_commit=False)
+
+
+async def _subjects(sessions, q: str, **filters) -> list:
+    async with sessions[1]() as db:
+        body = await search_tickets_json(db, TicketSearchQuery(q=q, **filters))
+    return [hit["subject"] for hit in body["tickets"]]
+
+
+# ---------------------------------------------------------------------------
+# Query parsing
+# ---------------------------------------------------------------------------
+
+
+def test_queries_are_reduced_to_words():
+    terms = parse_terms('Sign-in "NEAR(a b)" OR col:x pay* _')
+    assert terms == [("sign", False), ("in", False), ("near", False), ("a", False), ("b", False),
+                     ("or", False), ("col", False), ("x", False), ("pay", True)]
+    assert fts5_query(terms[-2:]) == '"x" "pay"*'
+    assert tsquery(terms[-2:]) == "x & pay:*"
+
+
+@pytest.mark.parametrize("q", ["", "*", '"" -- ;', "a " * 17])
+def test_queries_without_words_or_with_too_many_are_rejected(q):
+    with pytest.raises(InvalidSearchQueryError):
+        parse_terms(q)
+
+
+async def test_operator_text_is_searched_literally(sessions):
+    assert await _subjects(sessions, '"refund" OR NOT payment)') == []
+    assert await _subjects(sessions, "café crash*") == ["Café menu crashes"]
+    assert await _subjects(sessions, "cafe sign") == []                 # every word must match
+    assert await _subjects(sessions, "SIGN-IN") == ["Sign-in loop"]
+
+
+# ---------------------------------------------------------------------------
+# Index maintenance
+# ---------------------------------------------------------------------------
+
+
+async def test_index_follows_inserts_updates_and_deletes(sessions):
+    async with sessions[0]() as db:
+        await db.execute(update(Ticket).where(Ticket.subject == "Refund").values(subject="Chargeback"))
+        await db.execute(delete(Ticket).where(Ticket.subject == "Sign-in loop"))
+        await analyze_and_save_batch([{"subject": "Refund again", "description": "Still waiting"}], db)
+        await db.commit()
+
+    assert await _subjects(sessions, "refund") == ["Refund again", "Chargeback"]
+    assert await _subjects(sessions, "chargeback") == ["Chargeback"]
+    assert await _subjects(sessions, "sign") == []
+
+
+async def test_tickets_stored_before_the_index_are_indexed(engines):
+    writer, reader = engines
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Ticket), [
+            {"subject": "Old refund", "description": "Stored before search existed", "category": "Billing",
+             "priority": "P2", "urgency": False, "confidence": 0.5, "keywords": [], "custom_flags": []},
+        ])
+        await conn.run_sync(_create_schema)
+
+    assert await _subjects((None, async_sessionmaker(reader)), "stored") == ["Old refund"]
+    async with writer.begin() as conn:
+        # Raises if the index disagrees with the tickets table
+        await conn.execute(text("INSERT INTO tickets_fts(tickets_fts, rank) VALUES ('integrity-check', 1)"))
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+
+async def test_hits_carry_score_snippet_and_ticket_fields(sessions):
+    async with sessions[1]() as db:
+        body = await search_tickets_json(db, TicketSearchQuery(q="refund", total="none"))
+    assert body["total"] is None and body["next_cursor"] is None
+    hit, = body["tickets"]
+    assert list(hit)[-2:] == ["score", "snippet"]
+    assert hit["score"] > 0
+    assert hit["snippet"] == "<mark>Refund</mark>"
+    assert hit["category"] == "Billing"
+
+
+async def test_filters_apply_to_hits(sessions):
+    assert await _subjects(sessions, "crashes page", category="Technical") == ["Café menu crashes"]
+    assert await _subjects(sessions, "page", flag="refund_detected") == []
@@ -0,0 +1,105 @@
+"""
+Byte-identity tests for the orjson read path (app.serialization): every body
+must equal what the TicketResponse + JSONResponse path produces.
+"""
+import json
+from datetime import datetime
+
+import orjson
+import pytest_asyncio
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import _create_schema, create_engines
+from app.models import Ticket
+from app.schemas import TicketListQuery, TicketListResponse
+from app.serialization import TICKET_COLUMNS, ORJSONResponse, list_fragment, ticket_json, ticket_response
+from app.services.ticket_service import list_tickets, list_tickets_json
+
+TICKETS = [
+    {"subject": "Refund", "description": "Please refund", "category": "Billing", "priority": "P1",
+     "urgency": False, "confidence": 0.8, "keywords": ["refund"], "custom_flags": ["refund_detected"],
+     "created_at": datetime(2026, 1, 2, 3, 4, 5)},
+    {"subject": "Ünïcode ✓ 😀", "description": 'quotes " and \\ backslash\nnew line\ttab\x01\x7f ',
+     "category": "Other", "priority": "P3", "urgency": True, "confidence": 0.3, "keywords": [],
+     "custom_flags": [], "created_at": datetime(2026, 1, 2, 3, 4, 5, 120)},
+    {"subject": "Many", "description": "d", "category": "Technical", "priority": "P0",
+     "urgency": True, "confidence": 0.6667, "keywords": ["crash", "säkerhet", 'a"b', "c\\d", ""],
+     "custom_flags": ["security_escalation"], "created_at": datetime(2026, 1, 2, 3, 4, 6, 999999)},
+    {"subject": "Legacy", "description": "stored by json.dumps()", "category": "Account", "priority": "P2",
+     "urgency": False, "confidence": 1.0, "keywords": ["login", "pässword"], "custom_flags": ["x", "y"],
+     "created_at": datetime(2026, 1, 2, 3, 4, 7)},
+]
+
+
+@pytest_asyncio.fixture
+async def sessions(tmp_path):
+    writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'serialization.db'}")
+    async with writer.begin() as conn:
+        await conn.run_sync(_create_schema)
+        await conn.execute(insert(Ticket), TICKETS)
+        legacy = TICKETS[-1]
+        await conn.execute(
+            text("UPDATE tickets SET keywords = :kw, custom_flags = :flags WHERE subject = 'Legacy'"),
+            {"kw": json.dumps(legacy["keywords"]), "flags": json.dumps(legacy["custom_flags"])},
+        )
+    yield async_sessionmaker(reader, expire_on_commit=False)
+    await writer.dispose()
+    await reader.dispose()
+
+
+def _json_response(model) -> bytes:
+    """What FastAPI sends for a response_model: validated, dumped in JSON mode, JSONResponse-rendered."""
+    return JSONResponse(model.model_dump(mode="json")).body
+
+
+# ---------------------------------------------------------------------------
+# Fragments
+# ---------------------------------------------------------------------------
+
+
+def test_canonical_lists_are_spliced_verbatim():
+    assert orjson.dumps(list_fragment('["refund","päyment"]')) == '["refund","päyment"]'.encode()
+
+
+def test_legacy_and_jsonb_text_is_normalised():
+    for raw in ('["refund", "p\\u00e4yment"]', '["refund", "päyment"]'):
+        assert orjson.dumps(list_fragment(raw)) == '["refund","päyment"]'.encode()
+
+
+def test_list_columns_are_read_as_text_on_postgresql():
+    # asyncpg decodes jsonb into lists unless the query itself casts to text
+    sql = str(select(*TICKET_COLUMNS).compile(dialect=postgresql.asyncpg.dialect()))
+    assert "CAST(tickets.keywords AS TEXT) AS keywords" in sql
+    assert "CAST(tickets.custom_flags AS TEXT) AS custom_flags" in sql
+
+
+# ---------------------------------------------------------------------------
+# Byte identity
+# ---------------------------------------------------------------------------
+
+
+async def test_ticket_json_matches_model_dump_json(sessions):
+    async with sessions() as db:
+        rows = (await db.execute(select(*TICKET_COLUMNS).order_by(Ticket.id))).all()
+    assert len(rows) == len(TICKETS)
+    for row in rows:
+        assert ticket_json(row) == ticket_response(row).model_dump_json()
+
+
+async def test_list_body_matches_the_response_model_path(sessions):
+    for query in (TicketListQuery(), TicketListQuery(limit=2), TicketListQuery(priority="P0", total="none")):
+        async with sessions() as db:
+            fast = ORJSONResponse(await list_tickets_json(db, query)).body
+            model = await list_tickets(db, query)
+        assert isinstance(model, TicketListResponse)
+        assert fast == _json_response(model)
+
+    async with sessions() as db:
+        first = await list_tickets(db, TicketListQuery(limit=2))
+        fast = ORJSONResponse(await list_tickets_json(db, TicketListQuery(limit=2, cursor=first.next_cursor))).body
+        slow = await list_tickets(db, TicketListQuery(limit=2, cursor=first.next_cursor))
+    assert fast == _json_response(slow)
+    assert [t.subject for t in slow.tickets] == ["Ünïcode ✓ 😀", "Refund"]
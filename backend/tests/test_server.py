@@ -0,0 +1,102 @@
+"""
+Tests for the pre-fork server (app.server), run as a real subprocess.
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork") or not Path("/proc/self/task").exists(), reason="needs fork and /proc"
+)
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> set:
+    path = Path(f"/proc/{pid}/task/{pid}/children")
+    return {int(p) for p in path.read_text().split()} if path.exists() else set()
+
+
+def _wait_for(predicate, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if predicate():
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise AssertionError("condition not reached in time")
+
+
+@pytest.fixture
+def server(tmp_path):
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(BACKEND),
+        "DB_URL": f"sqlite+aiosqlite:///{tmp_path / 'server.db'}",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--port", str(port), "--workers", "2",
+         "--log-level", "warning", "--graceful-timeout", "5"],
+        cwd=tmp_path, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_for(lambda: httpx.get(f"{url}/health").status_code == 200 and len(_children(proc.pid)) == 2)
+        yield proc, url
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+# ---------------------------------------------------------------------------
+# Serving
+# ---------------------------------------------------------------------------
+
+
+def test_workers_serve_requests_on_a_shared_schema(server):
+    _proc, url = server
+    ids = [
+        httpx.post(f"{url}/tickets/analyze", json={"subject": "Refund", "description": "Please refund"}).json()["id"]
+        for _ in range(6)
+    ]
+    assert ids == list(range(1, 7))
+    assert httpx.get(f"{url}/tickets").json()["total"] == 6
+
+
+# ---------------------------------------------------------------------------
+# Supervision
+# ---------------------------------------------------------------------------
+
+
+def test_dead_worker_is_replaced(server):
+    proc, url = server
+    victim = min(_children(proc.pid))
+    os.kill(victim, signal.SIGKILL)
+    _wait_for(lambda: len(_children(proc.pid)) == 2 and victim not in _children(proc.pid))
+    assert httpx.get(f"{url}/health").status_code == 200
+
+
+def test_sigterm_stops_all_workers(server):
+    proc, _url = server
+    workers = _children(proc.pid)
+    proc.send_signal(signal.SIGTERM)
+    assert proc.wait(timeout=15) == 0
+    for pid in workers:
+        assert not Path(f"/proc/{pid}").exists()
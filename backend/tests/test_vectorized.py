@@ -0,0 +1,102 @@
+"""Tests for columnar batch analysis (analyze_many)."""
+import random
+
+import numpy as np
+import pytest
+
+from app.analyzers.analyzer import analyze_context
+from app.analyzers.context import AnalysisContext
+from app.analyzers.rules import DEFAULT_RULES, RuleSet, compile_rules, current_snapshot
+from app.analyzers.vectorized import analyze_many
+
+# Rules that exercise every override: a category change with a confidence
+# floor, a flag without priority, and a rule that outranks nothing
+CUSTOM_RULES = RuleSet.from_dict({
+    **DEFAULT_RULES.to_dict(),
+    "rules": [
+        {"flag": "vip_customer", "keywords": ["vip", "enterprise"], "priority": "P1",
+         "category": "Account", "min_confidence": 0.95},
+        {"flag": "newsletter", "keywords": ["unsubscribe"]},
+        *DEFAULT_RULES.to_dict()["rules"],
+        {"flag": "low", "keywords": ["typo"], "priority": "P3", "category": "Other"},
+    ],
+})
+
+
+def _corpus(snapshot, size: int, seed: int) -> list[tuple[str, str]]:
+    vocab = [kw for kws in snapshot.matcher.groups.values() for kw in kws] + [
+        "the", "a", "my", "please", "thanks", "x", "-", "ed", "ing", "İstanbul", "ΟΔΟΣ",
+    ]
+    rng = random.Random(seed)
+
+    def words(low: int, high: int) -> str:
+        return rng.choice(["", " "]).join(rng.choice(vocab) for _ in range(rng.randint(low, high)))
+
+    return [(words(0, 4).capitalize(), words(0, 30)) for _ in range(size)]
+
+
+def _reference(corpus, snapshot):
+    return [analyze_context(AnalysisContext(s, d, snapshot)) for s, d in corpus]
+
+
+# ---------------------------------------------------------------------------
+# Equivalence with analyze()
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("rules", [None, CUSTOM_RULES], ids=["default", "custom"])
+def test_results_identical_to_per_ticket_analysis(rules):
+    snapshot = current_snapshot() if rules is None else compile_rules(rules, source="test")
+    corpus = _corpus(snapshot, 2000, seed=42)
+    batch = analyze_many([s for s, _ in corpus], [d for _, d in corpus], snapshot, chunk_size=300)
+    assert batch.to_results() == _reference(corpus, snapshot)
+    assert batch.result(7) == _reference(corpus[7:8], snapshot)[0]
+
+
+@pytest.mark.parametrize("position", [0, 1, 2])
+def test_nul_inside_a_ticket_does_not_shift_hits(position):
+    corpus = [("hello", "world"), ("Refund please", "my payment"), ("nothing", "here")]
+    subject, description = corpus[position]
+    corpus[position] = (subject + "\x00re", "fund\x00" + description + "\x00")
+    batch = analyze_many([s for s, _ in corpus], [d for _, d in corpus])
+    assert batch.to_results() == _reference(corpus, current_snapshot())
+    assert batch.result(1).custom_flags == ["refund_detected"]
+
+
+def test_accepts_arrays_and_generators():
+    corpus = _corpus(current_snapshot(), 50, seed=1)
+    subjects = np.array([s for s, _ in corpus])
+    descriptions = (d for _, d in corpus)
+    assert analyze_many(subjects, descriptions).to_results() == _reference(corpus, current_snapshot())
+
+
+# ---------------------------------------------------------------------------
+# Columnar output
+# ---------------------------------------------------------------------------
+
+
+def test_columns():
+    batch = analyze_many(
+        ["Refund", "Question", "Server down"],
+        ["Please refund my payment", "Where can I see the roadmap", "Production outage, urgent"],
+    )
+    assert len(batch) == 3
+    columns = batch.to_columns()
+    assert columns["category"].tolist() == ["Billing", "Other", "Technical"]
+    assert columns["priority"].tolist() == ["P1", "P3", "P0"]
+    assert columns["urgency"].tolist() == [False, False, True]
+    assert columns["custom_flags"] == [["refund_detected"], [], []]
+    assert columns["keywords"][1] == []
+    assert batch.category_labels[batch.category_codes[0]] == "Billing"
+    assert set(columns["rules_version"]) == {current_snapshot().version}
+
+
+def test_empty_input():
+    batch = analyze_many([], [])
+    assert len(batch) == 0
+    assert batch.to_results() == []
+
+
+def test_length_mismatch_rejected():
+    with pytest.raises(ValueError):
+        analyze_many(["a", "b"], ["c"])
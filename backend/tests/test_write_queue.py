@@ -0,0 +1,75 @@
+"""Unit tests for the write-behind queue (no database)."""
+import asyncio
+
+import pytest
+from app.services.write_queue import WriteBehindQueue, WriteQueueClosedError, WriteQueueFullError
+
+
+class Recorder:
+    def __init__(self, fail: bool = False, delay: float = 0.0) -> None:
+        self.batches: list[list] = []
+        self.fail = fail
+        self.delay = delay
+
+    async def __call__(self, items):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("disk full")
+        self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+
+def _queue(writer, **kwargs) -> WriteBehindQueue:
+    options = {"batch_size": 100, "flush_interval": 0.01, "maxsize": 1000, "enqueue_timeout": 1.0}
+    options.update(kwargs)
+    return WriteBehindQueue(writer, **options)
+
+
+async def test_concurrent_submits_share_a_group_commit():
+    writer = Recorder()
+    queue = _queue(writer)
+    queue.start()
+    results = await asyncio.gather(*(queue.submit(i) for i in range(20)))
+    await queue.close()
+    assert results == [i * 10 for i in range(20)]
+    assert len(writer.batches) == 1
+
+
+async def test_batch_size_bounds_each_group():
+    writer = Recorder()
+    queue = _queue(writer, batch_size=8)
+    queue.start()
+    await asyncio.gather(*(queue.submit(i) for i in range(20)))
+    await queue.close()
+    assert [len(b) for b in writer.batches] == [8, 8, 4]
+    assert [i for b in writer.batches for i in b] == list(range(20))   # FIFO
+
+
+async def test_close_drains_unawaited_items():
+    writer = Recorder(delay=0.01)
+    queue = _queue(writer, batch_size=3)
+    queue.start()
+    for i in range(10):
+        await queue.submit(i, wait=False)
+    await queue.close()
+    assert sorted(i for b in writer.batches for i in b) == list(range(10))
+    with pytest.raises(WriteQueueClosedError):
+        await queue.submit(99)
+
+
+async def test_failed_commit_reaches_waiters_and_writer_survives():
+    writer = Recorder(fail=True)
+    queue = _queue(writer)
+    queue.start()
+    with pytest.raises(RuntimeError, match="disk full"):
+        await queue.submit(1)
+    writer.fail = False
+    assert await queue.submit(2) == 20
+    await queue.close()
+
+
+async def test_full_queue_applies_backpressure():
+    queue = _queue(Recorder(), maxsize=1, enqueue_timeout=0.05)   # writer not started
+    await queue.submit(1, wait=False)
+    with pytest.raises(WriteQueueFullError):
+        await queue.submit(2, wait=False)
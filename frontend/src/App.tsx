@@ -1,6 +1,6 @@
 import { useCallback, useEffect, useState } from "react";
-import type { Ticket } from "./types/ticket";
-import { listTickets } from "./api/tickets";
+import type { StatsCounts, Ticket } from "./types/ticket";
+import { getStats, listTickets, subscribeTickets } from "./api/tickets";
 import TicketForm from "./components/TicketForm";
 import TicketList from "./components/TicketList";
 import "./index.css";
@@ -9,6 +9,18 @@ export default function App() {
   const [tickets, setTickets] = useState<Ticket[]>([]);
   const [listLoading, setListLoading] = useState(true);
   const [listError, setListError] = useState<string | null>(null);
+  const [counts, setCounts] = useState<StatsCounts | null>(null);
+  // Highest id in the loaded list; the live feed continues from there
+  const [feedFrom, setFeedFrom] = useState<number | null>(null);
+
+  const fetchStats = useCallback(async () => {
+    try {
+      const data = await getStats();
+      setCounts(data.all_time);
+    } catch {
+      setCounts(null);
+    }
+  }, []);
 
   const fetchTickets = useCallback(async () => {
     setListLoading(true);
@@ -16,6 +28,7 @@ export default function App() {
     try {
       const data = await listTickets();
       setTickets(data.tickets);
+      setFeedFrom(data.tickets.reduce((max, t) => Math.max(max, t.id), 0));
     } catch (err: unknown) {
       setListError(
         err instanceof Error ? err.message : "Failed to load tickets",
@@ -27,16 +40,34 @@ export default function App() {
 
   useEffect(() => {
     fetchTickets();
-  }, [fetchTickets]);
+    fetchStats();
+  }, [fetchTickets, fetchStats]);
+
+  const addTicket = useCallback((ticket: Ticket) => {
+    // Our own submissions also come back through the feed
+    setTickets((prev) =>
+      prev.some((t) => t.id === ticket.id) ? prev : [ticket, ...prev],
+    );
+  }, []);
+
+  useEffect(() => {
+    if (feedFrom === null) return;
+    return subscribeTickets((ticket) => {
+      addTicket(ticket);
+      fetchStats();
+    }, feedFrom);
+  }, [feedFrom, addTicket, fetchStats]);
 
   function handleNewTicket(ticket: Ticket) {
-    setTickets((prev) => [ticket, ...prev]);
+    addTicket(ticket);
+    fetchStats();
   }
 
+  // Counts come from the server-side rollups, not from the (paged) list
   const stats = {
-    total: tickets.length,
-    critical: tickets.filter((t) => t.priority === "P0").length,
-    urgent: tickets.filter((t) => t.urgency).length,
+    total: counts?.tickets ?? 0,
+    critical: counts?.priority.P0 ?? 0,
+    urgent: counts?.urgent ?? 0,
   };
 
   return (
@@ -68,7 +99,7 @@ export default function App() {
               </p>
             </div>
           </div>
-          {tickets.length > 0 && (
+          {stats.total > 0 && (
             <div className="header-stats">
               <div className="stat-chip">
                 <span className="stat-value">{stats.total}</span>
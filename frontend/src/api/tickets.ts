@@ -2,6 +2,7 @@ import type {
   Ticket,
   TicketListResponse,
   TicketRequest,
+  TicketStatsResponse,
 } from "../types/ticket";
 
 const BASE = "/tickets";
@@ -26,3 +27,27 @@ export async function listTickets(): Promise<TicketListResponse> {
   if (!res.ok) throw new Error(`Error ${res.status}`);
   return res.json();
 }
+
+export async function getStats(): Promise<TicketStatsResponse> {
+  const res = await fetch(`${BASE}/stats`);
+  if (!res.ok) throw new Error(`Error ${res.status}`);
+  return res.json();
+}
+
+/**
+ * Receive newly stored tickets as they are committed (Server-Sent Events).
+ * Tickets with an id above `afterId` that are already stored are replayed
+ * first; on reconnect the browser resumes from the last received id.
+ * Returns a function that closes the stream.
+ */
+export function subscribeTickets(
+  onTicket: (ticket: Ticket) => void,
+  afterId?: number,
+): () => void {
+  const query = afterId === undefined ? "" : `?after_id=${afterId}`;
+  const source = new EventSource(`${BASE}/stream${query}`);
+  source.addEventListener("ticket", (event) => {
+    onTicket(JSON.parse((event as MessageEvent<string>).data));
+  });
+  return () => source.close();
+}
@@ -13,10 +13,32 @@ export interface Ticket {
 
 export interface TicketListResponse {
   tickets: Ticket[];
-  total: number;
+  total: number | null;
+  next_cursor: string | null;
 }
 
 export interface TicketRequest {
   subject: string;
   description: string;
 }
+
+export interface StatsCounts {
+  tickets: number;
+  urgent: number;
+  priority: Record<string, number>;
+  category: Record<string, number>;
+  flag: Record<string, number>;
+}
+
+export interface StatsBucket extends StatsCounts {
+  bucket: string;
+}
+
+export interface TicketStatsResponse {
+  granularity: "minute" | "hour";
+  since: string;
+  until: string;
+  totals: StatsCounts;
+  all_time: StatsCounts;
+  series: StatsBucket[];
+}